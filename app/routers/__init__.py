@@ -1 +0,0 @@
-from app.routers.gateway import router as gateway_router 
\ No newline at end of file
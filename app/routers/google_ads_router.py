@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
-from typing import List, Dict, Optional
+from fastapi import APIRouter, Depends, Header, Query, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+from typing import AsyncIterator, List, Dict, Optional
 from pydantic import BaseModel
 import logging
 
 from ..services.google_ads_service import GoogleAdsService
+from ..services.etag import EncodedBodies, etag_matches
+from ..services.json_codec import dumps
 
 # Setup logger
 logger = logging.getLogger(__name__)
@@ -36,68 +39,235 @@ class CampaignPerformance(BaseModel):
     conversions: float
     averageCpc: float
 
+class AccountPerformance(BaseModel):
+    accountId: str
+    accountName: str
+    success: bool
+    campaigns: List[CampaignPerformance]
+    error: Optional[str] = None
+
 class BidBudgetUpdate(BaseModel):
     customerId: str
     campaignId: str
     newBudget: Optional[float] = None
     newBid: Optional[float] = None
 
+class BulkUpdateItemResult(BaseModel):
+    index: int
+    customer_id: str
+    campaign_id: str
+    campaign_name: Optional[str] = None
+    new_budget: Optional[float] = None
+    new_budget_micros: Optional[int] = None
+    new_bid: Optional[float] = None
+    success: bool
+    status: str
+    error: Optional[str] = None
+
+class BulkUpdateResponse(BaseModel):
+    success: bool
+    message: str
+    results: List[BulkUpdateItemResult]
+
 class BidStrategyUpdate(BaseModel):
     customerId: str
     campaignId: str
     newBidStrategy: str
 
+class ReportJobRequest(BaseModel):
+    report: str
+    customerId: Optional[str] = None
+    campaignIds: Optional[List[str]] = None
+    dateRange: str = "LAST_30_DAYS"
+    groupBy: Optional[str] = None
+    status: Optional[str] = None
+    fields: Optional[List[str]] = None
+    concurrency: Optional[int] = None
+
+class BatchItem(BaseModel):
+    id: Optional[str] = None
+    customerId: Optional[str] = None
+    query: Optional[str] = None
+    report: Optional[str] = None
+    campaignIds: Optional[List[str]] = None
+    dateRange: str = "LAST_30_DAYS"
+    groupBy: Optional[str] = None
+    status: Optional[str] = None
+    fields: Optional[List[str]] = None
+    concurrency: Optional[int] = None
+
+class BatchJobUpdate(BaseModel):
+    campaignId: str
+    newBudget: Optional[float] = None
+    newBidStrategy: Optional[str] = None
+
+class BatchJobRequest(BaseModel):
+    customerId: str
+    updates: List[BatchJobUpdate] = []
+    operations: List[Dict] = []
+
 class UpdateResponse(BaseModel):
     success: bool
     message: str
     update_details: Optional[Dict] = None
 
-# Dependency to get GoogleAdsService instance
-async def get_ads_service():
-    try:
-        service = GoogleAdsService()
-        return service
-    except Exception as e:
-        logger.error(f"Failed to initialize Google Ads service: {str(e)}")
+# Dependency to get the process-wide GoogleAdsService created in the app lifespan
+async def get_ads_service(request: Request) -> GoogleAdsService:
+    service = getattr(request.app.state, "ads_service", None)
+    if service is None:
         raise HTTPException(status_code=500, detail="Failed to initialize Google Ads service")
+    return service
+
+async def ndjson_response(rows: AsyncIterator[Dict]) -> StreamingResponse:
+    """
+    Stream rows as newline-delimited JSON
+    
+    The first row is fetched before the response starts, so upstream errors raised
+    before any data is available still produce a regular HTTP error status. Errors
+    after that point are reported as a final {"error": ...} line.
+    """
+    iterator = rows.__aiter__()
+    try:
+        first_row = await iterator.__anext__()
+    except StopAsyncIteration:
+        first_row = None
+    
+    async def body():
+        if first_row is None:
+            return
+        yield dumps(first_row) + b"\n"
+        try:
+            async for row in iterator:
+                yield dumps(row) + b"\n"
+        except HTTPException as e:
+            logger.error(f"Error while streaming results: {e.detail}")
+            yield dumps({"error": e.detail}) + b"\n"
+        except Exception as e:
+            logger.error(f"Error while streaming results: {str(e)}")
+            yield dumps({"error": str(e)}) + b"\n"
+    
+    return StreamingResponse(body(), media_type="application/x-ndjson")
+
+# Encoded bodies of recently served results, reused while the service returns the same cached object
+encoded_bodies = EncodedBodies()
+
+def rows_response(rows, if_none_match: Optional[str] = None) -> Response:
+    """
+    Serialize rows the service built in the response model's shape, with a strong ETag
+    
+    Rows are encoded directly, skipping the second pydantic pass; a request whose
+    If-None-Match matches the ETag gets 304 Not Modified without a body.
+    """
+    body, etag = encoded_bodies.encode(rows)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+def field_list(fields: Optional[str]) -> Optional[List[str]]:
+    """Split a comma-separated fields parameter"""
+    if not fields:
+        return None
+    return [field.strip() for field in fields.split(",") if field.strip()]
 
 @router.get("/accounts", response_model=List[ClientAccount])
-async def list_accounts(service: GoogleAdsService = Depends(get_ads_service)):
+async def list_accounts(
+    stream: bool = Query(False, description="Stream results as NDJSON as they arrive from Google Ads"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (GAQL fields or response keys), e.g. customer_client.currency_code,accountName"),
+    if_none_match: Optional[str] = Header(None, description="Return 304 Not Modified if the result still has this ETag"),
+    service: GoogleAdsService = Depends(get_ads_service)
+):
     """
     List all available client accounts
     """
     try:
-        return await service.list_client_accounts()
+        if stream:
+            return await ndjson_response(service.iter_client_accounts(field_list(fields)))
+        return rows_response(await service.list_client_accounts(field_list(fields)), if_none_match)
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error listing accounts: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error listing accounts: {str(e)}")
 
+@router.get("/accounts/tree")
+async def get_account_tree(
+    root: Optional[str] = Query(None, description="Account the subtree starts at (defaults to the login manager account)"),
+    max_depth: Optional[int] = Query(None, ge=0, description="Levels below the root to include"),
+    status: Optional[str] = Query(None, description="Keep client accounts with this status (e.g. ENABLED)"),
+    currency: Optional[str] = Query(None, description="Keep client accounts with this currency code"),
+    include_managers: bool = Query(True, description="Include manager accounts in the flat listing"),
+    flat: bool = Query(False, description="Return a flat account list instead of nested children"),
+    refresh: bool = Query(False, description="Crawl the hierarchy again before answering"),
+    if_none_match: Optional[str] = Header(None, description="Return 304 Not Modified if the result still has this ETag"),
+    service: GoogleAdsService = Depends(get_ads_service)
+):
+    """
+    Get the manager account hierarchy (parents, levels, currency, status) from the cached account tree
+    
+    The tree is crawled on first use and refreshed in the background, so this does not
+    query Google Ads unless the tree is missing, expired or `refresh` is set.
+    """
+    view = await service.get_account_tree(root, max_depth, status, currency, include_managers, flat, refresh)
+    return rows_response(view, if_none_match)
+
 @router.get("/campaigns/{customer_id}", response_model=List[Campaign])
 async def list_campaigns(
     customer_id: str,
     status: Optional[str] = Query(None, description="Filter campaigns by status (ENABLED, PAUSED, REMOVED)"),
+    stream: bool = Query(False, description="Stream results as NDJSON as they arrive from Google Ads"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (GAQL fields or response keys), e.g. campaign.name,campaign_budget.amount_micros or campaignName,budget"),
+    if_none_match: Optional[str] = Header(None, description="Return 304 Not Modified if the result still has this ETag"),
     service: GoogleAdsService = Depends(get_ads_service)
 ):
     """
     List campaigns for a specific customer account
     """
     try:
-        return await service.list_campaigns(customer_id, status)
+        if stream:
+            return await ndjson_response(service.iter_campaigns(customer_id, status, field_list(fields)))
+        return rows_response(await service.list_campaigns(customer_id, status, field_list(fields)), if_none_match)
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error listing campaigns: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error listing campaigns: {str(e)}")
 
+@router.get("/campaigns/{customer_id}/changes")
+async def get_campaign_changes(
+    customer_id: str,
+    since: str = Query(..., description="Cursor from the previous call, or a date/timestamp (YYYY-MM-DD[ HH:MM:SS])"),
+    limit: int = Query(10000, ge=1, le=10000, description="Maximum change rows read per resource"),
+    service: GoogleAdsService = Depends(get_ads_service)
+):
+    """
+    Get campaigns and budgets changed since a cursor
+    
+    Returns the current rows of changed campaigns, removed campaign IDs and a new
+    cursor to pass as `since` next time. If `truncated` is true, call again with the
+    new cursor to read the remaining changes. If `resyncRequired` is true, the cursor
+    was older than the change history Google Ads keeps (90 days for campaigns, 30 for
+    budgets) and some changes were missed: reload the campaigns in full.
+    """
+    try:
+        return await service.get_campaign_changes(customer_id, since, limit)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting campaign changes: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error getting campaign changes: {str(e)}")
+
 @router.post("/update-bid-budget", response_model=UpdateResponse)
 async def update_bid_budget(
     update_data: BidBudgetUpdate,
+    response: Response,
+    wait: bool = Query(True, description="With queued budget writes enabled, wait for the batched write; otherwise return 202 with a write_id"),
     service: GoogleAdsService = Depends(get_ads_service)
 ):
     """
     Update campaign budget and/or bid
+    
+    When GOOGLE_ADS_BUDGET_WRITE_WINDOW is set, budget writes are buffered for that
+    window, merged per budget (last write wins) and sent as one batched mutate.
     """
     try:
         if not update_data.newBudget and not update_data.newBid:
@@ -107,8 +277,11 @@ async def update_bid_budget(
             update_data.customerId,
             update_data.campaignId,
             update_data.newBudget,
-            update_data.newBid
+            update_data.newBid,
+            wait,
         )
+        if any(update.get("status") == "queued" for update in result["update_details"]["updates"]):
+            response.status_code = 202
         return result
     except HTTPException:
         raise
@@ -116,6 +289,49 @@ async def update_bid_budget(
         logger.error(f"Error updating bid/budget: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error updating bid/budget: {str(e)}")
 
+@router.get("/update-bid-budget/writes/{write_id}")
+async def get_budget_write(
+    write_id: str,
+    service: GoogleAdsService = Depends(get_ads_service)
+):
+    """
+    Get the status of a queued budget write
+    
+    supersededBy is set when a later write to the same budget replaced this one in
+    the same batch; both then share that batch's outcome.
+    """
+    return service.get_budget_write(write_id)
+
+@router.post("/update-bid-budget/bulk", response_model=BulkUpdateResponse)
+async def bulk_update_bid_budget(
+    updates: List[BidBudgetUpdate],
+    service: GoogleAdsService = Depends(get_ads_service)
+):
+    """
+    Update budgets and/or bids for many campaigns in batched mutate calls
+    
+    Items are grouped per customer and sent with partialFailure enabled, so one bad
+    item does not fail the others. Returns one result per item, in request order.
+    """
+    try:
+        if not updates:
+            raise HTTPException(status_code=400, detail="At least one update must be provided")
+            
+        return await service.bulk_update_bid_and_budget([
+            {
+                "customer_id": update.customerId,
+                "campaign_id": update.campaignId,
+                "new_budget": update.newBudget,
+                "new_bid": update.newBid,
+            }
+            for update in updates
+        ])
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error bulk updating bid/budget: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error bulk updating bid/budget: {str(e)}")
+
 @router.post("/update-bid-strategy", response_model=UpdateResponse)
 async def update_bid_strategy(
     update_data: BidStrategyUpdate,
@@ -137,15 +353,44 @@ async def update_bid_strategy(
         logger.error(f"Error updating bidding strategy: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error updating bidding strategy: {str(e)}")
 
+@router.get("/performance", response_model=List[AccountPerformance])
+async def get_all_accounts_performance(
+    date_range: str = Query("LAST_30_DAYS", description="Time period for the report (e.g., LAST_7_DAYS, LAST_30_DAYS)"),
+    concurrency: Optional[int] = Query(None, ge=1, le=100, description="Maximum number of accounts queried at once"),
+    stream: bool = Query(False, description="Stream one NDJSON line per account as each one completes"),
+    if_none_match: Optional[str] = Header(None, description="Return 304 Not Modified if the result still has this ETag"),
+    service: GoogleAdsService = Depends(get_ads_service)
+):
+    """
+    Get campaign performance for every client account under the manager account
+    
+    Accounts are queried concurrently; an account that fails is reported with its
+    error instead of failing the whole call.
+    """
+    try:
+        if stream:
+            return await ndjson_response(service.iter_all_accounts_performance(date_range, concurrency))
+        return rows_response(await service.get_all_accounts_performance(date_range, concurrency), if_none_match)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting cross-account performance: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error getting cross-account performance: {str(e)}")
+
 @router.get("/performance/{customer_id}", response_model=List[CampaignPerformance])
 async def get_campaign_performance(
     customer_id: str,
     campaign_ids: Optional[str] = Query(None, description="Comma-separated list of campaign IDs"),
-    date_range: str = Query("LAST_30_DAYS", description="Time period for the report (e.g., LAST_7_DAYS, LAST_30_DAYS)"),
+    date_range: str = Query("LAST_30_DAYS", description="Time period for the report (e.g., LAST_7_DAYS, LAST_30_DAYS or 2025-01-01:2025-01-31)"),
+    stream: bool = Query(False, description="Stream results as NDJSON as they arrive from Google Ads"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (GAQL fields or response keys), e.g. metrics.cost_micros,clicks"),
+    if_none_match: Optional[str] = Header(None, description="Return 304 Not Modified if the result still has this ETag"),
     service: GoogleAdsService = Depends(get_ads_service)
 ):
     """
     Get performance metrics for campaigns
+    
+    Served from the local performance store when it is enabled and covers the range.
     """
     try:
         # Parse campaign IDs if provided
@@ -153,9 +398,242 @@ async def get_campaign_performance(
         if campaign_ids:
             campaign_id_list = [cid.strip() for cid in campaign_ids.split(",")]
             
-        return await service.get_campaign_performance(customer_id, campaign_id_list, date_range)
+        if stream:
+            return await ndjson_response(
+                service.iter_campaign_performance(customer_id, campaign_id_list, date_range, field_list(fields))
+            )
+        return rows_response(
+            await service.get_campaign_performance(customer_id, campaign_id_list, date_range, field_list(fields)),
+            if_none_match,
+        )
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error getting campaign performance: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error getting campaign performance: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error getting campaign performance: {str(e)}") 
+
+@router.get("/performance/{customer_id}/aggregate")
+async def aggregate_campaign_performance(
+    customer_id: str,
+    group_by: str = Query("campaign", description="Group rows by campaign, channel, status or day"),
+    campaign_ids: Optional[str] = Query(None, description="Comma-separated list of campaign IDs"),
+    date_range: str = Query("LAST_30_DAYS", description="Time period for the report (e.g., LAST_7_DAYS, LAST_30_DAYS or 2025-01-01:2025-01-31)"),
+    if_none_match: Optional[str] = Header(None, description="Return 304 Not Modified if the result still has this ETag"),
+    service: GoogleAdsService = Depends(get_ads_service)
+):
+    """
+    Aggregate campaign performance with derived metrics (CTR, CPC, CPA, conversion rate, ROAS)
+    
+    Returns one row per group plus overall totals instead of the raw per-campaign rows.
+    """
+    try:
+        campaign_id_list = None
+        if campaign_ids:
+            campaign_id_list = [cid.strip() for cid in campaign_ids.split(",")]
+        return rows_response(
+            await service.aggregate_campaign_performance(customer_id, group_by, campaign_id_list, date_range), if_none_match
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error aggregating campaign performance: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error aggregating campaign performance: {str(e)}")
+
+@router.post("/performance-store/sync/{customer_id}")
+async def sync_performance_store(
+    customer_id: str,
+    service: GoogleAdsService = Depends(get_ads_service)
+):
+    """
+    Fetch new and still-settling days of campaign metrics into the local performance store
+    """
+    try:
+        return await service.sync_performance_store(customer_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error syncing performance store: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error syncing performance store: {str(e)}")
+
+@router.post("/batch")
+async def run_batch(
+    items: List[BatchItem],
+    concurrency: Optional[int] = Query(None, ge=1, le=100, description="Maximum items run at once"),
+    service: GoogleAdsService = Depends(get_ads_service)
+):
+    """
+    Run many GAQL queries or named reports in one call
+    
+    Each item has a customerId and either a GAQL `query` (raw result rows are
+    returned) or a `report` (campaigns, campaign_performance, performance_aggregate
+    or all_accounts_performance). Results are keyed by item id, or by position when
+    the id is missing, and a failing item carries its own error. Repeated ids are
+    rejected with 400.
+    """
+    if not items:
+        raise HTTPException(status_code=400, detail="At least one item must be provided")
+    try:
+        return await service.run_batch([item.model_dump() for item in items], concurrency)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error running batch: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error running batch: {str(e)}")
+
+@router.post("/reports/jobs", status_code=202)
+async def submit_report_job(
+    request: ReportJobRequest,
+    service: GoogleAdsService = Depends(get_ads_service)
+):
+    """
+    Queue a report (campaigns, campaign_performance, performance_aggregate or
+    all_accounts_performance) to run in the background
+    
+    Returns the job ID; poll /reports/jobs/{job_id} and download the result from
+    /reports/jobs/{job_id}/result once it has succeeded.
+    """
+    return service.submit_report(request.model_dump())
+
+@router.get("/reports/jobs")
+async def list_report_jobs(service: GoogleAdsService = Depends(get_ads_service)):
+    """
+    List report jobs that have not expired
+    """
+    return service.report_jobs.list()
+
+@router.get("/reports/jobs/{job_id}")
+async def get_report_job(
+    job_id: str,
+    service: GoogleAdsService = Depends(get_ads_service)
+):
+    """
+    Get a report job's status and progress
+    """
+    job = service.report_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Report job {job_id} not found or expired")
+    return job
+
+@router.get("/reports/jobs/{job_id}/result")
+async def get_report_job_result(
+    job_id: str,
+    if_none_match: Optional[str] = Header(None, description="Return 304 Not Modified if the result still has this ETag"),
+    service: GoogleAdsService = Depends(get_ads_service)
+):
+    """
+    Download a finished report job's result
+    """
+    job = service.report_jobs.result(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Report job {job_id} not found or expired")
+    if job["status"] != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Report job {job_id} is {job['status']}" + (f": {job['error']}" if job["error"] else ""))
+    return rows_response(job["result"], if_none_match)
+
+@router.delete("/reports/jobs/{job_id}")
+async def cancel_report_job(
+    job_id: str,
+    service: GoogleAdsService = Depends(get_ads_service)
+):
+    """
+    Cancel a queued or running report job
+    """
+    job = service.report_jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Report job {job_id} not found or expired")
+    return job
+
+@router.post("/batch-jobs", status_code=202)
+async def submit_batch_job(
+    request: BatchJobRequest,
+    service: GoogleAdsService = Depends(get_ads_service)
+):
+    """
+    Apply a large set of budget / bidding strategy updates through a Google Ads BatchJob
+    
+    Raw MutateOperations may be added under `operations`. Returns the job ID; poll
+    /batch-jobs/{job_id} and read per-operation results from /batch-jobs/{job_id}/results,
+    which are available while the job's results are still being fetched.
+    """
+    try:
+        return await service.submit_batch_job(
+            request.customerId,
+            [
+                {"campaign_id": item.campaignId, "new_budget": item.newBudget, "new_bid_strategy": item.newBidStrategy}
+                for item in request.updates
+            ],
+            request.operations,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error submitting batch job: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error submitting batch job: {str(e)}")
+
+@router.get("/batch-jobs")
+async def list_batch_jobs(service: GoogleAdsService = Depends(get_ads_service)):
+    """
+    List batch jobs that have not expired
+    """
+    return service.batch_jobs.list()
+
+@router.get("/batch-jobs/{job_id}")
+async def get_batch_job(
+    job_id: str,
+    service: GoogleAdsService = Depends(get_ads_service)
+):
+    """
+    Get a batch job's status and progress
+    """
+    job = service.batch_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Batch job {job_id} not found or expired")
+    return job
+
+@router.get("/batch-jobs/{job_id}/results")
+async def get_batch_job_results(
+    job_id: str,
+    offset: int = Query(0, ge=0, description="Index of the first result returned"),
+    limit: Optional[int] = Query(None, ge=1, description="Maximum results returned"),
+    stream: bool = Query(False, description="Stream results as NDJSON, following the job until it finishes"),
+    service: GoogleAdsService = Depends(get_ads_service)
+):
+    """
+    Get a batch job's per-operation results received so far
+    """
+    job = service.batch_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Batch job {job_id} not found or expired")
+    if stream:
+        return await ndjson_response(service.batch_jobs.iter_results(job_id, offset))
+    return {"job": job, "offset": offset, "results": service.batch_jobs.results(job_id, offset, limit)}
+
+@router.delete("/batch-jobs/{job_id}")
+async def cancel_batch_job(
+    job_id: str,
+    service: GoogleAdsService = Depends(get_ads_service)
+):
+    """
+    Cancel a batch job that has not finished
+    
+    A job still uploading operations is removed; one Google has already started
+    may still be applied.
+    """
+    job = service.batch_jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Batch job {job_id} not found or expired")
+    return job
+
+@router.get("/cache/stats")
+async def get_cache_stats(service: GoogleAdsService = Depends(get_ads_service)):
+    """
+    Get response cache statistics (entries, bytes, hits and misses)
+    """
+    return service.cache.stats()
+
+@router.get("/stats")
+async def get_service_stats(service: GoogleAdsService = Depends(get_ads_service)):
+    """
+    Get runtime statistics (token refreshes, response cache, request coalescing)
+    """
+    return dict(service.stats(), encoded_bodies=encoded_bodies.stats())
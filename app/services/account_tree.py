@@ -0,0 +1,303 @@
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+import asyncio
+import logging
+import time
+
+from .single_flight import SingleFlight
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+# Loads a manager account's customer_client rows at level 0 (itself) and 1 (its direct clients),
+# each as {"accountId", "accountName", "currencyCode", "status", "timeZone", "manager", "level"}
+ChildrenLoader = Callable[[str], Awaitable[List[Dict]]]
+
+# Filtered views kept per tree snapshot
+MAX_VIEWS = 256
+
+class AccountTree:
+    """
+    Cached hierarchy of the accounts reachable from the login manager account.
+
+    A crawl asks each manager account for its direct clients (customer_client at
+    level <= 1) and descends into every sub-manager concurrently, at most
+    `concurrency` queries at once, so deep hierarchies cost one round trip per
+    level rather than one per manager. Each node records its parents, children
+    and level below the root. A sub-manager that cannot be read is reported in
+    the tree's errors and the rest of the tree is kept.
+
+    The tree is crawled on first use and refreshed every `refresh_interval`
+    seconds in the background; readers keep getting the previous tree while a
+    refresh runs. Filtered subtrees are built once per tree and then reused.
+    """
+
+    def __init__(
+        self,
+        root_id: str,
+        loader: ChildrenLoader,
+        ttl: float = 3600.0,
+        refresh_interval: float = 1800.0,
+        concurrency: int = 10,
+    ):
+        self.root_id = str(root_id)
+        self._loader = loader
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+        self.concurrency = concurrency
+        self._tree: Optional[Dict] = None
+        self._views: Dict[tuple, Any] = {}
+        self._single_flight = SingleFlight()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+        self.crawls = 0
+        self.failed_crawls = 0
+        self.queries = 0
+        self.view_hits = 0
+        self.view_misses = 0
+
+    def start(self) -> None:
+        if self.refresh_interval > 0 and self._refresh_task is None:
+            self._refresh_task = asyncio.ensure_future(self._refresh_loop())
+
+    async def close(self) -> None:
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+    async def get(self) -> Dict:
+        """The current tree, crawling it first if it is missing or older than ttl"""
+        tree = self._tree
+        if tree is None or tree["refreshedAt"] + self.ttl <= time.time():
+            tree = await self.refresh()
+        return tree
+
+    async def refresh(self) -> Dict:
+        """Crawl the hierarchy now; concurrent callers share one crawl"""
+        return await self._single_flight.do("tree", self._crawl)
+
+    async def view(
+        self,
+        root_id: Optional[str] = None,
+        max_depth: Optional[int] = None,
+        status: Optional[str] = None,
+        currency: Optional[str] = None,
+        include_managers: bool = True,
+        flat: bool = False,
+    ) -> Optional[Dict]:
+        """
+        A filtered subtree of the cached hierarchy
+
+        Args:
+            root_id: Account the subtree starts at (defaults to the login manager account)
+            max_depth: Levels below root_id to include
+            status: Keep client accounts with this status (e.g. ENABLED)
+            currency: Keep client accounts with this currency code
+            include_managers: Whether the flat listing includes manager accounts
+            flat: Return a flat account list instead of nested children
+
+        Returns:
+            Optional[Dict]: The subtree, or None if root_id is not in the hierarchy
+        """
+        tree = await self.get()
+        key = (
+            tree["refreshedAt"],
+            str(root_id or self.root_id),
+            max_depth,
+            status.upper() if status else None,
+            currency.upper() if currency else None,
+            include_managers,
+            flat,
+        )
+        cached = self._views.get(key)
+        if cached is not None:
+            self.view_hits += 1
+            return cached
+        self.view_misses += 1
+        result = self._build_view(tree, *key[1:])
+        if result is not None:
+            if len(self._views) >= MAX_VIEWS:
+                self._views.clear()
+            self._views[key] = result
+        return result
+
+    def stats(self) -> Dict:
+        tree = self._tree
+        return {
+            "root_id": self.root_id,
+            "accounts": len(tree["accounts"]) if tree else 0,
+            "managers": sum(1 for node in tree["accounts"].values() if node["manager"]) if tree else 0,
+            "errors": len(tree["errors"]) if tree else 0,
+            "refreshed_at": tree["refreshedAt"] if tree else None,
+            "crawl_seconds": tree["crawlSeconds"] if tree else None,
+            "crawls": self.crawls,
+            "failed_crawls": self.failed_crawls,
+            "queries": self.queries,
+            "views": len(self._views),
+            "view_hits": self.view_hits,
+            "view_misses": self.view_misses,
+        }
+
+    # Crawling
+
+    async def _refresh_loop(self) -> None:
+        """Re-crawl a tree that has been built, every refresh_interval seconds"""
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            if self._tree is None:
+                continue
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Error refreshing account tree: {str(getattr(e, 'detail', None) or e)}")
+
+    async def _crawl(self) -> Dict:
+        started = time.monotonic()
+        accounts: Dict[str, Dict] = {}
+        errors: List[Dict] = []
+        visited: Set[str] = {self.root_id}
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        def node_for(row: Dict) -> Dict:
+            node = accounts.get(row["accountId"])
+            if node is None:
+                node = accounts[row["accountId"]] = {
+                    "accountId": row["accountId"],
+                    "accountName": row["accountName"],
+                    "currencyCode": row["currencyCode"],
+                    "status": row["status"],
+                    "timeZone": row["timeZone"],
+                    "manager": row["manager"],
+                    "level": None,
+                    "parentIds": [],
+                    "childIds": [],
+                }
+            return node
+
+        async def visit(manager_id: str) -> None:
+            async with semaphore:
+                rows = await self._loader(manager_id)
+                self.queries += 1
+            sub_managers: List[str] = []
+            for row in rows:
+                if row["level"] == 0:
+                    node_for(row)
+            manager = accounts.get(manager_id) or node_for({
+                "accountId": manager_id, "accountName": "", "currencyCode": "", "status": "", "timeZone": "",
+                "manager": True,
+            })
+            for row in rows:
+                if row["level"] != 1:
+                    continue
+                node = node_for(row)
+                if node["accountId"] not in manager["childIds"]:
+                    manager["childIds"].append(node["accountId"])
+                if manager_id not in node["parentIds"]:
+                    node["parentIds"].append(manager_id)
+                if node["manager"] and node["accountId"] not in visited:
+                    visited.add(node["accountId"])
+                    sub_managers.append(node["accountId"])
+            await asyncio.gather(*(visit_sub_manager(account_id) for account_id in sub_managers))
+
+        async def visit_sub_manager(manager_id: str) -> None:
+            try:
+                await visit(manager_id)
+            except Exception as e:
+                detail = str(getattr(e, "detail", None) or e)
+                logger.warning(f"Could not read clients of manager account {manager_id}: {detail}")
+                errors.append({"accountId": manager_id, "error": detail})
+
+        try:
+            await visit(self.root_id)
+        except Exception:
+            self.failed_crawls += 1
+            raise
+
+        # Levels are the shortest distance from the root, whatever order the crawl finished in
+        accounts[self.root_id]["level"] = 0
+        queue = deque([self.root_id])
+        while queue:
+            node = accounts[queue.popleft()]
+            for child_id in node["childIds"]:
+                child = accounts[child_id]
+                if child["level"] is None:
+                    child["level"] = node["level"] + 1
+                    queue.append(child_id)
+
+        tree = {
+            "rootId": self.root_id,
+            "accounts": accounts,
+            "errors": errors,
+            "refreshedAt": time.time(),
+            "crawlSeconds": round(time.monotonic() - started, 3),
+        }
+        self._tree = tree
+        self._views.clear()
+        self.crawls += 1
+        logger.info(
+            f"Crawled account tree: {len(accounts)} accounts, "
+            f"{sum(1 for node in accounts.values() if node['manager'])} managers in {tree['crawlSeconds']}s"
+        )
+        return tree
+
+    # Views
+
+    def _build_view(
+        self,
+        tree: Dict,
+        root_id: str,
+        max_depth: Optional[int],
+        status: Optional[str],
+        currency: Optional[str],
+        include_managers: bool,
+        flat: bool,
+    ) -> Optional[Dict]:
+        accounts = tree["accounts"]
+        if root_id not in accounts:
+            return None
+
+        def matches(node: Dict) -> bool:
+            return (status is None or node["status"] == status) and (currency is None or node["currencyCode"] == currency)
+
+        def build(account_id: str, depth: int, path: Set[str]) -> Optional[Dict]:
+            """The node with its kept children, or None if neither it nor any descendant matches"""
+            node = accounts[account_id]
+            children: List[Dict] = []
+            if max_depth is None or depth < max_depth:
+                for child_id in node["childIds"]:
+                    if child_id in path:  # an account linked back into its own ancestry
+                        continue
+                    child = build(child_id, depth + 1, path | {child_id})
+                    if child is not None:
+                        children.append(child)
+            if depth > 0 and not children:
+                # A manager whose clients were all filtered out goes too; one at the depth cut-off stays
+                below_cutoff = max_depth is None or depth < max_depth
+                if not matches(node) or (node["manager"] and below_cutoff and (status or currency)):
+                    return None
+            view_node = {key: value for key, value in node.items() if key != "childIds"}
+            view_node["children"] = children
+            return view_node
+
+        nested = build(root_id, 0, {root_id})
+        view: Dict[str, Any] = {"rootId": root_id, "refreshedAt": tree["refreshedAt"], "errors": tree["errors"]}
+        if not flat:
+            view["tree"] = nested
+            return view
+
+        listed: List[Dict] = []
+        seen: Set[str] = set()
+        stack = [nested]
+        while stack:
+            node = stack.pop()
+            if node["accountId"] not in seen:
+                seen.add(node["accountId"])
+                if include_managers or not node["manager"]:
+                    listed.append({key: value for key, value in node.items() if key != "children"})
+            stack.extend(reversed(node["children"]))
+        view["accounts"] = listed
+        return view
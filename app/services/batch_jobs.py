@@ -0,0 +1,339 @@
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from urllib.parse import quote
+import asyncio
+import logging
+import time
+import uuid
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+# Sends one Google Ads API call: (endpoint, method, body, query params) -> response body
+ApiRequest = Callable[[str, str, Optional[Dict], Optional[Dict]], Awaitable[Dict]]
+# Called with the customer ID once a batch job has applied operations
+ChangeCallback = Callable[[str], Awaitable[None]]
+
+QUEUED = "queued"
+ADDING_OPERATIONS = "adding_operations"
+RUNNING = "running"
+FETCHING_RESULTS = "fetching_results"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+# Google Ads accepts at most 10,000 operations per AddOperations request
+MAX_CHUNK_SIZE = 10000
+
+class BatchJobs:
+    """
+    Pipeline running large mutation sets through the Google Ads BatchJobService.
+
+    Each job creates one BatchJob for its customer, uploads the operations with
+    AddOperations in sequenced chunks, runs it, polls the long-running operation
+    with exponential backoff and then pages through ListBatchJobResults. Results
+    are appended to the job as each page arrives, so callers can read (or stream)
+    them while the rest are still being fetched. At most `workers` jobs run at
+    once; finished jobs are kept for `result_ttl` seconds.
+
+    Creating, filling, running and removing a BatchJob go through `mutate`, which
+    must not retry: a retried AddOperations that had already been applied would
+    upload its chunk twice. Polling and result reads go through `request`.
+    """
+
+    def __init__(
+        self,
+        request: ApiRequest,
+        mutate: Optional[ApiRequest] = None,
+        on_change: Optional[ChangeCallback] = None,
+        workers: int = 2,
+        chunk_size: int = 5000,
+        poll_initial: float = 2.0,
+        poll_max: float = 60.0,
+        poll_timeout: float = 6 * 3600.0,
+        result_page_size: int = 1000,
+        result_ttl: float = 86400.0,
+    ):
+        self._request = request
+        self._mutate = mutate or request
+        self._on_change = on_change
+        self.workers = workers
+        self.chunk_size = min(chunk_size, MAX_CHUNK_SIZE)
+        self.poll_initial = poll_initial
+        self.poll_max = poll_max
+        self.poll_timeout = poll_timeout
+        self.result_page_size = result_page_size
+        self.result_ttl = result_ttl
+        self._jobs: "OrderedDict[str, Dict]" = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._updated: Dict[str, asyncio.Event] = {}
+        self._slots: Optional[asyncio.Semaphore] = None
+
+        self.submitted = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.operations = 0
+
+    def submit(self, customer_id: str, operations: List[Dict], labels: Optional[List[Dict]] = None, rejected: Optional[List[Dict]] = None) -> Dict:
+        """
+        Start a batch job for one customer
+
+        Args:
+            customer_id: The customer ID the operations belong to
+            operations: MutateOperation bodies (e.g. {"campaignBudgetOperation": {...}})
+            labels: Optional per-operation fields copied into that operation's result
+            rejected: Input items that were rejected before upload, reported with the job
+
+        Returns:
+            Dict: The new job's status
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+        self._purge()
+        job_id = uuid.uuid4().hex
+        job = {
+            "jobId": job_id,
+            "customerId": customer_id,
+            "status": QUEUED,
+            "batchJob": None,
+            "operationCount": len(operations),
+            "addedOperations": 0,
+            "executedOperations": None,
+            "succeededOperations": 0,
+            "failedOperations": 0,
+            "rejected": rejected or [],
+            "createdAt": time.time(),
+            "startedAt": None,
+            "finishedAt": None,
+            "expiresAt": None,
+            "error": None,
+            "results": [],
+        }
+        self._jobs[job_id] = job
+        self._updated[job_id] = asyncio.Event()
+        self._tasks[job_id] = asyncio.ensure_future(self._run(job, operations, labels or [{} for _ in operations]))
+        self.submitted += 1
+        self.operations += len(operations)
+        return self._public(job)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Status of a job, or None if it is unknown or expired"""
+        self._purge()
+        job = self._jobs.get(job_id)
+        return self._public(job) if job is not None else None
+
+    def list(self) -> List[Dict]:
+        """Status of every job that has not expired, oldest first"""
+        self._purge()
+        return [self._public(job) for job in self._jobs.values()]
+
+    def results(self, job_id: str, offset: int = 0, limit: Optional[int] = None) -> Optional[List[Dict]]:
+        """Per-operation results received so far, or None if the job is unknown or expired"""
+        self._purge()
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        end = None if limit is None else offset + limit
+        return job["results"][offset:end]
+
+    async def iter_results(self, job_id: str, offset: int = 0) -> AsyncIterator[Dict]:
+        """Yield per-operation results as they arrive, until the job has finished"""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        position = offset
+        while True:
+            event = self._updated.get(job_id)
+            if event is None:  # expired while streaming
+                return
+            finished = job["status"] in FINISHED
+            while position < len(job["results"]):
+                yield job["results"][position]
+                position += 1
+            if finished:
+                return
+            await event.wait()
+
+    def cancel(self, job_id: str) -> Optional[Dict]:
+        """
+        Cancel a job that has not finished
+
+        A BatchJob still receiving operations is removed. One that Google has already
+        started cannot be stopped: its operations may still be applied even though
+        the job is reported as cancelled here.
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        task = self._tasks.get(job_id)
+        if task is not None:
+            task.cancel()
+        return self._public(job)
+
+    async def close(self) -> None:
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict:
+        counts = {status: 0 for status in (QUEUED, ADDING_OPERATIONS, RUNNING, FETCHING_RESULTS) + FINISHED}
+        for job in self._jobs.values():
+            counts[job["status"]] += 1
+        return {
+            "workers": self.workers,
+            "jobs": counts,
+            "submitted": self.submitted,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "operations": self.operations,
+        }
+
+    # Pipeline
+
+    def _set_status(self, job: Dict, status: str) -> None:
+        job["status"] = status
+        self._notify(job)
+
+    def _notify(self, job: Dict) -> None:
+        # Wake streaming readers; each wait gets a fresh event
+        event = self._updated.get(job["jobId"])
+        if event is not None:
+            event.set()
+            self._updated[job["jobId"]] = asyncio.Event()
+
+    async def _run(self, job: Dict, operations: List[Dict], labels: List[Dict]) -> None:
+        try:
+            async with self._slots:
+                job["startedAt"] = time.time()
+                await self._execute(job, operations, labels)
+            self.succeeded += 1
+            self._finish(job, SUCCEEDED)
+        except asyncio.CancelledError:
+            if job["status"] == ADDING_OPERATIONS and job["batchJob"]:
+                await self._remove(job)
+            self._finish(job, CANCELLED)
+        except Exception as e:
+            detail = getattr(e, "detail", None) or str(e)
+            logger.error(f"Batch job {job['jobId']} failed: {detail}")
+            job["error"] = str(detail)
+            self.failed += 1
+            self._finish(job, FAILED)
+        finally:
+            self._tasks.pop(job["jobId"], None)
+
+    async def _execute(self, job: Dict, operations: List[Dict], labels: List[Dict]) -> None:
+        customer_id = job["customerId"]
+
+        # Create the BatchJob
+        self._set_status(job, ADDING_OPERATIONS)
+        created = await self._mutate(
+            f"customers/{customer_id}/batchJobs:mutate", "POST", {"operation": {"create": {}}}, None
+        )
+        resource = created["result"]["resourceName"]
+        job["batchJob"] = resource
+        logger.info(f"Created batch job {resource} for {len(operations)} operations")
+
+        # Upload the operations in sequenced chunks
+        sequence_token: Optional[str] = None
+        for start in range(0, len(operations), self.chunk_size):
+            body: Dict[str, Any] = {"mutateOperations": operations[start:start + self.chunk_size]}
+            if sequence_token:
+                body["sequenceToken"] = sequence_token
+            added = await self._mutate(f"{resource}:addOperations", "POST", body, None)
+            sequence_token = added.get("nextSequenceToken")
+            job["addedOperations"] = int(added.get("totalOperations", start + len(body["mutateOperations"])))
+            self._notify(job)
+
+        # Run it and poll the long-running operation until it is done
+        self._set_status(job, RUNNING)
+        operation = await self._mutate(f"{resource}:run", "POST", {}, None)
+        await self._wait_done(job, operation["name"])
+        if self._on_change is not None:
+            await self._on_change(customer_id)
+
+        # Page through the per-operation results
+        self._set_status(job, FETCHING_RESULTS)
+        page_token: Optional[str] = None
+        while True:
+            params: Dict[str, Any] = {"pageSize": self.result_page_size}
+            if page_token:
+                params["pageToken"] = quote(page_token, safe="")
+            page = await self._request(f"{resource}:listResults", "GET", None, params)
+            for item in page.get("results", ()):
+                result = self._result(item, labels)
+                job["succeededOperations" if result["success"] else "failedOperations"] += 1
+                job["results"].append(result)
+            self._notify(job)
+            page_token = page.get("nextPageToken")
+            if not page_token:
+                break
+
+    async def _remove(self, job: Dict) -> None:
+        """Best-effort removal of a BatchJob that was never run"""
+        try:
+            await asyncio.wait_for(
+                self._mutate(
+                    f"customers/{job['customerId']}/batchJobs:mutate", "POST", {"operation": {"remove": job["batchJob"]}}, None
+                ),
+                timeout=10,
+            )
+        except Exception as e:
+            logger.warning(f"Could not remove batch job {job['batchJob']}: {str(e)}")
+
+    async def _wait_done(self, job: Dict, operation_name: str) -> None:
+        """Poll a long-running operation with capped exponential backoff"""
+        deadline = time.monotonic() + self.poll_timeout
+        delay = self.poll_initial
+        while True:
+            operation = await self._request(operation_name, "GET", None, None)
+            metadata = operation.get("metadata", {})
+            if "executedOperationCount" in metadata:
+                job["executedOperations"] = int(metadata["executedOperationCount"])
+                self._notify(job)
+            if operation.get("done"):
+                if "error" in operation:
+                    raise RuntimeError(f"Batch job failed: {operation['error'].get('message', operation['error'])}")
+                return
+            if time.monotonic() + delay > deadline:
+                raise TimeoutError(f"Batch job did not finish within {self.poll_timeout:.0f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.poll_max)
+
+    @staticmethod
+    def _result(item: Dict, labels: List[Dict]) -> Dict:
+        """One ListBatchJobResults entry as {index, <labels>, success, error | resourceName}"""
+        index = int(item.get("operationIndex", 0))
+        status = item.get("status") or {}
+        label = labels[index] if index < len(labels) else {}
+        result = {"index": index, **label}
+        if status.get("code"):
+            result.update({"success": False, "error": status.get("message", "Operation failed")})
+            return result
+        response = item.get("mutateOperationResponse", {})
+        resource_name = next(
+            (value.get("resourceName") for value in response.values() if isinstance(value, dict)),
+            None,
+        )
+        result.update({"success": True, "resourceName": resource_name})
+        return result
+
+    def _finish(self, job: Dict, status: str) -> None:
+        now = time.time()
+        job["finishedAt"] = now
+        job["expiresAt"] = now + self.result_ttl
+        self._set_status(job, status)
+
+    def _purge(self) -> None:
+        now = time.time()
+        expired = [job_id for job_id, job in self._jobs.items() if job["expiresAt"] is not None and job["expiresAt"] <= now]
+        for job_id in expired:
+            del self._jobs[job_id]
+            self._updated.pop(job_id, None)
+
+    @staticmethod
+    def _public(job: Dict) -> Dict:
+        return {key: value for key, value in job.items() if key != "results"}
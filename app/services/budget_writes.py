@@ -0,0 +1,193 @@
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+import asyncio
+import logging
+import time
+import uuid
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+# Sends campaignBudgets:mutate operations for one customer; returns per-operation errors (None = success)
+BudgetFlusher = Callable[[str, List[Dict]], Awaitable[List[Optional[str]]]]
+
+QUEUED = "queued"
+FLUSHING = "flushing"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+class BudgetWriteQueue:
+    """
+    Write-coalescing queue for campaign budget updates.
+
+    Writes are held for `window` seconds from the first pending write of a customer,
+    merged per budget resource (the last amount written wins) and flushed as one
+    batched campaignBudgets:mutate call. Each write gets a status record and a
+    future resolving to the outcome of the flush that carried it; a write replaced
+    by a later one shares that later write's outcome. Flushes for one customer run
+    one at a time and in order, so an older batch never lands after a newer one.
+    """
+
+    def __init__(self, flusher: BudgetFlusher, window: float = 0.0, max_batch: int = 5000, result_ttl: float = 3600.0):
+        self._flusher = flusher
+        self.window = window
+        self.max_batch = max_batch
+        self.result_ttl = result_ttl
+        # customer -> budget resource -> {"amountMicros", "writes": [write ids], "future"}
+        self._pending: Dict[str, Dict[str, Dict]] = {}
+        self._timers: Dict[str, asyncio.Task] = {}
+        self._flushes: Set[asyncio.Task] = set()
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._writes: "OrderedDict[str, Dict]" = OrderedDict()
+
+        self.submitted = 0
+        self.coalesced = 0
+        self.flushes = 0
+        self.operations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0
+
+    def submit(self, customer_id: str, budget_resource: str, amount_micros: int, campaign_id: Optional[str] = None) -> Tuple[Dict, asyncio.Future]:
+        """
+        Queue a budget amount for the next flush of the customer's writes
+
+        Returns:
+            Tuple[Dict, asyncio.Future]: The write's status record and a future resolving to
+            {"success", "error", "appliedAmountMicros"} once its flush has finished
+        """
+        self._purge()
+        write_id = uuid.uuid4().hex
+        self._writes[write_id] = {
+            "writeId": write_id,
+            "customerId": customer_id,
+            "campaignId": campaign_id,
+            "budgetResource": budget_resource,
+            "amountMicros": amount_micros,
+            "status": QUEUED,
+            "supersededBy": None,
+            "appliedAmountMicros": None,
+            "error": None,
+            "submittedAt": time.time(),
+            "finishedAt": None,
+            "expiresAt": None,
+        }
+        self.submitted += 1
+
+        batch = self._pending.setdefault(customer_id, {})
+        entry = batch.get(budget_resource)
+        if entry is None:
+            entry = batch[budget_resource] = {"writes": [], "future": asyncio.get_running_loop().create_future()}
+        else:
+            # Last write wins: earlier writes to this budget ride along with this one
+            self.coalesced += 1
+            for earlier in entry["writes"]:
+                self._writes[earlier]["supersededBy"] = write_id
+        entry["amountMicros"] = amount_micros
+        entry["writes"].append(write_id)
+
+        if len(batch) >= self.max_batch:
+            timer = self._timers.pop(customer_id, None)
+            if timer is not None:
+                timer.cancel()
+            self._start_flush(customer_id)
+        elif customer_id not in self._timers:
+            self._timers[customer_id] = asyncio.ensure_future(self._flush_later(customer_id))
+        return dict(self._writes[write_id]), entry["future"]
+
+    def get(self, write_id: str) -> Optional[Dict]:
+        """Status of a write, or None if it is unknown or expired"""
+        self._purge()
+        write = self._writes.get(write_id)
+        return dict(write) if write is not None else None
+
+    async def close(self) -> None:
+        """Flush every pending write now and wait for in-flight flushes"""
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        for customer_id in list(self._pending):
+            self._start_flush(customer_id)
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "window": self.window,
+            "pending": sum(len(batch) for batch in self._pending.values()),
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "flushes": self.flushes,
+            "operations": self.operations,
+        }
+
+    # Flushing
+
+    async def _flush_later(self, customer_id: str) -> None:
+        await asyncio.sleep(self.window)
+        self._timers.pop(customer_id, None)
+        self._start_flush(customer_id)
+
+    def _start_flush(self, customer_id: str) -> None:
+        batch = self._pending.pop(customer_id, None)
+        if not batch:
+            return
+        task = asyncio.ensure_future(self._flush(customer_id, batch))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, customer_id: str, batch: Dict[str, Dict]) -> None:
+        lock = self._locks.setdefault(customer_id, asyncio.Lock())
+        async with lock:
+            for entry in batch.values():
+                for write_id in entry["writes"]:
+                    self._writes[write_id]["status"] = FLUSHING
+
+            operations = [
+                {"updateMask": "amountMicros", "update": {"resourceName": resource, "amountMicros": str(entry["amountMicros"])}}
+                for resource, entry in batch.items()
+            ]
+            try:
+                errors = await self._flusher(customer_id, operations)
+            except asyncio.CancelledError:
+                self._settle(batch, ["Budget write flush was cancelled"] * len(operations))
+                raise
+            except Exception as e:
+                detail = str(getattr(e, "detail", None) or e)
+                logger.error(f"Budget write flush failed for customer {customer_id}: {detail}")
+                errors = [detail] * len(operations)
+            self.flushes += 1
+            self.operations += len(operations)
+            logger.info(
+                f"Flushed {len(operations)} budget writes for customer {customer_id} "
+                f"({sum(len(entry['writes']) for entry in batch.values())} submitted)"
+            )
+            self._settle(batch, errors)
+
+    def _settle(self, batch: Dict[str, Dict], errors: List[Optional[str]]) -> None:
+        """Record each flushed budget's outcome on its writes and resolve their future"""
+        now = time.time()
+        for entry, error in zip(batch.values(), errors):
+            outcome = {
+                "success": error is None,
+                "error": error,
+                "appliedAmountMicros": entry["amountMicros"] if error is None else None,
+            }
+            for write_id in entry["writes"]:
+                self._writes[write_id].update(
+                    status=SUCCEEDED if error is None else FAILED,
+                    error=error,
+                    appliedAmountMicros=outcome["appliedAmountMicros"],
+                    finishedAt=now,
+                    expiresAt=now + self.result_ttl,
+                )
+            if not entry["future"].done():
+                entry["future"].set_result(outcome)
+
+    def _purge(self) -> None:
+        now = time.time()
+        expired = [write_id for write_id, write in self._writes.items() if write["expiresAt"] is not None and write["expiresAt"] <= now]
+        for write_id in expired:
+            del self._writes[write_id]
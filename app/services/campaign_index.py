@@ -0,0 +1,110 @@
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+import logging
+import time
+
+from .single_flight import SingleFlight
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+# Loads campaign metadata keyed by campaign ID; campaign_ids=None loads every campaign
+CampaignLoader = Callable[[str, Optional[List[str]]], Awaitable[Dict[str, Dict]]]
+
+class CampaignIndex:
+    """
+    Per-customer index of campaign metadata used by the mutation paths.
+
+    Maps campaign ID to the campaign row (resourceName, campaignBudget, name, status,
+    biddingStrategyType). A customer's index is filled by one bulk query, campaigns
+    missing from it are looked up and added individually, and mutations update entries
+    in place, so a mutation no longer needs its own lookup round trip.
+    """
+
+    def __init__(self, loader: CampaignLoader, ttl: float = 900.0, max_customers: int = 1000):
+        self._loader = loader
+        self.ttl = ttl
+        self.max_customers = max_customers
+        self._customers: "OrderedDict[str, Tuple[Dict[str, Dict], float]]" = OrderedDict()
+        self._single_flight = SingleFlight()
+
+        self.loads = 0
+        self.incremental_loads = 0
+        self.hits = 0
+        self.misses = 0
+
+    async def _campaigns(self, customer_id: str) -> Dict[str, Dict]:
+        entry = self._customers.get(customer_id)
+        if entry is not None and entry[1] > time.monotonic():
+            self._customers.move_to_end(customer_id)
+            return entry[0]
+        return await self._single_flight.do(customer_id, lambda: self._load(customer_id))
+
+    async def _load(self, customer_id: str) -> Dict[str, Dict]:
+        campaigns = await self._loader(customer_id, None)
+        self.loads += 1
+        self._customers[customer_id] = (campaigns, time.monotonic() + self.ttl)
+        self._customers.move_to_end(customer_id)
+        while len(self._customers) > self.max_customers:
+            self._customers.popitem(last=False)
+        logger.info(f"Indexed {len(campaigns)} campaigns for customer {customer_id}")
+        return campaigns
+
+    async def get(self, customer_id: str, campaign_id: str) -> Optional[Dict]:
+        """
+        Return metadata for one campaign, or None if it does not exist
+
+        Args:
+            customer_id: The customer ID that owns the campaign
+            campaign_id: The campaign ID
+        """
+        found = await self.get_many(customer_id, [campaign_id])
+        return found.get(str(campaign_id))
+
+    async def get_many(self, customer_id: str, campaign_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Return metadata for several campaigns; IDs that do not exist are left out
+
+        Args:
+            customer_id: The customer ID that owns the campaigns
+            campaign_ids: Campaign IDs to resolve
+        """
+        customer_id = str(customer_id)
+        campaigns = await self._campaigns(customer_id)
+        found: Dict[str, Dict] = {}
+        missing: List[str] = []
+        for campaign_id in dict.fromkeys(str(cid) for cid in campaign_ids):
+            campaign = campaigns.get(campaign_id)
+            if campaign is None:
+                missing.append(campaign_id)
+            else:
+                found[campaign_id] = campaign
+        self.hits += len(found)
+
+        if missing:
+            # Campaigns created after the index was built: fetch and add just those
+            self.misses += len(missing)
+            self.incremental_loads += 1
+            added = await self._loader(customer_id, missing)
+            campaigns.update(added)
+            found.update(added)
+        return found
+
+    def update(self, customer_id: str, campaign_id: str, **fields) -> None:
+        """Apply a successful mutation to an indexed campaign"""
+        entry = self._customers.get(str(customer_id))
+        if entry is not None and str(campaign_id) in entry[0]:
+            entry[0][str(campaign_id)].update(fields)
+
+    def invalidate(self, customer_id: str) -> None:
+        self._customers.pop(str(customer_id), None)
+
+    def stats(self) -> Dict:
+        return {
+            "customers": len(self._customers),
+            "campaigns": sum(len(campaigns) for campaigns, _ in self._customers.values()),
+            "loads": self.loads,
+            "incremental_loads": self.incremental_loads,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
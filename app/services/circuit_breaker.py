@@ -0,0 +1,144 @@
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator
+import logging
+import time
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream target whose circuit is open"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"circuit {name} is open, retry in {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+class _Attempt:
+    """One guarded call; succeeded() settles it early (e.g. once a stream's headers arrive)"""
+
+    __slots__ = ("breaker", "probe", "settled")
+
+    def __init__(self, breaker: "CircuitBreaker", probe: bool):
+        self.breaker = breaker
+        self.probe = probe
+        self.settled = False
+
+    def succeeded(self) -> None:
+        if not self.settled:
+            self.settled = True
+            self.breaker._on_success(self.probe)
+
+    def failed(self) -> None:
+        if not self.settled:
+            self.settled = True
+            self.breaker._on_failure(self.probe)
+
+    def abandoned(self) -> None:
+        if not self.settled:
+            self.settled = True
+            self.breaker._on_abandoned(self.probe)
+
+class CircuitBreaker:
+    """
+    Circuit breaker for one upstream target (e.g. the Ads API or the OAuth endpoint).
+
+    After `failure_threshold` consecutive failures the circuit opens and calls are
+    rejected with CircuitOpenError without touching the network. Once `reset_timeout`
+    seconds have passed, one probe call is let through (half-open): its success
+    closes the circuit, its failure opens it for another `reset_timeout`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        is_failure: Callable[[BaseException], bool],
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        enabled: bool = True,
+    ):
+        self.name = name
+        self.is_failure = is_failure
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.enabled = enabled
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+        self.rejected = 0
+        self.opened = 0
+
+    def _admit(self) -> bool:
+        """Let a call through or raise CircuitOpenError; returns whether the call is the half-open probe"""
+        if not self.enabled or self.state == CLOSED:
+            return False
+        retry_after = self._opened_at + self.reset_timeout - time.monotonic()
+        if self.state == OPEN and retry_after <= 0:
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN and not self._probing:
+            self._probing = True
+            logger.info(f"Circuit {self.name} half-open, probing")
+            return True
+        self.rejected += 1
+        raise CircuitOpenError(self.name, max(retry_after, 1.0))
+
+    @contextmanager
+    def guard(self) -> Iterator[_Attempt]:
+        """
+        Guard one upstream call
+
+        The call fails if it raises an exception accepted by is_failure; any other
+        exception or a normal exit counts as success. Cancellation settles nothing.
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        attempt = _Attempt(self, self._admit())
+        try:
+            yield attempt
+        except BaseException as e:
+            if isinstance(e, Exception) and self.is_failure(e):
+                attempt.failed()
+            elif isinstance(e, Exception):
+                attempt.succeeded()
+            else:  # CancelledError / GeneratorExit: the caller went away
+                attempt.abandoned()
+            raise
+        attempt.succeeded()
+
+    def _on_success(self, probe: bool) -> None:
+        self._failures = 0
+        if probe:
+            self._probing = False
+        if self.state != CLOSED:
+            logger.info(f"Circuit {self.name} closed")
+            self.state = CLOSED
+
+    def _on_failure(self, probe: bool) -> None:
+        self._failures += 1
+        if probe:
+            self._probing = False
+        if self.state == HALF_OPEN or (self.state == CLOSED and self._failures >= self.failure_threshold):
+            logger.warning(f"Circuit {self.name} opened after {self._failures} consecutive failures")
+            self.state = OPEN
+            self._opened_at = time.monotonic()
+            self.opened += 1
+
+    def _on_abandoned(self, probe: bool) -> None:
+        if probe:
+            self._probing = False
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,74 @@
+import asyncio
+import logging
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+class CancelOnDisconnectMiddleware:
+    """
+    ASGI middleware cancelling a request's handler when its client disconnects
+
+    Starlette keeps running a handler after the client has gone away, so a client
+    that gives up on a slow upstream call would still hold that call (and a worker
+    slot) until it finishes. The request body is read up front and replayed to the
+    app, which leaves this middleware free to wait for http.disconnect and cancel
+    the handler, and with it the pending upstream calls. Work running after the
+    response was fully sent (background tasks) is left alone.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.cancelled = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Buffer the request body so only the watcher below reads from receive()
+        body_messages = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            body_messages.append(message)
+            if not message.get("more_body", False):
+                break
+
+        disconnected = asyncio.Event()
+        response_complete = False
+
+        async def replay_receive():
+            if body_messages:
+                return body_messages.pop(0)
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send_wrapper(message):
+            nonlocal response_complete
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                response_complete = True
+            await send(message)
+
+        async def watch_disconnect():
+            while (await receive())["type"] != "http.disconnect":
+                pass
+            disconnected.set()
+
+        handler = asyncio.ensure_future(self.app(scope, replay_receive, send_wrapper))
+        watcher = asyncio.ensure_future(watch_disconnect())
+        try:
+            await asyncio.wait({handler, watcher}, return_when=asyncio.FIRST_COMPLETED)
+            if not handler.done() and not response_complete:
+                self.cancelled += 1
+                logger.info(f"Client disconnected, cancelling {scope['method']} {scope['path']}")
+                handler.cancel()
+            try:
+                await handler
+            except asyncio.CancelledError:
+                if not disconnected.is_set():
+                    raise  # the server itself is cancelling this request
+        finally:
+            watcher.cancel()
+            if not handler.done():
+                handler.cancel()
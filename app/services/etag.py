@@ -0,0 +1,69 @@
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import hashlib
+
+from .json_codec import dumps
+
+def strong_etag(body: bytes) -> str:
+    """Strong entity tag from a content hash of the encoded body"""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Evaluate an If-None-Match header against an entity tag
+
+    Uses the weak comparison RFC 9110 prescribes for If-None-Match, so W/"..." from
+    intermediaries that weakened the tag still matches.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any((tag[2:] if tag.startswith("W/") else tag) == etag for tag in candidates)
+
+class EncodedBodies:
+    """
+    Memo of encoded JSON bodies and their ETags for recently served result objects.
+
+    Cached results are shared, immutable objects, so a poller hitting the response
+    cache gets the same object back; keyed by identity, its body and ETag are then
+    reused without serializing or hashing again. Entries keep a reference to the
+    object so its id cannot be reused while memoized. Bounded by entries and bytes.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[int, Tuple[Any, bytes, str]]" = OrderedDict()
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    def encode(self, value: Any) -> Tuple[bytes, str]:
+        """
+        Return (body, etag) for a value, reusing the memoized encoding of the same object
+
+        Args:
+            value: Result object; must not be mutated after it is served
+        """
+        entry = self._entries.get(id(value))
+        if entry is not None and entry[0] is value:
+            self._entries.move_to_end(id(value))
+            self.hits += 1
+            return entry[1], entry[2]
+
+        self.misses += 1
+        body = dumps(value)
+        etag = strong_etag(body)
+        if len(body) <= self.max_bytes:
+            self._entries[id(value)] = (value, body, etag)
+            self._bytes += len(body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted, _) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+        return body, etag
+
+    def stats(self) -> Dict:
+        return {"entries": len(self._entries), "bytes": self._bytes, "hits": self.hits, "misses": self.misses}
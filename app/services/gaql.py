@@ -0,0 +1,218 @@
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import re
+
+class GaqlError(ValueError):
+    """Raised for a parameter or field that cannot be put into a GAQL query"""
+
+_ID = re.compile(r"^\d+$")
+_RESOURCE_NAME = re.compile(r"^customers/\d+/\w+/[\w~-]+$")
+
+CAMPAIGN_STATUSES = frozenset({"ENABLED", "PAUSED", "REMOVED"})
+
+# Date range literals accepted by GAQL's DURING operator
+DATE_LITERALS = frozenset({
+    "TODAY", "YESTERDAY", "LAST_7_DAYS", "LAST_14_DAYS", "LAST_30_DAYS", "LAST_BUSINESS_WEEK",
+    "THIS_MONTH", "LAST_MONTH", "THIS_WEEK_SUN_TODAY", "THIS_WEEK_MON_TODAY", "LAST_WEEK_SUN_SAT",
+    "LAST_WEEK_MON_SUN",
+})
+
+# Explicit range accepted in place of a GAQL date literal, e.g. 2025-01-01:2025-03-31
+_EXPLICIT_RANGE = re.compile(r"^(\d{4}-\d{2}-\d{2}):(\d{4}-\d{2}-\d{2})$")
+_LAST_N_DAYS = re.compile(r"^LAST_(\d+)_DAYS$")
+
+def resolve_date_range(date_range: str, today: Optional[date] = None) -> Optional[Tuple[date, date]]:
+    """
+    Resolve a GAQL date range literal (or an explicit start:end range) to inclusive dates
+
+    Args:
+        date_range: e.g. TODAY, YESTERDAY, LAST_30_DAYS, LAST_MONTH or 2025-01-01:2025-01-31
+        today: Reference date (defaults to the local date)
+
+    Returns:
+        Optional[Tuple[date, date]]: (start, end), or None when the literal is not supported
+    """
+    today = today or date.today()
+    explicit = _EXPLICIT_RANGE.match(date_range)
+    if explicit:
+        start, end = date.fromisoformat(explicit.group(1)), date.fromisoformat(explicit.group(2))
+        return (start, end) if start <= end else None
+
+    last_n = _LAST_N_DAYS.match(date_range)
+    if last_n:
+        # LAST_N_DAYS excludes today, like the Google Ads literals
+        days = int(last_n.group(1))
+        return today - timedelta(days=days), today - timedelta(days=1)
+
+    if date_range == "TODAY":
+        return today, today
+    if date_range == "YESTERDAY":
+        yesterday = today - timedelta(days=1)
+        return yesterday, yesterday
+    if date_range == "THIS_MONTH":
+        return today.replace(day=1), today
+    if date_range == "LAST_MONTH":
+        last_day = today.replace(day=1) - timedelta(days=1)
+        return last_day.replace(day=1), last_day
+    if date_range == "THIS_WEEK_MON_TODAY":
+        return today - timedelta(days=today.weekday()), today
+    if date_range == "LAST_WEEK_MON_SUN":
+        monday = today - timedelta(days=today.weekday() + 7)
+        return monday, monday + timedelta(days=6)
+    if date_range == "LAST_BUSINESS_WEEK":
+        monday = today - timedelta(days=today.weekday() + 7)
+        return monday, monday + timedelta(days=4)
+    return None
+
+# Validated conditions
+
+def ids_condition(field: str, ids: Iterable[str]) -> str:
+    """field IN (...) for numeric IDs"""
+    values = [str(value).strip() for value in ids]
+    invalid = [value for value in values if not _ID.match(value)]
+    if invalid:
+        raise GaqlError(f"Invalid ID(s): {', '.join(invalid)}")
+    if not values:
+        raise GaqlError("At least one ID is required")
+    return f"{field} IN ({', '.join(values)})"
+
+def resource_names_condition(field: str, names: Iterable[str]) -> str:
+    """field IN ('customers/...', ...) for resource names"""
+    values = list(names)
+    invalid = [value for value in values if not _RESOURCE_NAME.match(value)]
+    if invalid:
+        raise GaqlError(f"Invalid resource name(s): {', '.join(invalid)}")
+    return f"{field} IN ({', '.join(repr(value) for value in values)})"
+
+def status_condition(status: str) -> str:
+    """campaign.status = '...' for a known campaign status"""
+    value = status.strip().upper()
+    if value not in CAMPAIGN_STATUSES:
+        raise GaqlError(f"Invalid status: {status}. Valid statuses are: {', '.join(sorted(CAMPAIGN_STATUSES))}")
+    return f"campaign.status = '{value}'"
+
+def date_condition(date_range: str) -> str:
+    """segments.date DURING a GAQL literal, or BETWEEN for other resolvable ranges (e.g. LAST_90_DAYS, start:end)"""
+    if date_range in DATE_LITERALS:
+        return f"segments.date DURING {date_range}"
+    bounds = resolve_date_range(date_range)
+    if bounds is None:
+        raise GaqlError(f"Invalid date range: {date_range}")
+    return f"segments.date BETWEEN '{bounds[0].isoformat()}' AND '{bounds[1].isoformat()}'"
+
+# Templates
+
+def _response_path(field: str) -> Tuple[str, ...]:
+    """campaign_budget.amount_micros -> ("campaignBudget", "amountMicros"), as the REST API names them"""
+    def camel(name: str) -> str:
+        head, *rest = name.split("_")
+        return head + "".join(part.title() for part in rest)
+    return tuple(camel(part) for part in field.split("."))
+
+# (GAQL field, output key or None if only selected, converter of the raw value)
+Column = Tuple[str, Optional[str], Callable[[Any], Any]]
+
+class QueryTemplate:
+    """
+    Precompiled GAQL query over one resource.
+
+    The column list, SELECT clause and fixed conditions are built once; build() only
+    appends validated conditions. Callers may project a subset of the output columns
+    (by GAQL field or output key), and projector() returns a row transform for it.
+    """
+
+    def __init__(self, resource: str, columns: Sequence[Column], conditions: Sequence[str] = (), required: Sequence[str] = ()):
+        self.resource = resource
+        self.columns: Dict[str, Tuple[Optional[str], Callable[[Any], Any]]] = {
+            field: (output, convert) for field, output, convert in columns
+        }
+        self.default_fields = tuple(self.columns)
+        self.required = tuple(required)
+        self.conditions = tuple(conditions)
+        self._by_output = {output: field for field, (output, _) in self.columns.items() if output}
+        self._selects: Dict[Tuple[str, ...], str] = {}
+        self._projectors: Dict[Tuple[str, ...], Callable[[Dict], Dict]] = {}
+        self._select(self.default_fields)
+
+    def fields(self, requested: Optional[Iterable[str]]) -> Tuple[str, ...]:
+        """
+        Resolve a requested projection to GAQL fields (required fields first)
+
+        Args:
+            requested: GAQL fields or output keys, or None for every column
+
+        Raises:
+            GaqlError: If a field is not part of this template
+        """
+        if not requested:
+            return self.default_fields
+        fields = list(self.required)
+        for name in requested:
+            name = name.strip()
+            field = name if name in self.columns else self._by_output.get(name)
+            if field is None or self.columns[field][0] is None:
+                valid = ", ".join(field for field, (output, _) in self.columns.items() if output)
+                raise GaqlError(f"Unknown field: {name}. Valid fields are: {valid}")
+            if field not in fields:
+                fields.append(field)
+        return tuple(fields)
+
+    def _select(self, fields: Tuple[str, ...]) -> str:
+        select = self._selects.get(fields)
+        if select is None:
+            select = f"SELECT {', '.join(fields)} FROM {self.resource}"
+            self._selects[fields] = select
+        return select
+
+    def build(self, fields: Optional[Tuple[str, ...]] = None, conditions: Sequence[str] = (), order_by: Optional[str] = None, limit: Optional[int] = None) -> str:
+        """
+        Render the query for a projection plus validated conditions
+
+        Args:
+            fields: Result of fields(), or None for every column
+            conditions: Conditions built by the *_condition helpers
+            order_by: Optional ORDER BY clause body
+            limit: Optional LIMIT
+        """
+        query = self._select(fields or self.default_fields)
+        where = self.conditions + tuple(conditions)
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        if order_by:
+            query += f" ORDER BY {order_by}"
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        return query
+
+    def output_keys(self, fields: Tuple[str, ...]) -> List[str]:
+        return [self.columns[field][0] for field in fields if self.columns[field][0]]
+
+    def projector(self, fields: Tuple[str, ...]) -> Callable[[Dict], Dict]:
+        """Row transform producing only the output keys of the projected fields"""
+        projector = self._projectors.get(fields)
+        if projector is not None:
+            return projector
+
+        # Runs of columns from the same message, as (message, ((output key, leaf, converter), ...)),
+        # so a message is looked up once per run while keys keep the projection's order
+        runs: List[Tuple[str, List[Tuple[str, str, Callable[[Any], Any]]]]] = []
+        for field in fields:
+            output, convert = self.columns[field]
+            if output:
+                parent, leaf = _response_path(field)
+                if not runs or runs[-1][0] != parent:
+                    runs.append((parent, []))
+                runs[-1][1].append((output, leaf, convert))
+        getters = tuple((parent, tuple(columns)) for parent, columns in runs)
+        empty: Dict = {}
+
+        def project(item: Dict) -> Dict:
+            row = {}
+            for parent, columns in getters:
+                message = item.get(parent, empty)
+                for output, leaf, convert in columns:
+                    row[output] = convert(message.get(leaf))
+            return row
+
+        self._projectors[fields] = project
+        return project
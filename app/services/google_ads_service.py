@@ -1,13 +1,262 @@
-from typing import List, Dict, Any, Optional
+from datetime import date, timedelta
+from typing import List, Dict, Any, AsyncIterator, Callable, Optional, Tuple
+import asyncio
 import logging
+import math
 import os
+import re
 import ssl
+import time
 import aiohttp
 from fastapi import HTTPException
 
+from .gaql import (
+    GaqlError,
+    QueryTemplate,
+    date_condition,
+    ids_condition,
+    resolve_date_range,
+    resource_names_condition,
+    status_condition,
+)
+from .json_codec import dumps, dumps_text, loads
+from .metrics import Family, connection_trace_config, observe_upstream, pool_connections, upstream_endpoint_type
+from .performance_aggregation import PerformanceAggregator, aggregation_query
+from .performance_store import PerformanceStore
+from .rate_limiter import RETRYABLE_STATUSES, RateLimiter, backoff_delay, retry_hint
+from .report_jobs import JobQueueFull, ProgressCallback, ReportJobs
+from .response_cache import ResponseCache, normalize_query
+from .account_tree import AccountTree
+from .batch_jobs import BatchJobs
+from .budget_writes import BudgetWriteQueue
+from .campaign_index import CampaignIndex
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .shared_state import shared_state_from_url
+from .single_flight import SingleFlight
+from .stream_parser import JsonArrayStreamParser
+from .token_manager import TokenManager
+from .transforms import (
+    BID_STRATEGY_ENUMS,
+    account_row,
+    bid_strategy_name,
+    campaign_row,
+    hierarchy_row,
+    micros,
+    performance_row,
+    text,
+    to_float,
+    to_int,
+)
+
 # Setup logger
 logger = logging.getLogger(__name__)
 
+# Query GAQL para obter contas de clientes
+_CLIENT_ACCOUNTS = QueryTemplate(
+    "customer_client",
+    [
+        ("customer_client.client_customer", "accountId", lambda value: text(value).split("/")[-1]),
+        ("customer_client.level", None, text),
+        ("customer_client.currency_code", "currencyCode", text),
+        ("customer_client.descriptive_name", "accountName", text),
+        ("customer_client.status", "status", text),
+    ],
+    conditions=["customer_client.manager = FALSE"],
+    required=["customer_client.client_customer"],
+)
+
+# Direct clients of one manager account (level 1) and the manager itself (level 0)
+_ACCOUNT_HIERARCHY = QueryTemplate(
+    "customer_client",
+    [
+        ("customer_client.client_customer", None, text),
+        ("customer_client.level", None, to_int),
+        ("customer_client.manager", None, bool),
+        ("customer_client.currency_code", None, text),
+        ("customer_client.descriptive_name", None, text),
+        ("customer_client.status", None, text),
+        ("customer_client.time_zone", None, text),
+    ],
+    conditions=["customer_client.level <= 1"],
+)
+
+# Campaign listing, with budget.amount_micros
+_CAMPAIGNS = QueryTemplate(
+    "campaign",
+    [
+        ("campaign.id", "campaignId", text),
+        ("campaign.name", "campaignName", text),
+        ("campaign.status", "status", text),
+        ("campaign.advertising_channel_type", "type", text),
+        ("campaign.bidding_strategy_type", "biddingStrategy", bid_strategy_name),
+        ("campaign_budget.amount_micros", "budget", micros),
+        ("campaign.campaign_budget", None, text),
+    ],
+    required=["campaign.id"],
+)
+
+_PERFORMANCE = QueryTemplate(
+    "campaign",
+    [
+        ("campaign.id", "campaignId", text),
+        ("campaign.name", "campaignName", text),
+        ("campaign.status", "status", text),
+        ("metrics.impressions", "impressions", to_int),
+        ("metrics.clicks", "clicks", to_int),
+        ("metrics.cost_micros", "cost", micros),
+        ("metrics.conversions", "conversions", to_float),
+        ("metrics.average_cpc", "averageCpc", micros),
+    ],
+    required=["campaign.id"],
+)
+
+# Campaign metadata kept in the campaign index
+_CAMPAIGN_METADATA = QueryTemplate(
+    "campaign",
+    [
+        ("campaign.id", None, text),
+        ("campaign.resource_name", None, text),
+        ("campaign.name", None, text),
+        ("campaign.status", None, text),
+        ("campaign.bidding_strategy_type", None, text),
+        ("campaign.campaign_budget", None, text),
+    ],
+)
+
+_CAMPAIGN_DETAILS = QueryTemplate(
+    "campaign",
+    [
+        ("campaign.id", None, text),
+        ("campaign.name", None, text),
+        ("campaign.status", None, text),
+        ("campaign.bidding_strategy_type", None, text),
+    ],
+)
+
+def _stream_error(error: Any) -> HTTPException:
+    """HTTPException for an error element sent partway through a searchStream response"""
+    code = error.get("code") if isinstance(error, dict) else None
+    status_code = code if isinstance(code, int) and 400 <= code < 600 else 502
+    detail = dumps_text(error)
+    logger.error(f"Error in search stream: {detail}")
+    return HTTPException(status_code=status_code, detail=f"Google Ads API error: {detail}")
+
+def _projection(template: QueryTemplate, fields: Optional[List[str]]) -> Optional[Tuple[str, ...]]:
+    """Validated GAQL fields for a requested projection, or None for the template's default columns"""
+    if not fields:
+        return None
+    try:
+        return template.fields(fields)
+    except GaqlError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _transform(template: QueryTemplate, fields: Optional[Tuple[str, ...]], default: Callable[[Dict], Dict]) -> Callable[[Dict], Dict]:
+    """Row transform for a projection; the hand-written default transform when there is none"""
+    return template.projector(fields) if fields else default
+
+def _campaigns_query(status_filter: Optional[str] = None, fields: Optional[Tuple[str, ...]] = None) -> str:
+    """Build the GAQL query used to list campaigns"""
+    try:
+        conditions = [status_condition(status_filter)] if status_filter else []
+        return _CAMPAIGNS.build(fields, conditions)
+    except GaqlError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _performance_query(
+    campaign_ids: Optional[List[str]] = None,
+    date_range: str = "LAST_30_DAYS",
+    fields: Optional[Tuple[str, ...]] = None,
+) -> str:
+    """Build the GAQL query used for campaign performance"""
+    try:
+        conditions = [date_condition(date_range)]
+        if campaign_ids:
+            conditions.append(ids_condition("campaign.id", campaign_ids))
+        return _PERFORMANCE.build(fields, conditions)
+    except GaqlError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# Change cursor: a date or a change_status / change_event timestamp, e.g. 2025-01-31 14:05:00.123456
+_CHANGE_CURSOR = re.compile(r"^\d{4}-\d{2}-\d{2}(?:[ T]\d{2}:\d{2}:\d{2}(?:\.\d{1,6})?)?$")
+
+# How far back change_status and change_event can be read, less a day for the account's time zone
+_CHANGE_STATUS_LOOKBACK_DAYS = 89
+_CHANGE_EVENT_LOOKBACK_DAYS = 29
+
+# Reports that can run as background jobs
+_REPORTS = ("campaigns", "campaign_performance", "performance_aggregate", "all_accounts_performance")
+
+def _validate_report_spec(spec: Dict) -> str:
+    """Check a report spec's name and required customer, returning the report name"""
+    report = spec.get("report")
+    if report not in _REPORTS:
+        raise HTTPException(status_code=400, detail=f"Invalid report: {report}. Valid reports are: {', '.join(_REPORTS)}")
+    if report != "all_accounts_performance" and not spec.get("customerId"):
+        raise HTTPException(status_code=400, detail=f"customerId is required for the {report} report")
+    return report
+
+_CUSTOMER_IN_ENDPOINT = re.compile(r"customers/(\d+)")
+
+def _is_upstream_failure(error: BaseException) -> bool:
+    """Whether an error means the upstream target is unhealthy (as opposed to rejecting the request)"""
+    if isinstance(error, HTTPException):
+        return error.status_code >= 500
+    return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError))
+
+async def _oauth_error(response: aiohttp.ClientResponse) -> HTTPException:
+    """401 for a token request the OAuth server rejected, with its error and description"""
+    try:
+        body = loads(await response.read())
+    except ValueError:
+        body = {}
+    if not isinstance(body, dict):
+        body = {}
+    error = body.get("error") or f"HTTP {response.status}"
+    description = body.get("error_description")
+    logger.error(f"Access token request rejected: {error} {description or ''}")
+    return HTTPException(
+        status_code=401,
+        detail=f"Google OAuth error: {error}: {description}" if description else f"Google OAuth error: {error}",
+    )
+
+def _circuit_open_error(error: CircuitOpenError) -> HTTPException:
+    """503 returned while an upstream circuit is open"""
+    return HTTPException(
+        status_code=503,
+        detail=f"Google Ads upstream unavailable ({error})",
+        headers={"Retry-After": str(int(math.ceil(error.retry_after)))},
+    )
+
+def _customer_from_endpoint(endpoint: str) -> Optional[str]:
+    """Extract the customer ID from an API endpoint path, if it has one"""
+    match = _CUSTOMER_IN_ENDPOINT.search(endpoint)
+    return match.group(1) if match else None
+
+def _partial_failure_errors(result: Dict) -> Dict[int, str]:
+    """
+    Map operation index to error message from a partialFailure mutate response
+    
+    Args:
+        result: Mutate response body
+        
+    Returns:
+        Dict[int, str]: Error messages keyed by the index of the failed operation
+    """
+    errors: Dict[int, str] = {}
+    failure = result.get("partialFailureError")
+    if not failure:
+        return errors
+    
+    for detail in failure.get("details", []):
+        for error in detail.get("errors", []):
+            for element in error.get("location", {}).get("fieldPathElements", []):
+                if element.get("fieldName") == "operations" and "index" in element:
+                    index = int(element["index"])
+                    message = error.get("message", "Unknown error")
+                    errors[index] = f"{errors[index]}; {message}" if index in errors else message
+                    break
+    return errors
+
 class GoogleAdsService:
     def __init__(self):
         # Load environment variables
@@ -17,64 +266,424 @@ class GoogleAdsService:
         self.developer_token = os.getenv("GOOGLE_ADS_DEVELOPER_TOKEN")
         self.login_customer_id = os.getenv("GOOGLE_ADS_LOGIN_CUSTOMER_ID")
         
-        # Base API URL
-        self.base_url = "https://googleads.googleapis.com/v17"
-        
-        # Access token (will be obtained on first request)
-        self.access_token = None
+        # Base API and OAuth URLs (overridable to point at a local stand-in, see benchmarks/)
+        self.base_url = os.getenv("GOOGLE_ADS_API_BASE_URL", "https://googleads.googleapis.com/v17").rstrip("/")
+        self.token_url = os.getenv("GOOGLE_ADS_TOKEN_URL", "https://oauth2.googleapis.com/token")
         
         # Validate required fields
         if not all([self.client_id, self.client_secret, self.refresh_token, self.developer_token, self.login_customer_id]):
             logger.error("Missing required Google Ads API credentials")
             raise ValueError("Missing required Google Ads API credentials")
+        
+        # Seconds before expiry at which the access token is refreshed (see token_manager below)
+        token_refresh_margin = float(os.getenv("GOOGLE_ADS_TOKEN_REFRESH_MARGIN", "300"))
 
         # API version
         self.api_version = 17
         
-    async def _get_access_token(self) -> str:
-        """Get access token using refresh token"""
-        logger.info("Getting access token")
+        # Shared HTTP connection pool settings (see start/close)
+        self.pool_size = int(os.getenv("GOOGLE_ADS_HTTP_POOL_SIZE", "100"))
+        self.pool_size_per_host = int(os.getenv("GOOGLE_ADS_HTTP_POOL_PER_HOST", "50"))
+        self.dns_cache_ttl = int(os.getenv("GOOGLE_ADS_DNS_CACHE_TTL", "300"))
+        self.keepalive_timeout = float(os.getenv("GOOGLE_ADS_KEEPALIVE_TIMEOUT", "60"))
+        self._session: Optional[aiohttp.ClientSession] = None
         
-        token_url = "https://oauth2.googleapis.com/token"
+        # Per-call deadlines by endpoint type (see metrics.upstream_endpoint_type); streams
+        # are bounded by the gap between chunks rather than their total duration
+        connect_timeout = float(os.getenv("GOOGLE_ADS_TIMEOUT_CONNECT", "10"))
         
-        # Create SSL context that doesn't verify certificates for development
-        ssl_context = ssl.create_default_context()
-        ssl_context.check_hostname = False
-        ssl_context.verify_mode = ssl.CERT_NONE
+        def call_timeout(name: str, default: str) -> aiohttp.ClientTimeout:
+            return aiohttp.ClientTimeout(total=float(os.getenv(name, default)), connect=connect_timeout)
         
-        # Create a client session with the SSL context
-        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=ssl_context)) as session:
-            payload = {
-                "client_id": self.client_id,
-                "client_secret": self.client_secret,
-                "refresh_token": self.refresh_token,
-                "grant_type": "refresh_token"
-            }
-            
+        self.timeouts: Dict[str, aiohttp.ClientTimeout] = {
+            "oauth_token": call_timeout("GOOGLE_ADS_TIMEOUT_OAUTH", "15"),
+            "search": call_timeout("GOOGLE_ADS_TIMEOUT_SEARCH", "60"),
+            "search_stream": aiohttp.ClientTimeout(
+                total=None,
+                connect=connect_timeout,
+                sock_read=float(os.getenv("GOOGLE_ADS_TIMEOUT_STREAM_READ", "60")),
+            ),
+            "mutate": call_timeout("GOOGLE_ADS_TIMEOUT_MUTATE", "120"),
+            "other": call_timeout("GOOGLE_ADS_TIMEOUT_OTHER", "60"),
+        }
+        
+        # Circuit breakers per upstream target: fail fast with 503 while a target is down
+        breaker_enabled = os.getenv("GOOGLE_ADS_BREAKER_ENABLED", "true").lower() == "true"
+        breaker_threshold = int(os.getenv("GOOGLE_ADS_BREAKER_FAILURE_THRESHOLD", "5"))
+        breaker_reset = float(os.getenv("GOOGLE_ADS_BREAKER_RESET_TIMEOUT", "30"))
+        self.breakers: Dict[str, CircuitBreaker] = {
+            name: CircuitBreaker(name, _is_upstream_failure, breaker_threshold, breaker_reset, breaker_enabled)
+            for name in ("ads_api", "oauth")
+        }
+        
+        # Bulk mutation settings (operations per mutate request, concurrent mutate requests)
+        self.mutate_batch_size = int(os.getenv("GOOGLE_ADS_MUTATE_BATCH_SIZE", "5000"))
+        self.bulk_concurrency = int(os.getenv("GOOGLE_ADS_BULK_CONCURRENCY", "5"))
+        
+        # Optional write coalescing for single budget updates (window of 0 sends them right away)
+        self.budget_writes = BudgetWriteQueue(
+            self._flush_budget_writes,
+            window=float(os.getenv("GOOGLE_ADS_BUDGET_WRITE_WINDOW", "0")),
+            max_batch=self.mutate_batch_size,
+            result_ttl=float(os.getenv("GOOGLE_ADS_BUDGET_WRITE_RESULT_TTL", "3600")),
+        )
+        
+        # Maximum number of items accepted by one /batch call
+        self.batch_max_items = int(os.getenv("GOOGLE_ADS_BATCH_MAX_ITEMS", "100"))
+        
+        # Default number of accounts queried at once by cross-account fan-out
+        self.fanout_concurrency = int(os.getenv("GOOGLE_ADS_FANOUT_CONCURRENCY", "20"))
+        
+        # Manager account hierarchy, crawled concurrently and refreshed in the background
+        self.account_tree = AccountTree(
+            self.login_customer_id,
+            self._load_account_children,
+            ttl=float(os.getenv("GOOGLE_ADS_ACCOUNT_TREE_TTL", "3600")),
+            refresh_interval=float(os.getenv("GOOGLE_ADS_ACCOUNT_TREE_REFRESH_INTERVAL", "1800")),
+            concurrency=int(os.getenv("GOOGLE_ADS_ACCOUNT_TREE_CONCURRENCY", "10")),
+        )
+        
+        # Parsed GAQL result cache (TTL per resource type, LRU by entries and bytes)
+        self.cache = ResponseCache(
+            ttls={
+                "accounts": float(os.getenv("GOOGLE_ADS_CACHE_TTL_ACCOUNTS", "3600")),
+                "campaigns": float(os.getenv("GOOGLE_ADS_CACHE_TTL_CAMPAIGNS", "300")),
+                "performance": float(os.getenv("GOOGLE_ADS_CACHE_TTL_PERFORMANCE", "300")),
+            },
+            max_entries=int(os.getenv("GOOGLE_ADS_CACHE_MAX_ENTRIES", "1000")),
+            max_bytes=int(os.getenv("GOOGLE_ADS_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+            enabled=os.getenv("GOOGLE_ADS_CACHE_ENABLED", "true").lower() == "true",
+        )
+        
+        # Coalesces identical in-flight read queries into one upstream call
+        self.single_flight = SingleFlight(enabled=os.getenv("GOOGLE_ADS_COALESCE_ENABLED", "true").lower() == "true")
+        
+        # Campaign ID -> resource names, name and bidding strategy, shared by the mutation paths
+        self.campaign_index = CampaignIndex(
+            self._lookup_campaigns,
+            ttl=float(os.getenv("GOOGLE_ADS_CAMPAIGN_INDEX_TTL", "900")),
+        )
+        
+        # Optional local store of daily campaign metrics answering date-range reports
+        store_path = os.getenv("GOOGLE_ADS_PERFORMANCE_STORE_PATH")
+        self.performance_store = PerformanceStore(store_path) if store_path else None
+        self.performance_sync_interval = float(os.getenv("GOOGLE_ADS_PERFORMANCE_SYNC_INTERVAL", "900"))
+        self.performance_backfill_days = int(os.getenv("GOOGLE_ADS_PERFORMANCE_BACKFILL_DAYS", "90"))
+        self.performance_settle_days = int(os.getenv("GOOGLE_ADS_PERFORMANCE_SETTLE_DAYS", "3"))
+        self._performance_sync_task: Optional[asyncio.Task] = None
+        
+        # Background workers for long-running report jobs
+        self.report_jobs = ReportJobs(
+            self._run_report,
+            workers=int(os.getenv("GOOGLE_ADS_REPORT_WORKERS", "2")),
+            max_queued=int(os.getenv("GOOGLE_ADS_REPORT_QUEUE_SIZE", "100")),
+            result_ttl=float(os.getenv("GOOGLE_ADS_REPORT_RESULT_TTL", "3600")),
+        )
+        
+        # BatchJobService pipeline for very large mutation sets
+        self.batch_jobs = BatchJobs(
+            self._make_request,
+            mutate=self._send_request_once,
+            on_change=self._on_batch_job_change,
+            workers=int(os.getenv("GOOGLE_ADS_BATCH_JOB_WORKERS", "2")),
+            chunk_size=int(os.getenv("GOOGLE_ADS_BATCH_JOB_CHUNK_SIZE", "5000")),
+            poll_initial=float(os.getenv("GOOGLE_ADS_BATCH_JOB_POLL_INITIAL", "2")),
+            poll_max=float(os.getenv("GOOGLE_ADS_BATCH_JOB_POLL_MAX", "60")),
+            poll_timeout=float(os.getenv("GOOGLE_ADS_BATCH_JOB_TIMEOUT", "21600")),
+            result_ttl=float(os.getenv("GOOGLE_ADS_BATCH_JOB_RESULT_TTL", "86400")),
+        )
+        
+        # Client-side rate limiting (per developer token and per customer) and retry policy
+        self.rate_limiter = RateLimiter(
+            rate=float(os.getenv("GOOGLE_ADS_RATE_LIMIT_QPS", "20")),
+            burst=float(os.getenv("GOOGLE_ADS_RATE_LIMIT_BURST", "40")),
+            customer_rate=float(os.getenv("GOOGLE_ADS_CUSTOMER_RATE_LIMIT_QPS", "5")),
+            customer_burst=float(os.getenv("GOOGLE_ADS_CUSTOMER_RATE_LIMIT_BURST", "10")),
+            enabled=os.getenv("GOOGLE_ADS_RATE_LIMIT_ENABLED", "true").lower() == "true",
+        )
+        self.max_retries = int(os.getenv("GOOGLE_ADS_MAX_RETRIES", "4"))
+        self.retry_base_delay = float(os.getenv("GOOGLE_ADS_RETRY_BASE_DELAY", "0.5"))
+        self.retry_max_delay = float(os.getenv("GOOGLE_ADS_RETRY_MAX_DELAY", "30"))
+        
+        # SSL context that doesn't verify certificates for development (token endpoint only)
+        self._token_ssl_context = ssl.create_default_context()
+        self._token_ssl_context.check_hostname = False
+        self._token_ssl_context.verify_mode = ssl.CERT_NONE
+        
+        # Optional state shared by all worker processes (token, rate-limit buckets, read cache).
+        # Opened last, once every other setting has been read and checked, so a configuration
+        # error cannot leave the SQLite file or Redis client open.
+        self.shared_state = shared_state_from_url(os.getenv("GOOGLE_ADS_SHARED_STATE_URL"))
+        self.cache.shared = self.shared_state
+        self.rate_limiter.shared = self.shared_state
+        
+        # Access token cache (token is obtained on first request and refreshed before expiry)
+        self.token_manager = TokenManager(
+            self._fetch_shared_access_token if self.shared_state is not None else self._fetch_access_token,
+            refresh_margin=token_refresh_margin,
+        )
+        
+    async def start(self) -> None:
+        """Open the shared HTTP connection pool used for all upstream calls."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                limit_per_host=self.pool_size_per_host,
+                ttl_dns_cache=self.dns_cache_ttl,
+                keepalive_timeout=self.keepalive_timeout,
+                enable_cleanup_closed=True,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector, json_serialize=dumps_text, trace_configs=[connection_trace_config()]
+            )
+            logger.info(
+                f"Opened HTTP pool (limit={self.pool_size}, per_host={self.pool_size_per_host}, "
+                f"dns_ttl={self.dns_cache_ttl}s, keepalive={self.keepalive_timeout}s)"
+            )
+        self.report_jobs.start()
+        self.account_tree.start()
+        if self.performance_store is not None and self._performance_sync_task is None:
+            self._performance_sync_task = asyncio.ensure_future(self._performance_sync_loop())
+
+    async def close(self) -> None:
+        """Flush queued budget writes, stop background jobs and close the shared HTTP connection pool."""
+        await self.budget_writes.close()
+        await self.report_jobs.close()
+        await self.batch_jobs.close()
+        await self.account_tree.close()
+        if self._performance_sync_task is not None:
+            self._performance_sync_task.cancel()
             try:
-                async with session.post(token_url, data=payload) as response:
-                    response_json = await response.json()
+                await self._performance_sync_task
+            except asyncio.CancelledError:
+                pass
+            self._performance_sync_task = None
+        if self.performance_store is not None:
+            self.performance_store.close()
+            self.performance_store = None
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.info("Closed HTTP pool")
+        self._session = None
+        if self.shared_state is not None:
+            await self.shared_state.close()
+            self.shared_state = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared session, opening it lazily if the service was not started."""
+        if self._session is None or self._session.closed:
+            await self.start()
+        return self._session
+
+    @property
+    def access_token(self) -> Optional[str]:
+        """Currently cached access token, if any"""
+        return self.token_manager.token
+
+    async def _get_access_token(self) -> str:
+        """Get a valid access token from the cache, refreshing it if needed"""
+        return await self.token_manager.get_token()
+
+    async def _fetch_access_token(self) -> Tuple[str, float]:
+        """Exchange the refresh token for a new access token and its lifetime in seconds"""
+        logger.info("Getting access token")
+        
+        session = await self._get_session()
+        payload = {
+            "client_id": self.client_id,
+            "client_secret": self.client_secret,
+            "refresh_token": self.refresh_token,
+            "grant_type": "refresh_token"
+        }
+        
+        started = time.perf_counter()
+        status = "error"
+        try:
+            with self.breakers["oauth"].guard():
+                async with session.post(
+                    self.token_url, data=payload, ssl=self._token_ssl_context, timeout=self.timeouts["oauth_token"]
+                ) as response:
+                    status = response.status
+                    if response.status >= 500:
+                        raise await self._error_from_response(response)
+                    if response.status >= 400:
+                        # Rejected credentials (e.g. invalid_grant for a revoked refresh token) are a
+                        # request error: surface them as-is and leave the oauth circuit closed
+                        raise await _oauth_error(response)
+                    response_json = loads(await response.read())
                     if "access_token" not in response_json:
                         logger.error(f"Failed to get access token: {response_json}")
                         raise HTTPException(status_code=500, detail="Failed to authenticate with Google Ads API")
                         
-                    return response_json["access_token"]
-            except Exception as e:
-                logger.error(f"Error getting access token: {str(e)}")
-                raise HTTPException(status_code=500, detail=f"Error authenticating: {str(e)}")
+                    return response_json["access_token"], float(response_json.get("expires_in", 3600))
+        except CircuitOpenError:
+            status = "circuit_open"
+            raise
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error getting access token: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Error authenticating: {str(e)}")
+        finally:
+            observe_upstream("oauth_token", status, None, started)
+    
+    async def _fetch_shared_access_token(self) -> Tuple[str, float]:
+        """
+        Get the access token through the shared state so every worker uses one token
+        
+        A token stored by another worker is reused while it outlives the refresh margin
+        and differs from the one this worker holds (which is expiring or was rejected);
+        otherwise one worker at a time refreshes it under a shared lock.
+        """
+        async def stored_token() -> Optional[Tuple[str, float]]:
+            payload = await self.shared_state.get("oauth:access-token")
+            if payload is None:
+                return None
+            entry = loads(payload)
+            expires_in = entry["expiresAt"] - time.time()
+            if entry["token"] == self.token_manager.token or expires_in <= self.token_manager.refresh_margin:
+                return None
+            return entry["token"], expires_in
+        
+        found = await stored_token()
+        if found is not None:
+            return found
+        async with self.shared_state.lock("oauth:refresh", ttl=60):
+            found = await stored_token()
+            if found is not None:
+                return found
+            token, expires_in = await self._fetch_access_token()
+            entry = {"token": token, "expiresAt": time.time() + expires_in}
+            await self.shared_state.set("oauth:access-token", dumps(entry), expires_in)
+            return token, expires_in
+    
+    def stats(self) -> Dict:
+        """Runtime statistics for the token cache, response cache, coalescing, rate limiter, campaign index, jobs, budget writes and circuit breakers"""
+        return {
+            "token": self.token_manager.stats(),
+            "cache": self.cache.stats(),
+            "coalescing": self.single_flight.stats(),
+            "rate_limiter": self.rate_limiter.stats(),
+            "campaign_index": self.campaign_index.stats(),
+            "report_jobs": self.report_jobs.stats(),
+            "account_tree": self.account_tree.stats(),
+            "budget_writes": self.budget_writes.stats(),
+            "batch_jobs": self.batch_jobs.stats(),
+            "circuit_breakers": {name: breaker.stats() for name, breaker in self.breakers.items()},
+        }
+    
+    def metrics_families(self) -> List[Family]:
+        """Counters and gauges sampled at scrape time from the service's runtime stats"""
+        stats = self.stats()
+        token, cache, coalescing, limiter = stats["token"], stats["cache"], stats["coalescing"], stats["rate_limiter"]
+        
+        connector = self._session.connector if self._session is not None and not self._session.closed else None
+        pool = pool_connections(connector)
+        
+        return [
+            ("google_ads_mcp_token_refreshes_total", "counter", "OAuth access token refreshes",
+             [({}, token["refresh_count"])]),
+            ("google_ads_mcp_token_refresh_failures_total", "counter", "Failed OAuth access token refreshes",
+             [({}, token["refresh_failures"])]),
+            ("google_ads_mcp_token_refresh_seconds_total", "counter", "Time spent refreshing access tokens",
+             [({}, token["total_refresh_seconds"])]),
+            ("google_ads_mcp_upstream_retries_total", "counter", "Upstream calls retried after an error",
+             [({}, limiter["retries"])]),
+            ("google_ads_mcp_upstream_quota_errors_total", "counter", "Upstream 429 / RESOURCE_EXHAUSTED responses",
+             [({}, limiter["quota_errors"])]),
+            ("google_ads_mcp_rate_limit_throttled_seconds_total", "counter", "Time calls waited for the rate limiter",
+             [({}, limiter["throttled_seconds"])]),
+            ("google_ads_mcp_rate_limit_qps", "gauge", "Current adaptive send rate for the developer token",
+             [({}, limiter["rate"])]),
+            ("google_ads_mcp_cache_requests_total", "counter", "Response cache lookups by result",
+             [({"result": "hit"}, cache["hits"]), ({"result": "miss"}, cache["misses"])]),
+            ("google_ads_mcp_cache_evictions_total", "counter", "Response cache LRU evictions",
+             [({}, cache["evictions"])]),
+            ("google_ads_mcp_cache_entries", "gauge", "Response cache entries", [({}, cache["entries"])]),
+            ("google_ads_mcp_cache_bytes", "gauge", "Estimated response cache size", [({}, cache["bytes"])]),
+            ("google_ads_mcp_coalesced_requests_total", "counter", "Read calls that shared an in-flight upstream call",
+             [({}, coalescing["shared"])]),
+            ("google_ads_mcp_pool_connections", "gauge", "Pooled upstream connections by state",
+             [({"state": "in_use"}, pool[0]), ({"state": "idle"}, pool[1])] if pool is not None else []),
+            ("google_ads_mcp_circuit_open", "gauge", "1 while an upstream circuit is open or half-open",
+             [({"target": name}, int(breaker.state != "closed")) for name, breaker in self.breakers.items()]),
+            ("google_ads_mcp_circuit_rejections_total", "counter", "Calls rejected by an open circuit",
+             [({"target": name}, breaker.rejected) for name, breaker in self.breakers.items()]),
+        ]
+    
+    def _build_headers(self, access_token: str) -> Dict[str, str]:
+        """Build the headers required by every Google Ads API call"""
+        return {
+            "Authorization": f"Bearer {access_token}",
+            "developer-token": self.developer_token,
+            "login-customer-id": str(self.login_customer_id)
+        }
     
     async def _make_request(self, endpoint: str, method: str = "GET", data: Dict = None, query_params: Dict = None) -> Dict:
-        """Make a request to the Google Ads API."""
+        """Make a request to the Google Ads API, coalescing identical in-flight searches."""
+        if method == "POST" and endpoint.endswith("googleAds:search") and data and "query" in data and not query_params:
+            # Every other body field (pageToken, pageSize, ...) is part of the identity, so
+            # different pages of the same query are never coalesced into one response
+            rest = tuple(sorted((name, str(value)) for name, value in data.items() if name != "query"))
+            key = ("search", endpoint, normalize_query(data["query"]), rest)
+            return await self.single_flight.do(key, lambda: self._send_request(endpoint, method, data, query_params))
+        return await self._send_request(endpoint, method, data, query_params)
+    
+    async def _error_from_response(self, response: aiohttp.ClientResponse) -> HTTPException:
+        """Build the HTTPException for a non-200 response, forwarding any retry hint"""
+        error_text = await response.text()
+        logger.error(f"Error {response.status}: {error_text}")
+        hint = retry_hint(response.headers, error_text)
+        headers = {"Retry-After": str(int(math.ceil(hint)))} if hint is not None else None
+        return HTTPException(status_code=response.status, detail=f"Google Ads API error: {error_text}", headers=headers)
+    
+    async def _should_retry(
+        self, attempt: int, customer_id: Optional[str], error: Exception, max_retries: Optional[int] = None
+    ) -> bool:
+        """
+        Decide whether a failed call is retried, and sleep for the backoff if so
+        
+        Quota errors (429) also slow down the rate limiter for the developer token and customer,
+        even for calls that are not retried (max_retries=0).
+        """
+        if isinstance(error, HTTPException):
+            if error.status_code not in RETRYABLE_STATUSES:
+                return False
+            hint = float(error.headers["Retry-After"]) if error.headers and "Retry-After" in error.headers else None
+            if error.status_code == 429:
+                self.rate_limiter.on_quota_error(customer_id, hint)
+        else:
+            hint = None
+        
+        if max_retries is None:
+            max_retries = self.max_retries
+        if attempt >= max_retries:
+            return False
+        
+        delay = backoff_delay(attempt, self.retry_base_delay, self.retry_max_delay, hint)
+        self.rate_limiter.retries += 1
+        logger.info(f"Retrying Google Ads call for customer {customer_id} in {delay:.2f}s (attempt {attempt + 1}/{max_retries})")
+        await asyncio.sleep(delay)
+        return True
+    
+    async def _send_request(
+        self, endpoint: str, method: str = "GET", data: Dict = None, query_params: Dict = None, retry: bool = True
+    ) -> Dict:
+        """
+        Send a request to the Google Ads API, rate limited and retried with backoff.
+        
+        Pass retry=False for calls that are not idempotent (e.g. creating a batch job): a
+        call that timed out may still have been applied, so sending it again could repeat it.
+        """
         try:
-            # Ensure we have a valid access token
-            if not self.access_token:
-                self.access_token = await self._get_access_token()
+            if method not in ("GET", "POST", "PATCH"):
+                raise ValueError(f"Unsupported method: {method}")
             
             # Base API URL
             if endpoint.startswith("http"):
                 base_url = ""  # If endpoint is already a full URL
             else:
-                base_url = f"https://googleads.googleapis.com/v17/"
+                base_url = f"{self.base_url}/"
             
             # Construct full URL
             full_url = f"{base_url}{endpoint}"
@@ -84,115 +693,218 @@ class GoogleAdsService:
                 query_string = "&".join([f"{k}={v}" for k, v in query_params.items()])
                 full_url = f"{full_url}?{query_string}"
             
-            # Prepare headers
-            headers = {
-                "Authorization": f"Bearer {self.access_token}",
-                "developer-token": self.developer_token,
-                "login-customer-id": str(self.login_customer_id)
-            }
+            # GET requests carry no body
+            body = data if method != "GET" else None
             
-            # Make the request
-            async with aiohttp.ClientSession() as session:
-                if method == "GET":
-                    async with session.get(full_url, headers=headers) as response:
-                        if response.status == 401:  # Token expired
-                            logger.info("Access token expired, refreshing...")
-                            self.access_token = await self._get_access_token()
-                            headers["Authorization"] = f"Bearer {self.access_token}"
-                            async with session.get(full_url, headers=headers) as new_response:
-                                if new_response.status != 200:
-                                    error_text = await new_response.text()
-                                    logger.error(f"Error {new_response.status}: {error_text}")
-                                    raise HTTPException(status_code=new_response.status, detail=f"Google Ads API error: {error_text}")
-                                return await new_response.json()
-                        elif response.status != 200:
-                            error_text = await response.text()
-                            logger.error(f"Error {response.status}: {error_text}")
-                            raise HTTPException(status_code=response.status, detail=f"Google Ads API error: {error_text}")
-                        return await response.json()
-                elif method == "POST":
-                    async with session.post(full_url, headers=headers, json=data) as response:
-                        if response.status == 401:  # Token expired
-                            logger.info("Access token expired, refreshing...")
-                            self.access_token = await self._get_access_token()
-                            headers["Authorization"] = f"Bearer {self.access_token}"
-                            async with session.post(full_url, headers=headers, json=data) as new_response:
-                                if new_response.status != 200:
-                                    error_text = await new_response.text()
-                                    logger.error(f"Error {new_response.status}: {error_text}")
-                                    raise HTTPException(status_code=new_response.status, detail=f"Google Ads API error: {error_text}")
-                                return await new_response.json()
-                        elif response.status != 200:
-                            error_text = await response.text()
-                            logger.error(f"Error {response.status}: {error_text}")
-                            raise HTTPException(status_code=response.status, detail=f"Google Ads API error: {error_text}")
-                        return await response.json()
-                elif method == "PATCH":
-                    async with session.patch(full_url, headers=headers, json=data) as response:
-                        if response.status == 401:  # Token expired
-                            logger.info("Access token expired, refreshing...")
-                            self.access_token = await self._get_access_token()
-                            headers["Authorization"] = f"Bearer {self.access_token}"
-                            async with session.patch(full_url, headers=headers, json=data) as new_response:
-                                if new_response.status != 200:
-                                    error_text = await new_response.text()
-                                    logger.error(f"Error {new_response.status}: {error_text}")
-                                    raise HTTPException(status_code=new_response.status, detail=f"Google Ads API error: {error_text}")
-                                return await new_response.json()
-                        elif response.status != 200:
-                            error_text = await response.text()
-                            logger.error(f"Error {response.status}: {error_text}")
-                            raise HTTPException(status_code=response.status, detail=f"Google Ads API error: {error_text}")
-                        return await response.json()
-                else:
-                    raise ValueError(f"Unsupported method: {method}")
+            customer_id = _customer_from_endpoint(endpoint)
+            attempt = 0
+            while True:
+                await self.rate_limiter.acquire(customer_id)
+                try:
+                    result = await self._send_once(method, full_url, body, customer_id)
+                except (HTTPException, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    if await self._should_retry(attempt, customer_id, e, self.max_retries if retry else 0):
+                        attempt += 1
+                        continue
+                    raise
+                self.rate_limiter.on_success(customer_id)
+                return result
         except HTTPException:
             raise
+        except CircuitOpenError as e:
+            raise _circuit_open_error(e)
         except Exception as e:
             logger.error(f"Error making request: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Error communicating with Google Ads API: {str(e)}")
     
-    async def list_client_accounts(self) -> List[Dict]:
+    async def _send_request_once(self, endpoint: str, method: str = "GET", data: Dict = None, query_params: Dict = None) -> Dict:
+        """Send a request to the Google Ads API without retrying it."""
+        return await self._send_request(endpoint, method, data, query_params, retry=False)
+    
+    async def _send_once(self, method: str, full_url: str, body: Optional[Dict], customer_id: Optional[str] = None) -> Dict:
+        """Send one HTTP call, refreshing the access token once if it is rejected."""
+        # Ensure we have a valid access token
+        access_token = await self._get_access_token()
+        
+        # Prepare headers
+        headers = self._build_headers(access_token)
+        
+        # Make the request over the shared pool
+        session = await self._get_session()
+        endpoint_type = upstream_endpoint_type(full_url)
+        timeout = self.timeouts["mutate" if endpoint_type.startswith("mutate") else endpoint_type]
+        for attempt in range(2):
+            started = time.perf_counter()
+            status = "error"
+            try:
+                with self.breakers["ads_api"].guard():
+                    async with session.request(method, full_url, headers=headers, json=body, timeout=timeout) as response:
+                        status = response.status
+                        if response.status == 401 and attempt == 0:  # Token expired
+                            pass
+                        elif response.status != 200:
+                            raise await self._error_from_response(response)
+                        else:
+                            return loads(await response.read())
+            except CircuitOpenError:
+                status = "circuit_open"
+                raise
+            finally:
+                observe_upstream(endpoint_type, status, customer_id, started)
+            
+            logger.info("Access token rejected, refreshing...")
+            access_token = await self.token_manager.refresh(stale_token=access_token)
+            headers["Authorization"] = f"Bearer {access_token}"
+    
+    async def _search_stream(self, customer_id: str, query: str) -> AsyncIterator[Dict]:
+        """
+        Run a GAQL query through googleAds:searchStream and yield rows as batches arrive
+        
+        Unlike googleAds:search this returns every row (no page size cut-off), and only
+        one streamed batch is kept in memory at a time. Failures before the first row
+        are retried with backoff; once rows have been yielded the error is raised. An error
+        element inside the stream fails the call rather than truncating the rows.
+        
+        Args:
+            customer_id: The customer ID to run the query against
+            query: GAQL query
+            
+        Yields:
+            Dict: Raw result rows
+        """
+        url = f"{self.base_url}/customers/{customer_id}/googleAds:searchStream"
+        data = {"query": query}
+        customer_key = str(customer_id)
+        
+        try:
+            session = await self._get_session()
+            attempt = 0
+            token_refreshed = False
+            while True:
+                await self.rate_limiter.acquire(customer_key)
+                access_token = await self._get_access_token()
+                headers = self._build_headers(access_token)
+                yielded = False
+                started = time.perf_counter()
+                status = "error"
+                try:
+                    with self.breakers["ads_api"].guard() as call:
+                        async with session.post(url, headers=headers, json=data, timeout=self.timeouts["search_stream"]) as response:
+                            status = response.status
+                            if response.status == 401 and not token_refreshed:  # Token expired
+                                logger.info("Access token rejected, refreshing...")
+                                await self.token_manager.refresh(stale_token=access_token)
+                                token_refreshed = True
+                                continue
+                            if response.status != 200:
+                                raise await self._error_from_response(response)
+                            # The API answered: settle the breaker now rather than when the stream ends
+                            call.succeeded()
+                            
+                            parser = JsonArrayStreamParser()
+                            async for chunk in response.content.iter_any():
+                                for batch in parser.feed(chunk):
+                                    if "error" in batch:
+                                        status = "stream_error"
+                                        raise _stream_error(batch["error"])
+                                    for row in batch.get("results", ()):
+                                        yielded = True
+                                        yield row
+                except (HTTPException, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    if not yielded and await self._should_retry(attempt, customer_key, e):
+                        attempt += 1
+                        continue
+                    raise
+                except CircuitOpenError:
+                    status = "circuit_open"
+                    raise
+                finally:
+                    observe_upstream("search_stream", status, customer_key, started)
+                self.rate_limiter.on_success(customer_key)
+                return
+        except HTTPException:
+            raise
+        except CircuitOpenError as e:
+            raise _circuit_open_error(e)
+        except Exception as e:
+            logger.error(f"Error streaming search results: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Error communicating with Google Ads API: {str(e)}")
+    
+    async def _iter_rows(self, customer_id: str, query: str, transform: Callable[[Dict], Dict]) -> AsyncIterator[Dict]:
+        """
+        Stream transformed rows, served from the response cache when it holds the query
+        
+        Misses are streamed straight through and not stored, so memory stays flat.
+        """
+        cached = await self.cache.lookup(customer_id, query)
+        if cached is not None:
+            for row in cached:
+                yield row
+            return
+        async for item in self._search_stream(customer_id, query):
+            yield transform(item)
+    
+    async def _list_rows(self, resource: str, customer_id: str, query: str, transform: Callable[[Dict], Dict]) -> List[Dict]:
+        """
+        Return transformed rows for a query, reading through the response cache
+        
+        Args:
+            resource: Resource type used to pick the cache TTL
+            customer_id: The customer ID to run the query against
+            query: GAQL query
+            transform: Row transform
+        """
+        cached = await self.cache.lookup(customer_id, query)
+        if cached is not None:
+            return cached
+        
+        async def fetch() -> List[Dict]:
+            # Rows fetched across a mutation's invalidation are returned but not cached
+            epoch = await self.cache.epoch(customer_id)
+            rows = [transform(item) async for item in self._search_stream(customer_id, query)]
+            await self.cache.store(resource, customer_id, query, rows, epoch)
+            return rows
+        
+        # Concurrent misses for the same query share one upstream stream
+        return await self.single_flight.do(("rows", str(customer_id), normalize_query(query)), fetch)
+    
+    def iter_client_accounts(self, fields: Optional[List[str]] = None) -> AsyncIterator[Dict]:
+        """
+        Stream all available client accounts
+        
+        Args:
+            fields: Optional projection (GAQL fields or output keys)
+            
+        Yields:
+            Dict: Client account information
+        """
+        projection = _projection(_CLIENT_ACCOUNTS, fields)
+        return self._iter_rows(
+            self.login_customer_id,
+            _CLIENT_ACCOUNTS.build(projection),
+            _transform(_CLIENT_ACCOUNTS, projection, account_row),
+        )
+    
+    async def list_client_accounts(self, fields: Optional[List[str]] = None) -> List[Dict]:
         """
         List all available client accounts
         
+        Args:
+            fields: Optional projection (GAQL fields or output keys)
+            
         Returns:
             List[Dict]: Client accounts information
         """
         logger.info("Listing client accounts")
         
         try:
-            # Endpoint para listar contas de gerenciamento
-            endpoint = f"customers/{self.login_customer_id}/googleAds:search"
-            
-            # Query GAQL para obter contas de clientes
-            data = {
-                "query": """
-                    SELECT
-                        customer_client.client_customer,
-                        customer_client.level,
-                        customer_client.currency_code,
-                        customer_client.descriptive_name,
-                        customer_client.status
-                    FROM customer_client
-                    WHERE customer_client.manager = FALSE
-                """
-            }
-            
-            # Fazer a requisição real
-            result = await self._make_request(endpoint, method="POST", data=data)
-            
-            # Processar o resultado
-            accounts = []
-            if "results" in result:
-                for item in result["results"]:
-                    client_data = item.get("customerClient", {})
-                    accounts.append({
-                        "accountId": client_data.get("clientCustomer", "").split('/')[-1],
-                        "accountName": client_data.get("descriptiveName", ""),
-                        "currencyCode": client_data.get("currencyCode", ""),
-                        "status": client_data.get("status", "")
-                    })
+            projection = _projection(_CLIENT_ACCOUNTS, fields)
+            accounts = await self._list_rows(
+                "accounts",
+                self.login_customer_id,
+                _CLIENT_ACCOUNTS.build(projection),
+                _transform(_CLIENT_ACCOUNTS, projection, account_row),
+            )
             
             logger.info(f"Successfully listed {len(accounts)} client accounts")
             return accounts
@@ -202,13 +914,73 @@ class GoogleAdsService:
             logger.error(f"Error listing client accounts: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Error listing client accounts: {str(e)}")
     
-    async def list_campaigns(self, customer_id: str, status_filter: Optional[str] = None) -> List[Dict]:
+    async def _load_account_children(self, manager_id: str) -> List[Dict]:
+        """Query one manager account and its direct clients for the account tree"""
+        return [hierarchy_row(item) async for item in self._search_stream(manager_id, _ACCOUNT_HIERARCHY.build())]
+    
+    async def get_account_tree(
+        self,
+        root_id: Optional[str] = None,
+        max_depth: Optional[int] = None,
+        status: Optional[str] = None,
+        currency: Optional[str] = None,
+        include_managers: bool = True,
+        flat: bool = False,
+        refresh: bool = False,
+    ) -> Dict:
+        """
+        Get the manager account hierarchy, or a filtered part of it, from the cached account tree
+        
+        Args:
+            root_id: Account the subtree starts at (defaults to the login manager account)
+            max_depth: Levels below root_id to include
+            status: Keep client accounts with this status (e.g. ENABLED)
+            currency: Keep client accounts with this currency code
+            include_managers: Whether the flat listing includes manager accounts
+            flat: Return a flat account list instead of nested children
+            refresh: Crawl the hierarchy again before answering
+            
+        Returns:
+            Dict: rootId, refreshedAt, errors and either `tree` or `accounts`
+        """
+        try:
+            if refresh:
+                await self.account_tree.refresh()
+            view = await self.account_tree.view(root_id, max_depth, status, currency, include_managers, flat)
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error crawling account tree: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Error crawling account tree: {str(e)}")
+        if view is None:
+            raise HTTPException(status_code=404, detail=f"Account {root_id} not found in the account hierarchy")
+        return view
+    
+    def iter_campaigns(self, customer_id: str, status_filter: Optional[str] = None, fields: Optional[List[str]] = None) -> AsyncIterator[Dict]:
+        """
+        Stream campaigns for a specific customer account
+        
+        Args:
+            customer_id: The customer ID to list campaigns for
+            status_filter: Optional filter for campaign status (ENABLED, PAUSED, REMOVED)
+            fields: Optional projection (GAQL fields or output keys)
+            
+        Yields:
+            Dict: Campaign information
+        """
+        projection = _projection(_CAMPAIGNS, fields)
+        return self._iter_rows(
+            customer_id, _campaigns_query(status_filter, projection), _transform(_CAMPAIGNS, projection, campaign_row)
+        )
+    
+    async def list_campaigns(self, customer_id: str, status_filter: Optional[str] = None, fields: Optional[List[str]] = None) -> List[Dict]:
         """
         List campaigns for a specific customer account
         
         Args:
             customer_id: The customer ID to list campaigns for
             status_filter: Optional filter for campaign status (ENABLED, PAUSED, REMOVED)
+            fields: Optional projection (GAQL fields or output keys)
             
         Returns:
             List[Dict]: Campaign information
@@ -216,87 +988,17 @@ class GoogleAdsService:
         logger.info(f"Listing campaigns for customer ID: {customer_id}")
         
         try:
-            # Endpoint para listar campanhas
-            endpoint = f"customers/{customer_id}/googleAds:search"
-            
-            # Query GAQL base - Modificada para incluir budget.amount_micros
-            query = """
-                SELECT
-                    campaign.id,
-                    campaign.name,
-                    campaign.status,
-                    campaign.advertising_channel_type,
-                    campaign.bidding_strategy_type,
-                    campaign_budget.amount_micros,
-                    campaign.campaign_budget
-                FROM campaign
-            """
-            
-            # Adicionar filtro por status, se fornecido
-            if status_filter:
-                query += f" WHERE campaign.status = '{status_filter}'"
+            projection = _projection(_CAMPAIGNS, fields)
+            campaigns = await self._list_rows(
+                "campaigns",
+                customer_id,
+                _campaigns_query(status_filter, projection),
+                _transform(_CAMPAIGNS, projection, campaign_row),
+            )
             
-            data = {"query": query}
-            
-            # Fazer a requisição
-            result = await self._make_request(endpoint, method="POST", data=data)
-            
-            # Mapeamento de códigos de estratégia de lances para strings descritivas
-            bid_strategy_map = {
-                "0": "UNSPECIFIED",
-                "1": "UNKNOWN",
-                "2": "COMMISSION",
-                "3": "ENHANCED_CPC",
-                "4": "MANUAL_CPC",
-                "5": "MANUAL_CPM",
-                "6": "MANUAL_CPV",
-                "7": "MAXIMIZE_CONVERSIONS",
-                "8": "MAXIMIZE_CONVERSION_VALUE",
-                "9": "PAGE_ONE_PROMOTED",
-                "10": "PERCENT_CPC",
-                "11": "TARGET_CPA",
-                "12": "TARGET_CPM",
-                "13": "TARGET_IMPRESSION_SHARE",
-                "14": "TARGET_OUTRANK_SHARE",
-                "15": "TARGET_ROAS",
-                "16": "TARGET_SPEND",
-                7: "MAXIMIZE_CONVERSIONS",
-                8: "MAXIMIZE_CONVERSION_VALUE",
-                16: "MAXIMIZE_CLICKS",
-                4: "MANUAL_CPC",
-                5: "MANUAL_CPM",
-                6: "MANUAL_CPV",
-                11: "TARGET_CPA",
-                15: "TARGET_ROAS",
-                13: "TARGET_IMPRESSION_SHARE"
-            }
-            
-            # Processar o resultado
-            campaigns = []
-            if "results" in result:
-                for item in result["results"]:
-                    campaign_data = item.get("campaign", {})
-                    campaign_budget = item.get("campaignBudget", {})
-                    
-                    # Extrair o valor do orçamento em micros e converter para a unidade monetária normal
-                    budget_micros = campaign_budget.get("amountMicros", 0)
-                    budget = float(budget_micros) / 1_000_000 if budget_micros else 0.0
-                    
-                    # Interpretar a estratégia de lances
-                    bid_strategy_type = campaign_data.get("biddingStrategyType", "")
-                    bid_strategy_name = bid_strategy_map.get(bid_strategy_type, str(bid_strategy_type))
-                    
-                    # Log para depuração
-                    logger.debug(f"Campaign ID: {campaign_data.get('id', '')}, Budget Micros: {budget_micros}, Budget: {budget}")
-                    
-                    campaigns.append({
-                        "campaignId": campaign_data.get("id", ""),
-                        "campaignName": campaign_data.get("name", ""),
-                        "status": campaign_data.get("status", ""),
-                        "type": campaign_data.get("advertisingChannelType", ""),
-                        "biddingStrategy": bid_strategy_name,
-                        "budget": budget  # Valor convertido de micros
-                    })
+            if logger.isEnabledFor(logging.DEBUG):
+                for campaign in campaigns:
+                    logger.debug(f"Campaign ID: {campaign.get('campaignId', '')}, Budget: {campaign.get('budget', '')}")
             
             logger.info(f"Successfully listed {len(campaigns)} campaigns for customer ID: {customer_id}")
             return campaigns
@@ -306,15 +1008,26 @@ class GoogleAdsService:
             logger.error(f"Error listing campaigns: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Error listing campaigns: {str(e)}")
     
-    async def update_bid_and_budget(self, customer_id: str, campaign_id: str, new_budget: float = None, new_bid: float = None) -> Dict:
+    async def update_bid_and_budget(
+        self,
+        customer_id: str,
+        campaign_id: str,
+        new_budget: float = None,
+        new_bid: float = None,
+        wait: bool = True,
+    ) -> Dict:
         """
         Update campaign budget and/or bid modifier
         
+        With GOOGLE_ADS_BUDGET_WRITE_WINDOW set, the budget write is queued and merged
+        with other writes to the same budget (see BudgetWriteQueue).
+        
         Args:
             customer_id: The customer ID that owns the campaign
             campaign_id: The campaign ID to update
             new_budget: New budget amount (in the account's currency)
             new_bid: New bid modifier (as a multiplier, e.g., 1.1 for +10%)
+            wait: With queued budget writes, wait for the flush instead of returning the write's status
             
         Returns:
             Dict: Update status
@@ -350,45 +1063,49 @@ class GoogleAdsService:
                 # Convert currency to micros (Google Ads API uses micros)
                 budget_micros = int(new_budget * 1_000_000)
                 
-                # Create mutation for updating budget
-                endpoint = f"customers/{customer_id}/campaignBudgets:mutate"
+                if self.budget_writes.enabled:
+                    await self._queue_budget_write(response, customer_id, campaign_id, budget_resource, new_budget, budget_micros, wait)
+                else:
+                    # Create mutation for updating budget
+                    endpoint = f"customers/{customer_id}/campaignBudgets:mutate"
                 
-                # Build the mutation data
-                budget_id = budget_resource.split('/')[-1]  # Extract ID from resource name
-                data = {
-                    "operations": [
-                        {
-                            "updateMask": "amountMicros",
-                            "update": {
-                                "resourceName": budget_resource,
-                                "amountMicros": str(budget_micros)
+                    # Build the mutation data
+                    budget_id = budget_resource.split('/')[-1]  # Extract ID from resource name
+                    data = {
+                        "operations": [
+                            {
+                                "updateMask": "amountMicros",
+                                "update": {
+                                    "resourceName": budget_resource,
+                                    "amountMicros": str(budget_micros)
+                                }
                             }
-                        }
-                    ]
-                }
+                        ]
+                    }
                 
-                # Make the API call to update the budget
-                try:
-                    update_result = await self._make_request(endpoint, method="POST", data=data)
-                    logger.info(f"Budget update result: {update_result}")
+                    # Make the API call to update the budget
+                    try:
+                        update_result = await self._make_request(endpoint, method="POST", data=data)
+                        logger.info(f"Budget update result: {update_result}")
+                        await self.cache.invalidate(customer_id)
                     
-                    response["update_details"]["updates"].append({
-                        "type": "budget",
-                        "previous_value": "Unknown",
-                        "new_value": new_budget,
-                        "new_value_micros": budget_micros,
-                        "status": "success"
-                    })
-                except Exception as e:
-                    logger.error(f"Error updating budget: {str(e)}")
-                    response["success"] = False
-                    response["message"] = f"Error updating budget: {str(e)}"
-                    response["update_details"]["updates"].append({
-                        "type": "budget",
-                        "new_value": new_budget,
-                        "status": "failed",
-                        "error": str(e)
-                    })
+                        response["update_details"]["updates"].append({
+                            "type": "budget",
+                            "previous_value": "Unknown",
+                            "new_value": new_budget,
+                            "new_value_micros": budget_micros,
+                            "status": "success"
+                        })
+                    except Exception as e:
+                        logger.error(f"Error updating budget: {str(e)}")
+                        response["success"] = False
+                        response["message"] = f"Error updating budget: {str(e)}"
+                        response["update_details"]["updates"].append({
+                            "type": "budget",
+                            "new_value": new_budget,
+                            "status": "failed",
+                            "error": str(e)
+                        })
             
             # If we need to update the bid
             if new_bid:
@@ -412,9 +1129,65 @@ class GoogleAdsService:
             logger.error(error_msg)
             raise HTTPException(status_code=500, detail=error_msg)
     
+    async def _queue_budget_write(
+        self,
+        response: Dict,
+        customer_id: str,
+        campaign_id: str,
+        budget_resource: str,
+        new_budget: float,
+        budget_micros: int,
+        wait: bool,
+    ) -> None:
+        """Queue a budget write and record its status (or, when waiting, its outcome) in an update response"""
+        write, outcome = self.budget_writes.submit(customer_id, budget_resource, budget_micros, campaign_id)
+        update = {
+            "type": "budget",
+            "previous_value": "Unknown",
+            "new_value": new_budget,
+            "new_value_micros": budget_micros,
+            "write_id": write["writeId"],
+            "status": "queued",
+        }
+        response["update_details"]["updates"].append(update)
+        if not wait:
+            response["message"] = "Budget update queued"
+            return
+        
+        # Shield so a caller that goes away does not cancel the flush shared with other writes
+        result = await asyncio.shield(outcome)
+        write = self.budget_writes.get(write["writeId"]) or write
+        update["coalesced"] = write["supersededBy"] is not None
+        if result["success"]:
+            update["status"] = "success"
+            update["applied_value_micros"] = result["appliedAmountMicros"]
+        else:
+            update.update({"status": "failed", "error": result["error"]})
+            response["success"] = False
+            response["message"] = f"Error updating budget: {result['error']}"
+    
+    async def _flush_budget_writes(self, customer_id: str, operations: List[Dict]) -> List[Optional[str]]:
+        """Send one customer's coalesced budget writes (BudgetWriteQueue flusher)"""
+        errors = await self._mutate_budgets(customer_id, operations)
+        if any(error is None for error in errors):
+            await self.cache.invalidate(customer_id)
+        return errors
+    
+    def get_budget_write(self, write_id: str) -> Dict:
+        """
+        Status of a queued budget write
+        
+        Raises:
+            HTTPException: 404 if the write is unknown or its result expired
+        """
+        write = self.budget_writes.get(write_id)
+        if write is None:
+            raise HTTPException(status_code=404, detail=f"Budget write {write_id} not found")
+        return write
+    
     async def _get_campaign_info(self, customer_id: str, campaign_id: str) -> Dict:
         """
-        Get detailed information about a specific campaign
+        Get detailed information about a specific campaign from the campaign index
         
         Args:
             customer_id: The customer ID that owns the campaign
@@ -423,34 +1196,214 @@ class GoogleAdsService:
         Returns:
             Dict: Campaign information
         """
-        endpoint = f"customers/{customer_id}/googleAds:search"
-        
-        query = f"""
-            SELECT
-                campaign.id,
-                campaign.name,
-                campaign.status,
-                campaign.bidding_strategy_type,
-                campaign.campaign_budget
-            FROM campaign
-            WHERE campaign.id = {campaign_id}
+        campaign = await self.campaign_index.get(customer_id, campaign_id)
+        if campaign is None:
+            raise HTTPException(status_code=404, detail=f"Campaign {campaign_id} not found")
+        return campaign
+    
+    async def _lookup_campaigns(self, customer_id: str, campaign_ids: Optional[List[str]] = None) -> Dict[str, Dict]:
         """
+        Fetch campaign metadata (resource names, budget, name, status, bidding strategy)
         
-        result = await self._make_request(endpoint, method="POST", data={"query": query})
+        Used to fill the campaign index: one query for the whole account, or one query
+        per chunk of IDs when only specific campaigns are needed.
         
-        if "results" in result and len(result["results"]) > 0:
-            return result["results"][0].get("campaign", {})
+        Args:
+            customer_id: The customer ID that owns the campaigns
+            campaign_ids: Campaign IDs to look up, or None for every campaign
+            
+        Returns:
+            Dict[str, Dict]: Campaign data keyed by campaign ID
+        """
+        if campaign_ids is None:
+            filters = [[]]
         else:
-            raise HTTPException(status_code=404, detail=f"Campaign {campaign_id} not found")
+            unique_ids = list(dict.fromkeys(campaign_ids))
+            try:
+                filters = [
+                    [ids_condition("campaign.id", unique_ids[start:start + self.mutate_batch_size])]
+                    for start in range(0, len(unique_ids), self.mutate_batch_size)
+                ]
+            except GaqlError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        
+        campaigns: Dict[str, Dict] = {}
+        for conditions in filters:
+            async for item in self._search_stream(customer_id, _CAMPAIGN_METADATA.build(conditions=conditions)):
+                campaign = item.get("campaign", {})
+                campaigns[str(campaign.get("id", ""))] = campaign
+        return campaigns
+    
+    async def _mutate_budgets(self, customer_id: str, operations: List[Dict]) -> List[Optional[str]]:
+        """
+        Send campaign budget operations in partial-failure mode, as few requests as allowed
+        
+        Args:
+            customer_id: The customer ID that owns the budgets
+            operations: campaignBudgets:mutate operations
+            
+        Returns:
+            List[Optional[str]]: Per-operation error message, None when it succeeded
+        """
+        endpoint = f"customers/{customer_id}/campaignBudgets:mutate"
+        errors: List[Optional[str]] = [None] * len(operations)
+        
+        for start in range(0, len(operations), self.mutate_batch_size):
+            chunk = operations[start:start + self.mutate_batch_size]
+            data = {"operations": chunk, "partialFailure": True}
+            try:
+                result = await self._make_request(endpoint, method="POST", data=data)
+            except HTTPException as e:
+                for offset in range(len(chunk)):
+                    errors[start + offset] = str(e.detail)
+                continue
+            
+            for index, message in _partial_failure_errors(result).items():
+                errors[start + index] = message
+        return errors
+    
+    async def _bulk_update_customer(self, customer_id: str, items: List[Tuple[int, Dict]], results: List[Dict]) -> None:
+        """Apply the bulk updates that belong to one customer, writing into results by index"""
+        try:
+            campaigns = await self.campaign_index.get_many(customer_id, [item["campaign_id"] for _, item in items])
+        except HTTPException as e:
+            for index, _ in items:
+                results[index].update({"success": False, "status": "failed", "error": str(e.detail)})
+            return
+        
+        operations: List[Dict] = []
+        operation_owners: List[int] = []
+        for index, item in items:
+            result = results[index]
+            campaign = campaigns.get(item["campaign_id"])
+            if campaign is None:
+                result.update({"success": False, "status": "failed", "error": f"Campaign {item['campaign_id']} not found"})
+                continue
+            result["campaign_name"] = campaign.get("name", "")
+            
+            if item.get("new_budget"):
+                budget_resource = campaign.get("campaignBudget", "")
+                if not budget_resource:
+                    result.update({"success": False, "status": "failed", "error": "Campaign budget resource not found"})
+                    continue
+                budget_micros = int(item["new_budget"] * 1_000_000)
+                result["new_budget_micros"] = budget_micros
+                operations.append({
+                    "updateMask": "amountMicros",
+                    "update": {
+                        "resourceName": budget_resource,
+                        "amountMicros": str(budget_micros)
+                    }
+                })
+                operation_owners.append(index)
+            elif item.get("new_bid"):
+                # Same as update_bid_and_budget: bid updates are not implemented yet
+                result.update({"success": False, "status": "not_implemented", "error": "bid update not implemented yet"})
+        
+        if not operations:
+            return
+        
+        errors = await self._mutate_budgets(customer_id, operations)
+        if any(error is None for error in errors):
+            await self.cache.invalidate(customer_id)
+        for index, error in zip(operation_owners, errors):
+            if error is None:
+                results[index].update({"success": True, "status": "success"})
+            else:
+                results[index].update({"success": False, "status": "failed", "error": error})
     
-    async def get_campaign_performance(self, customer_id: str, campaign_ids: List[str] = None, date_range: str = "LAST_30_DAYS") -> List[Dict]:
+    async def bulk_update_bid_and_budget(self, updates: List[Dict]) -> Dict:
+        """
+        Update many campaign budgets, batched per customer with partial failure enabled
+        
+        Args:
+            updates: Items with customer_id, campaign_id, new_budget and/or new_bid
+            
+        Returns:
+            Dict: Overall status and one result per input item, in input order
+        """
+        logger.info(f"Bulk updating bid/budget for {len(updates)} campaigns")
+        
+        results: List[Dict] = []
+        by_customer: Dict[str, List[Tuple[int, Dict]]] = {}
+        for index, item in enumerate(updates):
+            results.append({
+                "index": index,
+                "customer_id": item["customer_id"],
+                "campaign_id": item["campaign_id"],
+                "new_budget": item.get("new_budget"),
+                "new_bid": item.get("new_bid"),
+                "success": False,
+                "status": "pending",
+            })
+            if not item.get("new_budget") and not item.get("new_bid"):
+                results[index].update({"status": "failed", "error": "Either new budget or new bid must be provided"})
+                continue
+            by_customer.setdefault(item["customer_id"], []).append((index, item))
+        
+        semaphore = asyncio.Semaphore(self.bulk_concurrency)
+        
+        async def run_customer(customer_id: str, items: List[Tuple[int, Dict]]) -> None:
+            async with semaphore:
+                await self._bulk_update_customer(customer_id, items, results)
+        
+        await asyncio.gather(*(run_customer(cid, items) for cid, items in by_customer.items()))
+        
+        succeeded = sum(1 for result in results if result["success"])
+        logger.info(f"Bulk update finished: {succeeded}/{len(results)} succeeded across {len(by_customer)} customers")
+        return {
+            "success": succeeded == len(results),
+            "message": f"{succeeded} of {len(results)} updates succeeded",
+            "results": results,
+        }
+    
+    async def iter_campaign_performance(
+        self,
+        customer_id: str,
+        campaign_ids: List[str] = None,
+        date_range: str = "LAST_30_DAYS",
+        fields: Optional[List[str]] = None,
+    ) -> AsyncIterator[Dict]:
+        """
+        Stream performance metrics for campaigns
+        
+        Args:
+            customer_id: The customer ID to get campaign performance for
+            campaign_ids: Optional list of campaign IDs to filter by
+            date_range: Time period for the report (e.g., LAST_7_DAYS, LAST_30_DAYS)
+            fields: Optional projection (GAQL fields or output keys)
+            
+        Yields:
+            Dict: Campaign performance metrics
+        """
+        projection = _projection(_PERFORMANCE, fields)
+        query = _performance_query(campaign_ids, date_range, projection)
+        stored = await self._performance_from_store(customer_id, campaign_ids, date_range, projection)
+        if stored is not None:
+            for row in stored:
+                yield row
+            return
+        async for row in self._iter_rows(customer_id, query, _transform(_PERFORMANCE, projection, performance_row)):
+            yield row
+    
+    async def get_campaign_performance(
+        self,
+        customer_id: str,
+        campaign_ids: List[str] = None,
+        date_range: str = "LAST_30_DAYS",
+        fields: Optional[List[str]] = None,
+    ) -> List[Dict]:
         """
         Get performance metrics for campaigns
         
+        Answered from the local performance store when it is enabled and covers the
+        range, otherwise from the Google Ads API.
+        
         Args:
             customer_id: The customer ID to get campaign performance for
             campaign_ids: Optional list of campaign IDs to filter by
             date_range: Time period for the report (e.g., LAST_7_DAYS, LAST_30_DAYS)
+            fields: Optional projection (GAQL fields or output keys)
             
         Returns:
             List[Dict]: Campaign performance metrics
@@ -458,53 +1411,13 @@ class GoogleAdsService:
         logger.info(f"Getting campaign performance for customer ID: {customer_id}")
         
         try:
-            endpoint = f"customers/{customer_id}/googleAds:search"
-            
-            query = f"""
-                SELECT
-                    campaign.id,
-                    campaign.name,
-                    campaign.status,
-                    metrics.impressions,
-                    metrics.clicks,
-                    metrics.cost_micros,
-                    metrics.conversions,
-                    metrics.average_cpc
-                FROM campaign
-                WHERE segments.date DURING {date_range}
-            """
-            
-            # Add campaign filter if specified
-            if campaign_ids and len(campaign_ids) > 0:
-                campaign_ids_str = ", ".join(campaign_ids)
-                query += f" AND campaign.id IN ({campaign_ids_str})"
-            
-            data = {"query": query}
-            
-            # Make the request
-            result = await self._make_request(endpoint, method="POST", data=data)
-            
-            # Process the results
-            performance_data = []
-            if "results" in result:
-                for item in result["results"]:
-                    campaign = item.get("campaign", {})
-                    metrics = item.get("metrics", {})
-                    
-                    # Convert micros to regular currency units
-                    cost = float(metrics.get("costMicros", 0)) / 1_000_000 if "costMicros" in metrics else 0
-                    avg_cpc = float(metrics.get("averageCpc", 0)) / 1_000_000 if "averageCpc" in metrics else 0
-                    
-                    performance_data.append({
-                        "campaignId": campaign.get("id", ""),
-                        "campaignName": campaign.get("name", ""),
-                        "status": campaign.get("status", ""),
-                        "impressions": int(metrics.get("impressions", 0)),
-                        "clicks": int(metrics.get("clicks", 0)),
-                        "cost": cost,
-                        "conversions": float(metrics.get("conversions", 0)),
-                        "averageCpc": avg_cpc
-                    })
+            projection = _projection(_PERFORMANCE, fields)
+            query = _performance_query(campaign_ids, date_range, projection)
+            performance_data = await self._performance_from_store(customer_id, campaign_ids, date_range, projection)
+            if performance_data is None:
+                performance_data = await self._list_rows(
+                    "performance", customer_id, query, _transform(_PERFORMANCE, projection, performance_row)
+                )
             
             logger.info(f"Successfully retrieved performance data for {len(performance_data)} campaigns")
             return performance_data
@@ -515,6 +1428,519 @@ class GoogleAdsService:
             logger.error(f"Error getting campaign performance: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Error getting campaign performance: {str(e)}")
     
+    async def aggregate_campaign_performance(
+        self,
+        customer_id: str,
+        group_by: str = "campaign",
+        campaign_ids: List[str] = None,
+        date_range: str = "LAST_30_DAYS",
+    ) -> Dict:
+        """
+        Aggregate campaign performance by campaign, channel type, status or day
+        
+        Rows are streamed into a columnar aggregator, so only the aggregated rows
+        (with CTR, CPC, CPA, conversion rate and ROAS) are built and returned.
+        
+        Args:
+            customer_id: The customer ID to aggregate performance for
+            group_by: campaign, channel, status or day
+            campaign_ids: Optional list of campaign IDs to filter by
+            date_range: Time period for the report (e.g., LAST_7_DAYS, LAST_30_DAYS)
+            
+        Returns:
+            Dict: groupBy, aggregated rows and overall totals
+        """
+        try:
+            aggregator = PerformanceAggregator(group_by)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        try:
+            conditions = [date_condition(date_range)]
+            if campaign_ids:
+                conditions.append(ids_condition("campaign.id", campaign_ids))
+        except GaqlError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        query = aggregation_query(group_by, conditions)
+        async for item in self._search_stream(customer_id, query):
+            aggregator.add(item)
+        result = aggregator.result()
+        result["dateRange"] = date_range
+        return result
+    
+    async def get_campaign_changes(self, customer_id: str, since: str, limit: int = 10000) -> Dict:
+        """
+        Get campaigns and budgets changed since a cursor, using change_status and change_event
+        
+        Campaign changes come from change_status (last 90 days) and budget changes from
+        change_event (last 30 days); the current rows of the affected campaigns are then
+        read in a single query per kind. Rows changed exactly at the cursor may be returned
+        again, so clients should upsert. A cursor older than either window is clamped to it
+        and the result is flagged with resyncRequired: changes before the window are lost,
+        so the client should do a full reload.
+        
+        Args:
+            customer_id: The customer ID to check
+            since: Cursor from a previous call, or a date / timestamp in the account's time zone
+            limit: Maximum change rows read per resource (Google Ads allows up to 10000)
+            
+        Returns:
+            Dict: Changed campaigns, removed campaign IDs, changed budgets, the next cursor and
+                  whether the change rows were truncated by the limit or the cursor by the lookback windows
+        """
+        since = since.replace("T", " ")
+        if not _CHANGE_CURSOR.match(since):
+            raise HTTPException(status_code=400, detail=f"Invalid cursor: {since}. Use YYYY-MM-DD or YYYY-MM-DD HH:MM:SS[.ffffff]")
+        until = (date.today() + timedelta(days=1)).isoformat()
+        status_since = max(since, (date.today() - timedelta(days=_CHANGE_STATUS_LOOKBACK_DAYS)).isoformat())
+        event_since = max(since, (date.today() - timedelta(days=_CHANGE_EVENT_LOOKBACK_DAYS)).isoformat())
+        resync_required = status_since != since or event_since != since
+        if resync_required:
+            logger.warning(
+                f"Change cursor {since} for customer {customer_id} is older than the change history; "
+                f"reading changes since {status_since} (campaigns) and {event_since} (budgets)"
+            )
+        
+        status_query = f"""
+            SELECT
+                change_status.resource_name,
+                change_status.last_change_date_time,
+                change_status.resource_type,
+                change_status.resource_status,
+                change_status.campaign
+            FROM change_status
+            WHERE change_status.last_change_date_time >= '{status_since}'
+                AND change_status.last_change_date_time <= '{until} 23:59:59'
+                AND change_status.resource_type = 'CAMPAIGN'
+            ORDER BY change_status.last_change_date_time
+            LIMIT {limit}
+        """
+        event_query = f"""
+            SELECT
+                change_event.change_date_time,
+                change_event.change_resource_type,
+                change_event.change_resource_name
+            FROM change_event
+            WHERE change_event.change_date_time >= '{event_since}'
+                AND change_event.change_date_time <= '{until} 23:59:59'
+                AND change_event.change_resource_type = 'CAMPAIGN_BUDGET'
+            ORDER BY change_event.change_date_time
+            LIMIT {limit}
+        """
+        status_rows, event_rows = await asyncio.gather(
+            self._list_change_rows(customer_id, status_query),
+            self._list_change_rows(customer_id, event_query),
+        )
+        
+        cursor = since
+        changed_ids: Dict[str, None] = {}
+        removed_ids: Dict[str, None] = {}
+        for item in status_rows:
+            change = item.get("changeStatus", {})
+            campaign_id = change.get("campaign", "").rsplit("/", 1)[-1]
+            if campaign_id:
+                target = removed_ids if change.get("resourceStatus") == "REMOVED" else changed_ids
+                target[campaign_id] = None
+            cursor = max(cursor, change.get("lastChangeDateTime", cursor))
+        budgets: Dict[str, None] = {}
+        for item in event_rows:
+            change = item.get("changeEvent", {})
+            if change.get("changeResourceName"):
+                budgets[change["changeResourceName"]] = None
+            cursor = max(cursor, change.get("changeDateTime", cursor))
+        
+        campaigns: Dict[str, Dict] = {}
+        ids = [campaign_id for campaign_id in changed_ids if campaign_id not in removed_ids]
+        budget_names = list(budgets)
+        try:
+            filters = [
+                ids_condition("campaign.id", ids[start:start + self.mutate_batch_size])
+                for start in range(0, len(ids), self.mutate_batch_size)
+            ] + [
+                resource_names_condition("campaign.campaign_budget", budget_names[start:start + self.mutate_batch_size])
+                for start in range(0, len(budget_names), self.mutate_batch_size)
+            ]
+        except GaqlError as e:
+            raise HTTPException(status_code=502, detail=f"Unexpected change row: {e}")
+        for condition in filters:
+            async for item in self._search_stream(customer_id, _CAMPAIGNS.build(conditions=[condition])):
+                row = campaign_row(item)
+                if row["campaignId"] not in removed_ids:
+                    campaigns[row["campaignId"]] = row
+        
+        if changed_ids or removed_ids or budgets:
+            # Changes made outside this service: drop what we cached for the account
+            self.campaign_index.invalidate(customer_id)
+            await self.cache.invalidate(customer_id)
+        
+        logger.info(
+            f"Found {len(campaigns)} changed and {len(removed_ids)} removed campaigns for customer "
+            f"{customer_id} since {since}"
+        )
+        return {
+            "customerId": customer_id,
+            "since": since,
+            "cursor": cursor,
+            "truncated": len(status_rows) >= limit or len(event_rows) >= limit,
+            "resyncRequired": resync_required,
+            "campaigns": list(campaigns.values()),
+            "removedCampaignIds": list(removed_ids),
+            "changedBudgets": budget_names,
+        }
+    
+    async def _list_change_rows(self, customer_id: str, query: str) -> List[Dict]:
+        """Read every row of a change_status / change_event query"""
+        return [item async for item in self._search_stream(customer_id, query)]
+    
+    async def _performance_from_store(
+        self,
+        customer_id: str,
+        campaign_ids: Optional[List[str]],
+        date_range: str,
+        projection: Optional[Tuple[str, ...]] = None,
+    ) -> Optional[List[Dict]]:
+        """
+        Aggregate performance from the local store, syncing it first if it is stale
+        
+        Returns:
+            Optional[List[Dict]]: Rows, or None when the store is disabled or does not cover the range
+        """
+        if self.performance_store is None:
+            return None
+        bounds = resolve_date_range(date_range)
+        if bounds is None:
+            return None
+        
+        state = await self.performance_store.get_state(customer_id)
+        if state is None or time.time() - state["last_sync_at"] > self.performance_sync_interval:
+            await self.sync_performance_store(customer_id)
+            state = await self.performance_store.get_state(customer_id)
+        if state is None or bounds[0] < state["synced_from"] or bounds[1] > state["synced_through"]:
+            return None
+        
+        rows = await self.performance_store.aggregate(customer_id, bounds[0], bounds[1], campaign_ids)
+        if projection:
+            keys = _PERFORMANCE.output_keys(projection)
+            rows = [{key: row[key] for key in keys} for row in rows]
+        return rows
+    
+    async def sync_performance_store(self, customer_id: str) -> Dict:
+        """
+        Fetch new and still-settling days of campaign metrics into the local store
+        
+        The first sync backfills GOOGLE_ADS_PERFORMANCE_BACKFILL_DAYS; later ones re-fetch
+        from GOOGLE_ADS_PERFORMANCE_SETTLE_DAYS before the last synced day up to today.
+        
+        Args:
+            customer_id: The customer ID to sync
+            
+        Returns:
+            Dict: Synced window and number of rows written
+        """
+        if self.performance_store is None:
+            raise HTTPException(status_code=400, detail="Performance store is not enabled (set GOOGLE_ADS_PERFORMANCE_STORE_PATH)")
+        return await self.single_flight.do(("store-sync", str(customer_id)), lambda: self._sync_performance_store(str(customer_id)))
+    
+    async def _sync_performance_store(self, customer_id: str) -> Dict:
+        today = date.today()
+        state = await self.performance_store.get_state(customer_id)
+        if state is None:
+            start = today - timedelta(days=self.performance_backfill_days)
+        else:
+            start = min(state["synced_through"] - timedelta(days=self.performance_settle_days), today)
+        
+        query = f"""
+            SELECT
+                campaign.id,
+                campaign.name,
+                campaign.status,
+                segments.date,
+                metrics.impressions,
+                metrics.clicks,
+                metrics.cost_micros,
+                metrics.conversions
+            FROM campaign
+            WHERE segments.date BETWEEN '{start.isoformat()}' AND '{today.isoformat()}'
+        """
+        values = [
+            PerformanceStore.row_values(customer_id, item)
+            async for item in self._search_stream(customer_id, query)
+        ]
+        written = await self.performance_store.replace_days(customer_id, start, today, values)
+        logger.info(f"Synced {written} daily metric rows for customer {customer_id} ({start} to {today})")
+        return {"customer_id": customer_id, "start": start.isoformat(), "end": today.isoformat(), "rows": written}
+    
+    async def _performance_sync_loop(self) -> None:
+        """Periodically sync every customer already present in the performance store"""
+        while True:
+            await asyncio.sleep(self.performance_sync_interval)
+            for customer_id in await self.performance_store.customers():
+                try:
+                    await self.sync_performance_store(customer_id)
+                except Exception as e:
+                    logger.error(f"Error syncing performance store for customer {customer_id}: {str(e)}")
+    
+    async def iter_all_accounts_performance(self, date_range: str = "LAST_30_DAYS", concurrency: Optional[int] = None) -> AsyncIterator[Dict]:
+        """
+        Stream campaign performance for every client account, querying accounts concurrently
+        
+        Accounts are yielded in completion order. A failing account is reported with its
+        error instead of failing the whole run.
+        
+        Args:
+            date_range: Time period for the report (e.g., LAST_7_DAYS, LAST_30_DAYS)
+            concurrency: Maximum accounts queried at once (defaults to GOOGLE_ADS_FANOUT_CONCURRENCY)
+            
+        Yields:
+            Dict: Account ID, name, success flag, campaigns and error (if any)
+        """
+        accounts = await self.list_client_accounts()
+        limit = concurrency or self.fanout_concurrency
+        semaphore = asyncio.Semaphore(limit)
+        logger.info(f"Fetching performance for {len(accounts)} accounts (concurrency={limit})")
+        
+        async def fetch(account: Dict) -> Dict:
+            result = {
+                "accountId": account["accountId"],
+                "accountName": account["accountName"],
+                "success": True,
+                "campaigns": [],
+                "error": None,
+            }
+            async with semaphore:
+                try:
+                    result["campaigns"] = await self.get_campaign_performance(account["accountId"], None, date_range)
+                except HTTPException as e:
+                    result.update({"success": False, "error": str(e.detail)})
+                except Exception as e:
+                    result.update({"success": False, "error": str(e)})
+            return result
+        
+        tasks = [asyncio.ensure_future(fetch(account)) for account in accounts]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Stop outstanding queries if the consumer goes away early
+            for task in tasks:
+                task.cancel()
+    
+    async def get_all_accounts_performance(self, date_range: str = "LAST_30_DAYS", concurrency: Optional[int] = None) -> List[Dict]:
+        """
+        Get campaign performance for every client account, querying accounts concurrently
+        
+        Args:
+            date_range: Time period for the report (e.g., LAST_7_DAYS, LAST_30_DAYS)
+            concurrency: Maximum accounts queried at once (defaults to GOOGLE_ADS_FANOUT_CONCURRENCY)
+            
+        Returns:
+            List[Dict]: One entry per account, with per-account errors
+        """
+        try:
+            results = [result async for result in self.iter_all_accounts_performance(date_range, concurrency)]
+            
+            failed = sum(1 for result in results if not result["success"])
+            logger.info(f"Retrieved performance for {len(results)} accounts ({failed} failed)")
+            return results
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error getting cross-account performance: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Error getting cross-account performance: {str(e)}")
+    
+    async def run_batch(self, items: List[Dict], concurrency: Optional[int] = None) -> Dict:
+        """
+        Run many GAQL queries or named reports concurrently
+        
+        Each item has an optional id, a customerId and either a GAQL query (run with
+        googleAds:search through _make_request, following every page) or a named report
+        spec as accepted by submit_report. A failing item is reported with its error
+        instead of failing the batch. Item ids (an item without one is keyed by its
+        position) must be unique.
+        
+        Args:
+            items: Items to run
+            concurrency: Maximum items run at once (defaults to GOOGLE_ADS_FANOUT_CONCURRENCY)
+            
+        Returns:
+            Dict: success flag and results keyed by item id (or position), in request order
+        """
+        if len(items) > self.batch_max_items:
+            raise HTTPException(status_code=400, detail=f"A batch can have at most {self.batch_max_items} items")
+        keys = [str(item.get("id") or index) for index, item in enumerate(items)]
+        seen = set()
+        for key in keys:
+            if key in seen:
+                raise HTTPException(status_code=400, detail=f"Duplicate batch item id: {key}")
+            seen.add(key)
+        semaphore = asyncio.Semaphore(concurrency or self.fanout_concurrency)
+        
+        async def run(item: Dict) -> Dict:
+            async with semaphore:
+                try:
+                    if item.get("query"):
+                        if not item.get("customerId"):
+                            raise HTTPException(status_code=400, detail="customerId is required for a query")
+                        result = await self._search_all(item["customerId"], item["query"])
+                    else:
+                        _validate_report_spec(item)
+                        result = await self._run_report(item, lambda completed, total=None: None)
+                    return {"success": True, "result": result, "error": None}
+                except HTTPException as e:
+                    return {"success": False, "result": None, "error": str(e.detail)}
+                except Exception as e:
+                    return {"success": False, "result": None, "error": str(e)}
+        
+        outcomes = await asyncio.gather(*(run(item) for item in items))
+        failed = sum(1 for outcome in outcomes if not outcome["success"])
+        logger.info(f"Ran batch of {len(items)} items ({failed} failed)")
+        return {"success": failed == 0, "results": dict(zip(keys, outcomes))}
+    
+    async def _search_all(self, customer_id: str, query: str) -> List[Dict]:
+        """Run a GAQL query with googleAds:search and return the raw rows of every page"""
+        endpoint = f"customers/{customer_id}/googleAds:search"
+        data = {"query": query}
+        rows: List[Dict] = []
+        while True:
+            page = await self._make_request(endpoint, method="POST", data=data)
+            rows.extend(page.get("results", []))
+            next_page = page.get("nextPageToken")
+            if not next_page:
+                return rows
+            data = {"query": query, "pageToken": next_page}
+    
+    def submit_report(self, spec: Dict) -> Dict:
+        """
+        Queue a report to run on the background workers
+        
+        Args:
+            spec: report (campaigns, campaign_performance, performance_aggregate or
+                  all_accounts_performance), customerId, campaignIds, dateRange, groupBy,
+                  status and concurrency, as the report needs
+            
+        Returns:
+            Dict: The queued job's status (poll it with report_jobs.get)
+        """
+        report = _validate_report_spec(spec)
+        try:
+            job = self.report_jobs.submit(spec)
+        except JobQueueFull as e:
+            raise HTTPException(status_code=429, detail=str(e))
+        logger.info(f"Queued {report} report job {job['jobId']}")
+        return job
+    
+    async def _run_report(self, spec: Dict, progress: ProgressCallback) -> Any:
+        """Run one report job spec on a background worker"""
+        report = spec["report"]
+        customer_id = spec.get("customerId")
+        date_range = spec.get("dateRange") or "LAST_30_DAYS"
+        
+        if report == "all_accounts_performance":
+            total = len(await self.list_client_accounts())
+            progress(0, total)
+            results = []
+            async for result in self.iter_all_accounts_performance(date_range, spec.get("concurrency")):
+                results.append(result)
+                progress(len(results), total)
+            return results
+        
+        if report == "performance_aggregate":
+            result = await self.aggregate_campaign_performance(
+                customer_id, spec.get("groupBy") or "campaign", spec.get("campaignIds"), date_range
+            )
+            progress(len(result["rows"]), len(result["rows"]))
+            return result
+        
+        if report == "campaign_performance":
+            rows = self.iter_campaign_performance(customer_id, spec.get("campaignIds"), date_range, spec.get("fields"))
+        else:
+            rows = self.iter_campaigns(customer_id, spec.get("status"), spec.get("fields"))
+        results = []
+        async for row in rows:
+            results.append(row)
+            if len(results) % 1000 == 0:
+                progress(len(results))
+        progress(len(results), len(results))
+        return results
+    
+    async def submit_batch_job(self, customer_id: str, updates: List[Dict], operations: Optional[List[Dict]] = None) -> Dict:
+        """
+        Start a Google Ads BatchJob applying a large set of budget and bidding strategy changes
+        
+        Updates are translated to MutateOperations using the campaign index; items that
+        cannot be translated are reported in the job's `rejected` list instead of failing
+        the whole job. Results are read from batch_jobs while the job runs.
+        
+        Args:
+            customer_id: The customer ID that owns the campaigns
+            updates: Items with campaign_id and new_budget and/or new_bid_strategy
+            operations: Additional MutateOperation bodies, passed through unchanged
+            
+        Returns:
+            Dict: The job's status
+        """
+        operations = operations or []
+        if not updates and not operations:
+            raise HTTPException(status_code=400, detail="At least one update or operation must be provided")
+        
+        campaigns = await self.campaign_index.get_many(customer_id, [item["campaign_id"] for item in updates]) if updates else {}
+        mutate_operations: List[Dict] = []
+        labels: List[Dict] = []
+        rejected: List[Dict] = []
+        for position, item in enumerate(updates):
+            campaign_id = str(item["campaign_id"])
+            new_budget = item.get("new_budget")
+            new_bid_strategy = item.get("new_bid_strategy")
+            campaign = campaigns.get(campaign_id)
+            if campaign is None:
+                error = f"Campaign {campaign_id} not found"
+            elif not new_budget and not new_bid_strategy:
+                error = "Either new budget or new bid strategy must be provided"
+            elif new_bid_strategy and new_bid_strategy not in BID_STRATEGY_ENUMS:
+                error = f"Invalid bidding strategy: {new_bid_strategy}. Valid strategies are: {', '.join(BID_STRATEGY_ENUMS)}"
+            elif new_budget and not campaign.get("campaignBudget"):
+                error = "Campaign budget resource not found"
+            else:
+                error = None
+            if error is not None:
+                rejected.append({"item": position, "campaignId": campaign_id, "error": error})
+                continue
+            
+            if new_budget:
+                budget_micros = int(new_budget * 1_000_000)
+                mutate_operations.append({
+                    "campaignBudgetOperation": {
+                        "updateMask": "amountMicros",
+                        "update": {"resourceName": campaign["campaignBudget"], "amountMicros": str(budget_micros)},
+                    }
+                })
+                labels.append({"item": position, "campaignId": campaign_id, "type": "budget", "newValueMicros": budget_micros})
+            if new_bid_strategy:
+                mutate_operations.append({
+                    "campaignOperation": {
+                        "updateMask": "bidding_strategy_type",
+                        "update": {"resourceName": campaign["resourceName"], "biddingStrategyType": BID_STRATEGY_ENUMS[new_bid_strategy]},
+                    }
+                })
+                labels.append({"item": position, "campaignId": campaign_id, "type": "bidding_strategy", "newValue": new_bid_strategy})
+        for operation in operations:
+            mutate_operations.append(operation)
+            labels.append({"type": "operation"})
+        
+        if not mutate_operations:
+            raise HTTPException(status_code=400, detail={"message": "No valid operations to run", "rejected": rejected})
+        job = self.batch_jobs.submit(customer_id, mutate_operations, labels, rejected)
+        logger.info(
+            f"Queued batch job {job['jobId']} for customer {customer_id} "
+            f"({len(mutate_operations)} operations, {len(rejected)} items rejected)"
+        )
+        return job
+    
+    async def _on_batch_job_change(self, customer_id: str) -> None:
+        """Drop cached reads and campaign metadata once a batch job has been applied"""
+        self.campaign_index.invalidate(customer_id)
+        await self.cache.invalidate(customer_id)
+    
     async def update_bid_strategy(self, customer_id: str, campaign_id: str, new_bid_strategy: str) -> Dict:
         """Update the bidding strategy for a campaign."""
         logger.info(f"Updating bidding strategy for campaign {campaign_id} in account {customer_id}")
@@ -532,51 +1958,22 @@ class GoogleAdsService:
         }
         
         try:
-            # Get campaign details first
-            campaign_details = await self.get_campaign_details(customer_id, campaign_id)
-            campaign_name = campaign_details.get("campaignName", "Unknown")
-            response["update_details"]["campaign_name"] = campaign_name
-            
-            # Map the string bidding strategy to the appropriate enum value
-            # See: https://developers.google.com/google-ads/api/reference/rpc/v17/BiddingStrategyTypeEnum.BiddingStrategyType
-            bid_strategy_map = {
-                "MAXIMIZE_CONVERSIONS": 7,  # Numeric enum value
-                "MAXIMIZE_CONVERSION_VALUE": 8,
-                "MAXIMIZE_CLICKS": 16,
-                "MANUAL_CPC": 4,
-                "MANUAL_CPM": 5,
-                "MANUAL_CPV": 6,
-                "TARGET_CPA": 11,
-                "TARGET_ROAS": 15,
-                "TARGET_SPEND": 16,
-                "TARGET_IMPRESSION_SHARE": 13
-            }
-            
-            # Check if the requested strategy is valid
-            if new_bid_strategy not in bid_strategy_map:
-                valid_strategies = ", ".join(bid_strategy_map.keys())
+            # Check if the requested strategy is valid (BID_STRATEGY_ENUMS maps it to its enum value)
+            if new_bid_strategy not in BID_STRATEGY_ENUMS:
+                valid_strategies = ", ".join(BID_STRATEGY_ENUMS.keys())
                 raise ValueError(f"Invalid bidding strategy: {new_bid_strategy}. Valid strategies are: {valid_strategies}")
             
-            # Create a mutate operation to update the campaign
-            endpoint = f"customers/{customer_id}/googleAds:searchStream"
-            
-            # Prepare GAQL query to get campaign resource name
-            query = f"""
-                SELECT campaign.resource_name, campaign.bidding_strategy_type
-                FROM campaign
-                WHERE campaign.id = {campaign_id}
-            """
+            # Get campaign metadata (name, resource name, current strategy) from the index
+            campaign_info = await self.campaign_index.get(customer_id, campaign_id)
+            if campaign_info is None:
+                logger.warning(f"No campaign found with ID {campaign_id}")
+                raise ValueError(f"Campaign with ID {campaign_id} not found")
+            campaign_name = campaign_info.get("name", "Unknown")
+            response["update_details"]["campaign_name"] = campaign_name
             
-            # Execute the query to get the resource name
             try:
-                query_data = {"query": query}
-                result = await self._make_request(f"customers/{customer_id}/googleAds:search", method="POST", data=query_data)
-                
-                if not result or "results" not in result or not result["results"]:
-                    raise ValueError(f"Campaign {campaign_id} not found")
-                
-                resource_name = result["results"][0]["campaign"]["resourceName"]
-                current_bid_strategy = result["results"][0]["campaign"].get("biddingStrategyType", "Unknown")
+                resource_name = campaign_info["resourceName"]
+                current_bid_strategy = campaign_info.get("biddingStrategyType", "Unknown")
                 
                 # Prepare mutate request
                 mutate_endpoint = f"customers/{customer_id}/campaigns:mutate"
@@ -586,7 +1983,7 @@ class GoogleAdsService:
                         {
                             "update": {
                                 "resourceName": resource_name,
-                                "biddingStrategyType": bid_strategy_map[new_bid_strategy]
+                                "biddingStrategyType": BID_STRATEGY_ENUMS[new_bid_strategy]
                             },
                             "updateMask": "bidding_strategy_type"
                         }
@@ -596,12 +1993,14 @@ class GoogleAdsService:
                 # Execute the mutate request
                 update_result = await self._make_request(mutate_endpoint, method="POST", data=mutate_data)
                 logger.info(f"Bidding strategy update result: {update_result}")
+                await self.cache.invalidate(customer_id)
+                self.campaign_index.update(customer_id, campaign_id, biddingStrategyType=new_bid_strategy)
                 
                 response["update_details"]["updates"].append({
                     "type": "bidding_strategy",
                     "previous_value": current_bid_strategy,
                     "new_value": new_bid_strategy,
-                    "new_value_enum": bid_strategy_map[new_bid_strategy],
+                    "new_value_enum": BID_STRATEGY_ENUMS[new_bid_strategy],
                     "status": "success"
                 })
                 
@@ -628,15 +2027,10 @@ class GoogleAdsService:
             logger.info(f"Getting campaign details for campaign {campaign_id} in account {customer_id}")
             
             # Build GAQL query
-            query = f"""
-                SELECT
-                    campaign.id,
-                    campaign.name,
-                    campaign.status,
-                    campaign.bidding_strategy_type
-                FROM campaign
-                WHERE campaign.id = {campaign_id}
-            """
+            try:
+                query = _CAMPAIGN_DETAILS.build(conditions=[ids_condition("campaign.id", [campaign_id])])
+            except GaqlError as e:
+                raise HTTPException(status_code=400, detail=str(e))
             
             # Make query request
             endpoint = f"customers/{customer_id}/googleAds:search"
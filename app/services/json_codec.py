@@ -0,0 +1,35 @@
+from typing import Any, Union
+import json
+import os
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib
+    orjson = None
+
+# Use orjson for upstream parsing and response bodies when it is installed
+FAST_JSON = orjson is not None and os.getenv("GOOGLE_ADS_FAST_JSON", "true").lower() == "true"
+
+def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    """Parse a JSON document"""
+    if FAST_JSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def dumps(value: Any) -> bytes:
+    """Serialize a value to compact UTF-8 JSON bytes"""
+    if FAST_JSON:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+def dumps_text(value: Any) -> str:
+    """Serialize a value to a JSON string (aiohttp's json_serialize hook)"""
+    return dumps(value).decode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when fast JSON is enabled"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
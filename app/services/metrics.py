@@ -0,0 +1,242 @@
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import os
+import time
+import aiohttp
+
+# Latency buckets in seconds, from fast cache hits to slow report pulls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+# A collected sample family: (name, type, help, [(labels, value)])
+Family = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+Collector = Callable[[], Iterable[Family]]
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels.items():
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{key}="{escaped}"')
+    return "{" + ",".join(parts) + "}"
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Histogram:
+    """
+    Prometheus-style histogram keyed by label values.
+
+    observe() does one bisect and three increments; cumulative buckets are only
+    built when the metrics are rendered.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...], buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last one is +Inf), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        series = self._series.get(labelvalues)
+        if series is None:
+            series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labelvalues, (counts, total, count) in list(self._series.items()):
+            labels = dict(zip(self.labelnames, labelvalues))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                bucket_labels = dict(labels, le=_format_value(bound) if bound != float("inf") else "+Inf")
+                lines.append(f"{self.name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+class Counter:
+    """Prometheus-style counter keyed by label values"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1) -> None:
+        self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labelvalues, value in list(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(dict(zip(self.labelnames, labelvalues)))} {_format_value(value)}")
+        return lines
+
+class Registry:
+    """Holds metrics updated on the hot path plus collectors sampled at scrape time"""
+
+    def __init__(self):
+        self._metrics: List = []
+        self._collectors: List[Collector] = []
+
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...], buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Collector) -> None:
+        self._collectors.append(collector)
+
+    def unregister_collector(self, collector: Collector) -> None:
+        if collector in self._collectors:
+            self._collectors.remove(collector)
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format"""
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in list(self._collectors):
+            for name, kind, documentation, samples in collector():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        lines.append("")
+        return "\n".join(lines)
+
+REGISTRY = Registry()
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "google_ads_mcp_http_request_duration_seconds",
+    "Latency of API requests by route",
+    ("method", "route", "status"),
+)
+
+UPSTREAM_REQUEST_SECONDS = REGISTRY.histogram(
+    "google_ads_mcp_upstream_request_duration_seconds",
+    "Latency of upstream Google Ads and OAuth calls",
+    ("endpoint", "status", "tier"),
+)
+
+UPSTREAM_CONNECTIONS = REGISTRY.counter(
+    "google_ads_mcp_pool_connections_acquired_total",
+    "Upstream connections taken from the pool, newly opened or reused",
+    ("kind",),
+)
+
+def connection_trace_config() -> aiohttp.TraceConfig:
+    """Trace hooks counting opened and reused pool connections (public aiohttp API)"""
+    async def on_create(session, context, params) -> None:
+        UPSTREAM_CONNECTIONS.inc("created")
+
+    async def on_reuse(session, context, params) -> None:
+        UPSTREAM_CONNECTIONS.inc("reused")
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_connection_create_end.append(on_create)
+    trace_config.on_connection_reuseconn.append(on_reuse)
+    return trace_config
+
+def pool_connections(connector: Optional[aiohttp.BaseConnector]) -> Optional[Tuple[int, int]]:
+    """
+    (in use, idle) connections of a pool, or None when they cannot be read
+
+    aiohttp has no public API for this, so the connector's private _acquired and _conns
+    are read defensively (aiohttp is pinned in requirements.txt); if their shape changes
+    the gauge is left out rather than failing the scrape.
+    """
+    if connector is None:
+        return 0, 0
+    try:
+        in_use = len(getattr(connector, "_acquired"))
+        idle = sum(len(conns) for conns in getattr(connector, "_conns").values())
+    except (AttributeError, TypeError):
+        return None
+    return in_use, idle
+
+def _load_customer_tiers() -> Dict[str, str]:
+    # GOOGLE_ADS_METRICS_CUSTOMER_TIERS="1234567890:enterprise,2345678901:smb"
+    tiers = {}
+    for item in os.getenv("GOOGLE_ADS_METRICS_CUSTOMER_TIERS", "").split(","):
+        customer_id, _, tier = item.strip().partition(":")
+        if customer_id and tier:
+            tiers[customer_id.replace("-", "")] = tier
+    return tiers
+
+_CUSTOMER_TIERS = _load_customer_tiers()
+_DEFAULT_TIER = os.getenv("GOOGLE_ADS_METRICS_DEFAULT_TIER", "default")
+
+def customer_tier(customer_id: Optional[str]) -> str:
+    """Bounded-cardinality label for a customer (configured tier, not the raw ID)"""
+    if not customer_id:
+        return "none"
+    return _CUSTOMER_TIERS.get(str(customer_id), _DEFAULT_TIER)
+
+def upstream_endpoint_type(url: str) -> str:
+    """Classify an upstream URL into a low-cardinality endpoint label"""
+    if url.endswith("googleAds:searchStream"):
+        return "search_stream"
+    if url.endswith("googleAds:search"):
+        return "search"
+    if url.endswith("campaignBudgets:mutate"):
+        return "mutate_campaign_budgets"
+    if url.endswith("campaigns:mutate"):
+        return "mutate_campaigns"
+    if url.endswith(":mutate"):
+        return "mutate_other"
+    return "other"
+
+def observe_upstream(endpoint: str, status: object, customer_id: Optional[str], started: float) -> None:
+    """Record one upstream call that started at time.perf_counter() value started"""
+    UPSTREAM_REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint, str(status), customer_tier(customer_id))
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request by route template and status code
+
+    Uses the matched route's path template (e.g. /api/google-ads/campaigns/{customer_id})
+    so label cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_holder = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except asyncio.CancelledError:
+            status_holder[0] = 499  # client closed the request (see CancelOnDisconnectMiddleware)
+            raise
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, scope["method"], path, str(status_holder[0]))
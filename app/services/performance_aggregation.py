@@ -0,0 +1,145 @@
+from array import array
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# Dimensions performance can be grouped by
+GROUP_BY = ("campaign", "channel", "status", "day")
+
+def aggregation_query(group_by: str, conditions: List[str]) -> str:
+    """Build the GAQL query feeding an aggregation (segmented by date only when grouping by day)
+
+    Args:
+        group_by: One of GROUP_BY
+        conditions: Validated GAQL conditions (see app.services.gaql)
+    """
+    query = f"""
+        SELECT
+            campaign.id,
+            campaign.name,
+            campaign.status,
+            campaign.advertising_channel_type,
+            {"segments.date," if group_by == "day" else ""}
+            metrics.impressions,
+            metrics.clicks,
+            metrics.cost_micros,
+            metrics.conversions,
+            metrics.conversions_value
+        FROM campaign
+        WHERE {" AND ".join(conditions)}
+    """
+    return query
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """Element-wise numerator / denominator, 0 where the denominator is 0"""
+    return np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator != 0)
+
+class PerformanceAggregator:
+    """
+    Columnar accumulator for campaign performance rows.
+
+    add() only appends each row's group code and raw metrics to typed arrays; the
+    per-group sums (one bincount per metric) and derived metrics (CTR, CPC, CPA,
+    conversion rate, ROAS) are computed column-wise in result().
+    """
+
+    def __init__(self, group_by: str = "campaign"):
+        if group_by not in GROUP_BY:
+            raise ValueError(f"Invalid group_by: {group_by}. Valid values are: {', '.join(GROUP_BY)}")
+        self.group_by = group_by
+        self._codes: Dict[str, int] = {}
+        self._labels: List[Dict] = []
+        self._group = array("q")
+        self._impressions = array("d")
+        self._clicks = array("d")
+        self._cost_micros = array("d")
+        self._conversions = array("d")
+        self._conversions_value = array("d")
+
+    def _key(self, item: Dict) -> Tuple[str, Dict]:
+        campaign = item.get("campaign", {})
+        if self.group_by == "campaign":
+            campaign_id = campaign.get("id", "")
+            return campaign_id, {
+                "campaignId": campaign_id,
+                "campaignName": campaign.get("name", ""),
+                "channelType": campaign.get("advertisingChannelType", ""),
+                "status": campaign.get("status", ""),
+            }
+        if self.group_by == "channel":
+            channel = campaign.get("advertisingChannelType", "")
+            return channel, {"channelType": channel}
+        if self.group_by == "status":
+            status = campaign.get("status", "")
+            return status, {"status": status}
+        day = item.get("segments", {}).get("date", "")
+        return day, {"date": day}
+
+    def add(self, item: Dict) -> None:
+        """Append one raw googleAds result row"""
+        key, labels = self._key(item)
+        code = self._codes.get(key)
+        if code is None:
+            code = self._codes[key] = len(self._labels)
+            self._labels.append(labels)
+        metrics = item.get("metrics", {})
+        self._group.append(code)
+        self._impressions.append(float(metrics.get("impressions", 0)))
+        self._clicks.append(float(metrics.get("clicks", 0)))
+        self._cost_micros.append(float(metrics.get("costMicros", 0)))
+        self._conversions.append(float(metrics.get("conversions", 0)))
+        self._conversions_value.append(float(metrics.get("conversionsValue", 0)))
+
+    def result(self) -> Dict:
+        """
+        Aggregated rows (ordered by the grouping key) plus overall totals
+
+        Returns:
+            Dict: groupBy, rows (one per group with summed and derived metrics) and totals
+        """
+        groups = len(self._labels)
+        codes = np.frombuffer(self._group, dtype=np.int64) if groups else np.zeros(0, dtype=np.int64)
+
+        def column(values: array) -> np.ndarray:
+            return np.frombuffer(values, dtype=np.float64) if len(values) else np.zeros(0)
+
+        # Group sums, with the overall totals appended as one extra group
+        sums = {
+            name: np.append(np.bincount(codes, weights=column(values), minlength=groups), column(values).sum())
+            for name, values in (
+                ("impressions", self._impressions),
+                ("clicks", self._clicks),
+                ("cost_micros", self._cost_micros),
+                ("conversions", self._conversions),
+                ("conversions_value", self._conversions_value),
+            )
+        }
+        rows_per_group = np.append(np.bincount(codes, minlength=groups), len(codes))
+        cost = sums["cost_micros"] / 1_000_000
+        derived = {
+            "ctr": _ratio(sums["clicks"], sums["impressions"]),
+            "averageCpc": _ratio(cost, sums["clicks"]),
+            "costPerConversion": _ratio(cost, sums["conversions"]),
+            "conversionRate": _ratio(sums["conversions"], sums["clicks"]),
+            "roas": _ratio(sums["conversions_value"], cost),
+        }
+
+        columns = {
+            "rows": rows_per_group.tolist(),
+            "impressions": sums["impressions"].astype(np.int64).tolist(),
+            "clicks": sums["clicks"].astype(np.int64).tolist(),
+            "cost": cost.round(6).tolist(),
+            "conversions": sums["conversions"].round(6).tolist(),
+            "conversionsValue": sums["conversions_value"].round(6).tolist(),
+        }
+        columns.update({name: values.round(6).tolist() for name, values in derived.items()})
+
+        def metrics_at(index: int) -> Dict:
+            return {name: values[index] for name, values in columns.items()}
+
+        order = sorted(range(groups), key=lambda code: str(next(iter(self._labels[code].values()))))
+        return {
+            "groupBy": self.group_by,
+            "rows": [dict(self._labels[code], **metrics_at(code)) for code in order],
+            "totals": metrics_at(groups),
+        }
@@ -0,0 +1,176 @@
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+class PerformanceStore:
+    """
+    Local SQLite store of daily-segmented campaign metrics per customer.
+
+    A sync replaces the rows of the days it fetched (new days plus the last few
+    still-settling ones), and date-range reports are aggregated locally. All SQLite
+    work runs in a worker thread behind a lock.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript("""
+            CREATE TABLE IF NOT EXISTS daily_campaign_metrics (
+                customer_id TEXT NOT NULL,
+                campaign_id TEXT NOT NULL,
+                date TEXT NOT NULL,
+                campaign_name TEXT,
+                status TEXT,
+                impressions INTEGER NOT NULL DEFAULT 0,
+                clicks INTEGER NOT NULL DEFAULT 0,
+                cost_micros INTEGER NOT NULL DEFAULT 0,
+                conversions REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (customer_id, date, campaign_id)
+            );
+            CREATE TABLE IF NOT EXISTS sync_state (
+                customer_id TEXT PRIMARY KEY,
+                synced_from TEXT NOT NULL,
+                synced_through TEXT NOT NULL,
+                last_sync_at REAL NOT NULL
+            );
+        """)
+        self._connection.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    # Sync state
+
+    def _get_state(self, customer_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT synced_from, synced_through, last_sync_at FROM sync_state WHERE customer_id = ?",
+                (customer_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "synced_from": date.fromisoformat(row[0]),
+            "synced_through": date.fromisoformat(row[1]),
+            "last_sync_at": row[2],
+        }
+
+    async def get_state(self, customer_id: str) -> Optional[Dict]:
+        """Return the synced date window and last sync time for a customer, if it was ever synced"""
+        return await asyncio.to_thread(self._get_state, str(customer_id))
+
+    def _customers(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._connection.execute("SELECT customer_id FROM sync_state")]
+
+    async def customers(self) -> List[str]:
+        """Customers that have been synced at least once"""
+        return await asyncio.to_thread(self._customers)
+
+    # Writes
+
+    def _replace_days(self, customer_id: str, start: date, end: date, rows: List[Tuple]) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM daily_campaign_metrics WHERE customer_id = ? AND date BETWEEN ? AND ?",
+                (customer_id, start.isoformat(), end.isoformat()),
+            )
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO daily_campaign_metrics "
+                "(customer_id, campaign_id, date, campaign_name, status, impressions, clicks, cost_micros, conversions) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            state = self._connection.execute(
+                "SELECT synced_from, synced_through FROM sync_state WHERE customer_id = ?", (customer_id,)
+            ).fetchone()
+            synced_from = min(start.isoformat(), state[0]) if state else start.isoformat()
+            synced_through = max(end.isoformat(), state[1]) if state else end.isoformat()
+            self._connection.execute(
+                "INSERT OR REPLACE INTO sync_state (customer_id, synced_from, synced_through, last_sync_at) VALUES (?, ?, ?, ?)",
+                (customer_id, synced_from, synced_through, time.time()),
+            )
+
+    @staticmethod
+    def row_values(customer_id: str, item: Dict) -> Tuple:
+        """Convert a raw googleAds row (campaign, segments.date, metrics) into a stored row"""
+        campaign = item.get("campaign", {})
+        metrics = item.get("metrics", {})
+        return (
+            str(customer_id),
+            str(campaign.get("id", "")),
+            item.get("segments", {}).get("date", ""),
+            campaign.get("name", ""),
+            campaign.get("status", ""),
+            int(metrics.get("impressions", 0)),
+            int(metrics.get("clicks", 0)),
+            int(metrics.get("costMicros", 0)),
+            float(metrics.get("conversions", 0)),
+        )
+
+    async def replace_days(self, customer_id: str, start: date, end: date, values: List[Tuple]) -> int:
+        """
+        Replace every stored row of a customer between start and end (inclusive)
+
+        Args:
+            customer_id: Customer the rows belong to
+            start: First synced day
+            end: Last synced day
+            values: Rows built with row_values
+
+        Returns:
+            int: Number of rows written
+        """
+        await asyncio.to_thread(self._replace_days, str(customer_id), start, end, values)
+        return len(values)
+
+    # Reads
+
+    def _aggregate(self, customer_id: str, start: date, end: date, campaign_ids: Optional[List[str]]) -> List[Dict]:
+        query = (
+            # Bare columns with MAX(date) take their values from the latest day of each campaign
+            "SELECT campaign_id, campaign_name, status, MAX(date), SUM(impressions), SUM(clicks), "
+            "SUM(cost_micros), SUM(conversions) "
+            "FROM daily_campaign_metrics WHERE customer_id = ? AND date BETWEEN ? AND ?"
+        )
+        params: List = [customer_id, start.isoformat(), end.isoformat()]
+        if campaign_ids:
+            query += f" AND campaign_id IN ({', '.join('?' for _ in campaign_ids)})"
+            params.extend(str(campaign_id) for campaign_id in campaign_ids)
+        query += " GROUP BY campaign_id ORDER BY campaign_id"
+
+        with self._lock:
+            result = self._connection.execute(query, params).fetchall()
+
+        return [
+            {
+                "campaignId": campaign_id,
+                "campaignName": name or "",
+                "status": status or "",
+                "impressions": int(impressions),
+                "clicks": int(clicks),
+                "cost": cost_micros / 1_000_000,
+                "conversions": float(conversions),
+                "averageCpc": cost_micros / clicks / 1_000_000 if clicks else 0,
+            }
+            for campaign_id, name, status, _, impressions, clicks, cost_micros, conversions in result
+        ]
+
+    async def aggregate(self, customer_id: str, start: date, end: date, campaign_ids: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Aggregate stored daily metrics per campaign over an inclusive date window
+
+        Returns:
+            List[Dict]: Rows shaped like get_campaign_performance results
+        """
+        return await asyncio.to_thread(self._aggregate, str(customer_id), start, end, campaign_ids)
@@ -0,0 +1,209 @@
+from typing import Dict, Mapping, Optional
+import asyncio
+import logging
+import random
+import re
+import time
+
+from .shared_state import SharedState
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+# HTTP statuses worth retrying: quota exhaustion and transient server errors
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# e.g. "retryDelay": "30s" in quotaErrorDetails of a RESOURCE_EXHAUSTED error
+_RETRY_DELAY_PATTERN = re.compile(r'"retryDelay"\s*:\s*"(\d+(?:\.\d+)?)s"')
+
+def retry_hint(headers: Mapping[str, str], body: str) -> Optional[float]:
+    """
+    Extract the server's retry hint in seconds from a Retry-After header or a retryDelay in the error body
+
+    Args:
+        headers: Response headers
+        body: Response body text
+    """
+    retry_after = headers.get("Retry-After")
+    if retry_after:
+        try:
+            return max(float(retry_after), 0.0)
+        except ValueError:
+            pass
+    match = _RETRY_DELAY_PATTERN.search(body or "")
+    if match:
+        return float(match.group(1))
+    return None
+
+def backoff_delay(attempt: int, base: float, cap: float, hint: Optional[float] = None) -> float:
+    """
+    Exponential backoff with full jitter, never shorter than the server's retry hint
+
+    Args:
+        attempt: Zero-based retry attempt
+        base: Delay of the first retry before jitter
+        cap: Maximum delay before jitter
+        hint: Retry delay requested by the server, if any
+    """
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+    if hint is not None:
+        delay = max(delay, hint)
+    return delay
+
+class TokenBucket:
+    """
+    Async token bucket whose rate backs off on quota errors and recovers on success.
+
+    Waiters are served in FIFO order. The rate is halved on each quota error (down to
+    min_rate) and grows back additively towards the configured rate as calls succeed.
+    """
+
+    def __init__(self, rate: float, burst: float, min_rate_ratio: float = 0.1, recovery_ratio: float = 0.05):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = rate * min_rate_ratio
+        self.recovery_step = rate * recovery_ratio
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> float:
+        """
+        Wait for one token
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        started = time.monotonic()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return time.monotonic() - started
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    async def acquire_shared(self, shared: SharedState, key: str) -> float:
+        """
+        Wait for one token from the bucket stored under key in the shared state
+
+        The bucket's current (adaptive) rate and burst are applied to the shared
+        bucket, so every worker draws from the same budget.
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        started = time.monotonic()
+        if started < self._blocked_until:
+            await asyncio.sleep(self._blocked_until - started)
+        wait = await shared.take(key, self.rate, self.burst)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return time.monotonic() - started
+
+    def penalize(self, pause: Optional[float] = None) -> None:
+        """Slow down after a quota error, optionally pausing for the server's retry hint"""
+        self.rate = max(self.min_rate, self.rate / 2)
+        if pause:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + pause)
+
+    def reward(self) -> None:
+        """Recover towards the configured rate after a successful call"""
+        if self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.recovery_step)
+
+class RateLimiter:
+    """
+    Client-side limiter with one bucket per developer token and one per customer ID.
+
+    A call must take a token from its customer's bucket and then from the developer
+    token bucket, so one busy account cannot starve the others of the shared quota.
+    With a shared state backend the buckets' tokens live there, so all worker
+    processes share one budget.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        customer_rate: float,
+        customer_burst: float,
+        enabled: bool = True,
+        shared: Optional[SharedState] = None,
+    ):
+        self.enabled = enabled
+        self.shared = shared
+        self.global_bucket = TokenBucket(rate, burst)
+        self.customer_rate = customer_rate
+        self.customer_burst = customer_burst
+        self._customer_buckets: Dict[str, TokenBucket] = {}
+
+        self.acquired = 0
+        self.throttled = 0
+        self.throttled_seconds = 0.0
+        self.quota_errors = 0
+        self.retries = 0
+
+    def _customer_bucket(self, customer_id: str) -> TokenBucket:
+        bucket = self._customer_buckets.get(customer_id)
+        if bucket is None:
+            bucket = TokenBucket(self.customer_rate, self.customer_burst)
+            self._customer_buckets[customer_id] = bucket
+        return bucket
+
+    async def acquire(self, customer_id: Optional[str] = None) -> None:
+        """Wait until a call for the customer may be sent"""
+        if not self.enabled:
+            return
+        waited = 0.0
+        if self.shared is not None:
+            if customer_id:
+                waited += await self._customer_bucket(customer_id).acquire_shared(self.shared, f"bucket:customer:{customer_id}")
+            waited += await self.global_bucket.acquire_shared(self.shared, "bucket:developer-token")
+        else:
+            if customer_id:
+                waited += await self._customer_bucket(customer_id).acquire()
+            waited += await self.global_bucket.acquire()
+        self.acquired += 1
+        if waited > 0.001:
+            self.throttled += 1
+            self.throttled_seconds += waited
+
+    def on_quota_error(self, customer_id: Optional[str] = None, hint: Optional[float] = None) -> None:
+        """Reduce the send rate after a 429 / RESOURCE_EXHAUSTED response"""
+        self.quota_errors += 1
+        self.global_bucket.penalize(hint)
+        if customer_id:
+            self._customer_bucket(customer_id).penalize(hint)
+        logger.warning(
+            f"Quota error for customer {customer_id}: send rate lowered to "
+            f"{self.global_bucket.rate:.2f}/s (retry hint: {hint})"
+        )
+
+    def on_success(self, customer_id: Optional[str] = None) -> None:
+        self.global_bucket.reward()
+        if customer_id:
+            bucket = self._customer_buckets.get(customer_id)
+            if bucket is not None:
+                bucket.reward()
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "shared": self.shared is not None,
+            "rate": self.global_bucket.rate,
+            "max_rate": self.global_bucket.max_rate,
+            "customers": len(self._customer_buckets),
+            "acquired": self.acquired,
+            "throttled": self.throttled,
+            "throttled_seconds": self.throttled_seconds,
+            "quota_errors": self.quota_errors,
+            "retries": self.retries,
+        }
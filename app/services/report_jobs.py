@@ -0,0 +1,196 @@
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import logging
+import time
+import uuid
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+# Reports progress as (completed, total); total may be None when it is not known yet
+ProgressCallback = Callable[[int, Optional[int]], None]
+# Runs one report spec and returns its result
+ReportRunner = Callable[[Dict, ProgressCallback], Awaitable[Any]]
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted while the queue is at capacity"""
+
+class ReportJobs:
+    """
+    Bounded background worker pool for long-running reports.
+
+    Jobs are queued and run by a fixed number of worker tasks, so heavy reporting
+    never runs more than `workers` reports at once next to the interactive
+    endpoints. Finished jobs (and their results) are kept for `result_ttl` seconds
+    after they finish, then dropped.
+    """
+
+    def __init__(self, runner: ReportRunner, workers: int = 2, max_queued: int = 100, result_ttl: float = 3600.0):
+        self._runner = runner
+        self.workers = workers
+        self.max_queued = max_queued
+        self.result_ttl = result_ttl
+        self._jobs: "OrderedDict[str, Dict]" = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+        self.submitted = 0
+        self.succeeded = 0
+        self.failed = 0
+
+    def start(self) -> None:
+        """Start the worker tasks (idempotent)"""
+        if self._workers:
+            return
+        self._queue = asyncio.Queue()
+        self._workers = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+
+    async def close(self) -> None:
+        """Cancel running jobs and stop the workers"""
+        for task in list(self._tasks.values()) + self._workers:
+            task.cancel()
+        for task in self._workers:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._workers = []
+
+    def submit(self, spec: Dict) -> Dict:
+        """
+        Queue a report spec
+
+        Returns:
+            Dict: The new job's status
+
+        Raises:
+            JobQueueFull: If max_queued jobs are already waiting
+        """
+        self.start()
+        self._purge()
+        if self._queue.qsize() >= self.max_queued:
+            raise JobQueueFull(f"Report queue is full ({self.max_queued} jobs waiting)")
+
+        job_id = uuid.uuid4().hex
+        job = {
+            "jobId": job_id,
+            "spec": spec,
+            "status": QUEUED,
+            "progress": {"completed": 0, "total": None},
+            "createdAt": time.time(),
+            "startedAt": None,
+            "finishedAt": None,
+            "expiresAt": None,
+            "error": None,
+            "result": None,
+        }
+        self._jobs[job_id] = job
+        self._queue.put_nowait(job_id)
+        self.submitted += 1
+        return self._public(job)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Status of a job, or None if it is unknown or expired"""
+        self._purge()
+        job = self._jobs.get(job_id)
+        return self._public(job) if job is not None else None
+
+    def result(self, job_id: str) -> Optional[Dict]:
+        """The full job record including its result, or None if it is unknown or expired"""
+        self._purge()
+        job = self._jobs.get(job_id)
+        return dict(job) if job is not None else None
+
+    def list(self) -> List[Dict]:
+        """Status of every job that has not expired, oldest first"""
+        self._purge()
+        return [self._public(job) for job in self._jobs.values()]
+
+    def cancel(self, job_id: str) -> Optional[Dict]:
+        """Cancel a queued or running job; finished jobs are left as they are"""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        if job["status"] == QUEUED:
+            self._finish(job, CANCELLED)
+        task = self._tasks.get(job_id)
+        if task is not None:
+            task.cancel()
+        return self._public(job)
+
+    def stats(self) -> Dict:
+        counts = {status: 0 for status in (QUEUED, RUNNING) + FINISHED}
+        for job in self._jobs.values():
+            counts[job["status"]] += 1
+        return {
+            "workers": self.workers,
+            "jobs": counts,
+            "submitted": self.submitted,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+        }
+
+    # Workers
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] != QUEUED:
+                continue
+            task = asyncio.ensure_future(self._run(job))
+            self._tasks[job_id] = task
+            try:
+                await asyncio.shield(task)
+            except asyncio.CancelledError:
+                if not task.done():  # the worker itself is being stopped
+                    task.cancel()
+                    raise
+            finally:
+                self._tasks.pop(job_id, None)
+
+    async def _run(self, job: Dict) -> None:
+        job["status"] = RUNNING
+        job["startedAt"] = time.time()
+
+        def progress(completed: int, total: Optional[int] = None) -> None:
+            job["progress"] = {"completed": completed, "total": total}
+
+        try:
+            job["result"] = await self._runner(job["spec"], progress)
+            self._finish(job, SUCCEEDED)
+            self.succeeded += 1
+        except asyncio.CancelledError:
+            self._finish(job, CANCELLED)
+        except Exception as e:
+            detail = getattr(e, "detail", None) or str(e)
+            logger.error(f"Report job {job['jobId']} failed: {detail}")
+            job["error"] = str(detail)
+            self._finish(job, FAILED)
+            self.failed += 1
+
+    def _finish(self, job: Dict, status: str) -> None:
+        now = time.time()
+        job["status"] = status
+        job["finishedAt"] = now
+        job["expiresAt"] = now + self.result_ttl
+
+    def _purge(self) -> None:
+        now = time.time()
+        expired = [job_id for job_id, job in self._jobs.items() if job["expiresAt"] is not None and job["expiresAt"] <= now]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    @staticmethod
+    def _public(job: Dict) -> Dict:
+        return {key: value for key, value in job.items() if key != "result"}
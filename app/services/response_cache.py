@@ -0,0 +1,268 @@
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+import hashlib
+import json
+import logging
+import time
+
+from .json_codec import dumps, loads
+from .shared_state import SharedState
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+# Rows sampled to estimate the serialized size of a cached list
+_SIZE_SAMPLE_ROWS = 50
+
+# (customer ID, normalized query, customer generation in the shared tier)
+CacheKey = Tuple[str, str, int]
+
+# (local invalidation count, shared generation) of a customer, taken before a fetch
+Epoch = Tuple[int, int]
+
+def normalize_query(query: str) -> str:
+    """Collapse whitespace so equivalent GAQL strings share one cache key"""
+    return " ".join(query.split())
+
+def estimate_size(value: Any) -> int:
+    """
+    Estimate the size in bytes of a cached value from its JSON encoding
+
+    Lists are estimated from a sample of their first rows to keep this cheap.
+    """
+    if isinstance(value, list) and len(value) > _SIZE_SAMPLE_ROWS:
+        sample = len(json.dumps(value[:_SIZE_SAMPLE_ROWS], default=str))
+        return sample * len(value) // _SIZE_SAMPLE_ROWS
+    return len(json.dumps(value, default=str))
+
+class ResponseCache:
+    """
+    In-process TTL + LRU cache for parsed GAQL results.
+
+    Entries are keyed by customer ID and normalized query, expire after a per-resource
+    TTL and are evicted least-recently-used first once the entry or byte budget is
+    exceeded. Cached values are shared between callers and must not be mutated.
+
+    With a shared state backend, results are also written to it so every worker
+    process can read them (lookup/store/invalidate). Each customer has a generation
+    counter in the shared state that invalidation bumps; local entries are tagged
+    with the generation they were read under, so a mutation in one worker also
+    retires the other workers' local copies.
+
+    A fetch takes the customer's epoch() before calling upstream and passes it to
+    store(); if the customer was invalidated in the meantime the rows may predate
+    the mutation and are not cached.
+    """
+
+    def __init__(
+        self,
+        ttls: Dict[str, float],
+        max_entries: int = 1000,
+        max_bytes: int = 64 * 1024 * 1024,
+        enabled: bool = True,
+        shared: Optional[SharedState] = None,
+    ):
+        self.ttls = ttls
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.shared = shared
+        self._entries: "OrderedDict[CacheKey, Tuple[Any, float, int]]" = OrderedDict()
+        self._by_customer: Dict[str, Set[CacheKey]] = {}
+        self._invalidated: Dict[str, int] = {}
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.shared_hits = 0
+        self.stale_writes = 0
+
+    def get(self, customer_id: str, query: str, generation: int = 0) -> Optional[Any]:
+        """
+        Return a cached value, or None on a miss or expired entry
+
+        Args:
+            customer_id: Customer the query ran against
+            query: GAQL query
+            generation: Customer generation in the shared tier
+        """
+        if not self.enabled:
+            return None
+        key = (str(customer_id), normalize_query(query), generation)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, expires_at, _ = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(
+        self,
+        resource: str,
+        customer_id: str,
+        query: str,
+        value: Any,
+        generation: int = 0,
+        ttl: Optional[float] = None,
+    ) -> None:
+        """
+        Store a value using the TTL configured for its resource type
+
+        Args:
+            resource: Resource type (e.g. accounts, campaigns, performance)
+            customer_id: Customer the query ran against
+            query: GAQL query
+            value: Parsed result
+            generation: Customer generation in the shared tier
+            ttl: Seconds to keep the value, when shorter than the resource TTL
+        """
+        if not self.enabled:
+            return
+        ttl = self.ttls.get(resource, 0) if ttl is None else ttl
+        if ttl <= 0:
+            return
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            logger.debug(f"Not caching {resource} result for {customer_id}: {size} bytes exceeds cache budget")
+            return
+
+        key = (str(customer_id), normalize_query(query), generation)
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (value, time.monotonic() + ttl, size)
+        self._by_customer.setdefault(key[0], set()).add(key)
+        self._bytes += size
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def invalidate_customer(self, customer_id: str) -> int:
+        """
+        Drop every entry cached for a customer, e.g. after a successful mutation
+
+        Returns:
+            int: Number of entries removed
+        """
+        self._invalidated[str(customer_id)] = self._invalidated.get(str(customer_id), 0) + 1
+        keys = self._by_customer.pop(str(customer_id), set())
+        for key in keys:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry[2]
+        if keys:
+            self.invalidations += 1
+            logger.info(f"Invalidated {len(keys)} cached results for customer {customer_id}")
+        return len(keys)
+
+    # Shared tier
+
+    async def _generation(self, customer_id: str) -> int:
+        value = await self.shared.get(f"cache-generation:{customer_id}")
+        return int(value) if value else 0
+
+    @staticmethod
+    def _shared_key(customer_id: str, query: str, generation: int) -> str:
+        digest = hashlib.sha1(normalize_query(query).encode("utf-8")).hexdigest()
+        return f"cache:{customer_id}:{generation}:{digest}"
+
+    async def lookup(self, customer_id: str, query: str) -> Optional[Any]:
+        """Like get, falling back to the shared tier when one is configured"""
+        if not self.enabled or self.shared is None:
+            return self.get(customer_id, query)
+        customer_id = str(customer_id)
+        generation = await self._generation(customer_id)
+        value = self.get(customer_id, query, generation)
+        if value is not None:
+            return value
+
+        payload = await self.shared.get(self._shared_key(customer_id, query, generation))
+        if payload is None:
+            return None
+        entry = loads(payload)
+        self.shared_hits += 1
+        # Keep a local copy only as long as the shared entry lives
+        self.put(entry["resource"], customer_id, query, entry["value"], generation, entry["expiresAt"] - time.time())
+        return entry["value"]
+
+    async def epoch(self, customer_id: str) -> Epoch:
+        """The customer's invalidation epoch; take it before the upstream call whose result is stored"""
+        customer_id = str(customer_id)
+        generation = await self._generation(customer_id) if self.enabled and self.shared is not None else 0
+        return self._invalidated.get(customer_id, 0), generation
+
+    async def store(self, resource: str, customer_id: str, query: str, value: Any, epoch: Optional[Epoch] = None) -> None:
+        """
+        Like put, also writing the value to the shared tier when one is configured
+
+        Args:
+            epoch: Result of epoch() taken before the value was fetched; the value is
+                   dropped if the customer has been invalidated since
+        """
+        customer_id = str(customer_id)
+        if epoch is not None and self._invalidated.get(customer_id, 0) != epoch[0]:
+            self.stale_writes += 1
+            return
+        if not self.enabled or self.shared is None:
+            self.put(resource, customer_id, query, value)
+            return
+        ttl = self.ttls.get(resource, 0)
+        if ttl <= 0:
+            return
+        generation = await self._generation(customer_id)
+        if epoch is not None and generation != epoch[1]:
+            self.stale_writes += 1
+            return
+        self.put(resource, customer_id, query, value, generation)
+        payload = dumps({"resource": resource, "expiresAt": time.time() + ttl, "value": value})
+        if len(payload) <= self.max_bytes:
+            await self.shared.set(self._shared_key(customer_id, query, generation), payload, ttl)
+
+    async def invalidate(self, customer_id: str) -> int:
+        """Like invalidate_customer, also retiring the customer's entries in every other worker"""
+        removed = self.invalidate_customer(customer_id)
+        if self.shared is not None:
+            await self.shared.incr(f"cache-generation:{customer_id}")
+        return removed
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._by_customer.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "shared": self.shared is not None,
+            "shared_hits": self.shared_hits,
+            "stale_writes": self.stale_writes,
+            "ttls": dict(self.ttls),
+        }
+
+    def _remove(self, key: CacheKey) -> None:
+        value, _, size = self._entries.pop(key)
+        self._bytes -= size
+        customer_keys = self._by_customer.get(key[0])
+        if customer_keys is not None:
+            customer_keys.discard(key)
+            if not customer_keys:
+                del self._by_customer[key[0]]
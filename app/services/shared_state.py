@@ -0,0 +1,270 @@
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # redis is only needed for the redis:// backend
+    aioredis = None
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+# How often a waiter polls a lock held by another process
+_LOCK_POLL_SECONDS = 0.05
+
+class SharedState(ABC):
+    """
+    Key/value state shared by every worker process of one deployment.
+
+    Holds the OAuth access token, the rate-limit buckets and the read cache so N
+    gunicorn workers act like one client towards Google. Backends implement plain
+    get/set with TTL, an atomic counter, an atomic token-bucket take and a lock.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        """Value stored under key, or None if it is missing or expired"""
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        """Store a value that expires after ttl seconds"""
+
+    @abstractmethod
+    async def incr(self, key: str) -> int:
+        """Atomically increment a counter (created at 0) and return the new value"""
+
+    @abstractmethod
+    async def take(self, key: str, rate: float, burst: float) -> float:
+        """
+        Reserve one token from a shared token bucket
+
+        Returns:
+            float: Seconds the caller must wait before using the token (0 if available now)
+        """
+
+    @abstractmethod
+    async def _try_lock(self, key: str, owner: str, ttl: float) -> bool:
+        """Take the lock for owner if nobody holds it; returns whether it was taken"""
+
+    @abstractmethod
+    async def _unlock(self, key: str, owner: str) -> None:
+        """Release the lock if owner still holds it"""
+
+    @asynccontextmanager
+    async def lock(self, key: str, ttl: float = 30.0) -> AsyncIterator[None]:
+        """Cross-process lock; expires after ttl seconds in case its holder dies"""
+        owner = uuid.uuid4().hex
+        while not await self._try_lock(key, owner, ttl):
+            await asyncio.sleep(_LOCK_POLL_SECONDS)
+        try:
+            yield
+        finally:
+            await self._unlock(key, owner)
+
+    async def close(self) -> None:
+        pass
+
+class SqliteSharedState(SharedState):
+    """
+    Shared state in a local SQLite file, for several workers on one host.
+
+    Every operation is one short transaction (BEGIN IMMEDIATE for read-modify-write),
+    run in a worker thread. A shared rate limiter takes a token for every upstream
+    call, so each call costs a serialized disk write: use it only with several
+    workers, where sharing the token and quota is worth that.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS shared_state (key TEXT PRIMARY KEY, value BLOB, expires_at REAL)"
+        )
+
+    def _get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM shared_state WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, time.time()),
+            ).fetchone()
+        return bytes(row[0]) if row is not None else None
+
+    def _set(self, key: str, value: bytes, ttl: Optional[float]) -> None:
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO shared_state (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at),
+            )
+            # Opportunistically drop a few expired rows so the file does not grow forever
+            self._connection.execute(
+                "DELETE FROM shared_state WHERE rowid IN "
+                "(SELECT rowid FROM shared_state WHERE expires_at IS NOT NULL AND expires_at <= ? LIMIT 10)",
+                (time.time(),),
+            )
+
+    def _read_modify_write(self, key: str, update) -> object:
+        with self._lock:
+            connection = self._connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = connection.execute(
+                    "SELECT value, expires_at FROM shared_state WHERE key = ?", (key,)
+                ).fetchone()
+                current = None
+                if row is not None and (row[1] is None or row[1] > time.time()):
+                    current = bytes(row[0])
+                new_value, ttl, result = update(current)
+                if new_value is not None:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO shared_state (key, value, expires_at) VALUES (?, ?, ?)",
+                        (key, new_value, time.time() + ttl if ttl else None),
+                    )
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        return result
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await asyncio.to_thread(self._set, key, value, ttl)
+
+    async def incr(self, key: str) -> int:
+        def update(current: Optional[bytes]):
+            value = int(current or 0) + 1
+            return str(value).encode(), None, value
+        return await asyncio.to_thread(self._read_modify_write, key, update)
+
+    async def take(self, key: str, rate: float, burst: float) -> float:
+        def update(current: Optional[bytes]):
+            now = time.time()
+            if current is None:
+                tokens, updated = burst, now
+            else:
+                tokens, updated = (float(part) for part in current.split(b":"))
+            tokens = min(burst, tokens + (now - updated) * rate) - 1
+            wait = -tokens / rate if tokens < 0 else 0.0
+            return f"{tokens}:{now}".encode(), burst / rate + wait + 60, wait
+        return await asyncio.to_thread(self._read_modify_write, key, update)
+
+    async def _try_lock(self, key: str, owner: str, ttl: float) -> bool:
+        def update(current: Optional[bytes]):
+            if current is not None:
+                return None, None, False
+            return owner.encode(), ttl, True
+        return await asyncio.to_thread(self._read_modify_write, f"lock:{key}", update)
+
+    async def _unlock(self, key: str, owner: str) -> None:
+        def unlock() -> None:
+            with self._lock:
+                self._connection.execute(
+                    "DELETE FROM shared_state WHERE key = ? AND value = ?", (f"lock:{key}", owner.encode())
+                )
+        await asyncio.to_thread(unlock)
+
+    async def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+# Token bucket take: KEYS[1] bucket, ARGV rate, burst, now; returns the wait in seconds as a string
+_TAKE_SCRIPT = """
+local state = redis.call('GET', KEYS[1])
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local tokens = burst
+local updated = now
+if state then
+    local sep = string.find(state, ':')
+    tokens = tonumber(string.sub(state, 1, sep - 1))
+    updated = tonumber(string.sub(state, sep + 1))
+end
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate) - 1
+local wait = 0
+if tokens < 0 then
+    wait = -tokens / rate
+end
+redis.call('SET', KEYS[1], tostring(tokens) .. ':' .. tostring(now), 'PX', math.ceil((burst / rate + wait + 60) * 1000))
+return tostring(wait)
+"""
+
+# Release a lock only if this caller still owns it
+_UNLOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+class RedisSharedState(SharedState):
+    """Shared state in Redis (or any Redis-compatible server), for workers on any number of hosts"""
+
+    def __init__(self, url: str, prefix: str = "google-ads-mcp:"):
+        if aioredis is None:
+            raise ValueError("The redis package is required for a redis:// shared state URL")
+        self.prefix = prefix
+        self._client = aioredis.from_url(url)
+        self._take = self._client.register_script(_TAKE_SCRIPT)
+        self._unlock_script = self._client.register_script(_UNLOCK_SCRIPT)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._client.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self._client.set(self.prefix + key, value, px=max(int(ttl * 1000), 1))
+
+    async def incr(self, key: str) -> int:
+        return int(await self._client.incr(self.prefix + key))
+
+    async def take(self, key: str, rate: float, burst: float) -> float:
+        # The server clock orders the buckets, so workers' clocks may drift freely
+        seconds, microseconds = await self._client.time()
+        wait = await self._take(keys=[self.prefix + key], args=[rate, burst, seconds + microseconds / 1_000_000])
+        return float(wait)
+
+    async def _try_lock(self, key: str, owner: str, ttl: float) -> bool:
+        return bool(await self._client.set(self.prefix + f"lock:{key}", owner, nx=True, px=int(ttl * 1000)))
+
+    async def _unlock(self, key: str, owner: str) -> None:
+        await self._unlock_script(keys=[self.prefix + f"lock:{key}"], args=[owner])
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+def shared_state_from_url(url: Optional[str]) -> Optional[SharedState]:
+    """
+    Build the shared state backend for GOOGLE_ADS_SHARED_STATE_URL
+
+    Args:
+        url: redis://host:6379/0 (or rediss://), sqlite:///path/to/state.db, or empty
+             for per-process state
+
+    Returns:
+        Optional[SharedState]: The backend, or None when state stays in-process
+    """
+    if not url:
+        return None
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        logger.info("Using Redis shared state")
+        return RedisSharedState(url)
+    if url.startswith("sqlite:///"):
+        path = url[len("sqlite:///"):]
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        logger.info(f"Using SQLite shared state at {path}")
+        return SqliteSharedState(path)
+    raise ValueError(f"Unsupported shared state URL: {url}")
@@ -0,0 +1,80 @@
+from typing import Any, Awaitable, Callable, Dict, Hashable
+import asyncio
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one execution.
+
+    The first caller for a key runs the call; callers arriving while it is in flight
+    await the same task and receive the same result (or exception). Nothing is kept
+    once the call finishes, so this complements rather than replaces caching. If
+    every caller is cancelled (e.g. their clients disconnected) the call is cancelled too.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+
+        self.calls = 0
+        self.executions = 0
+        self.shared = 0
+        self.abandoned = 0
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn once per key among concurrent callers
+
+        Args:
+            key: Identity of the call (e.g. customer ID and normalized query)
+            fn: Zero-argument coroutine function performing the call
+        """
+        self.calls += 1
+        if not self.enabled:
+            self.executions += 1
+            return await fn()
+
+        task = self._in_flight.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done, key=key: self._on_done(key, done))
+        else:
+            self.shared += 1
+        # Shield so one cancelled caller does not cancel the call shared by the others
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._waiters.get(task) == 1 and not task.done():
+                # Last caller gone: nobody needs the result any more
+                task.cancel()
+                self.abandoned += 1
+            raise
+        finally:
+            if task in self._waiters:
+                self._waiters[task] -= 1
+
+    def _on_done(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            self._in_flight.pop(key)
+        self._waiters.pop(task, None)
+        # Mark the exception retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "calls": self.calls,
+            "executions": self.executions,
+            "shared": self.shared,
+            "abandoned": self.abandoned,
+            "share_ratio": self.shared / self.calls if self.calls else 0.0,
+            "in_flight": self.in_flight,
+        }
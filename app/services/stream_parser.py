@@ -0,0 +1,86 @@
+from typing import Any, List
+import re
+
+from .json_codec import loads
+
+_STRUCTURAL = re.compile(rb'[\[\]{}"]')
+_STRING_END = re.compile(rb'["\\]')
+
+class JsonArrayStreamParser:
+    """
+    Incremental parser for a top-level JSON array of objects.
+
+    googleAds:searchStream answers with ``[{batch}, {batch}, ...]``. Bytes are fed as
+    they arrive and every batch object is returned as soon as it is complete, so only
+    one batch is held in memory at a time.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._obj_start = -1
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """
+        Feed raw bytes and return the top-level array items completed by them
+
+        Args:
+            chunk: Next slice of the response body
+
+        Returns:
+            List[Any]: Parsed items, in order
+        """
+        buffer = self._buffer
+        buffer.extend(chunk)
+        items = []
+        pos = self._pos
+        size = len(buffer)
+
+        while pos < size:
+            if self._in_string:
+                match = _STRING_END.search(buffer, pos)
+                if match is None:
+                    pos = size
+                    break
+                pos = match.start()
+                if buffer[pos] == 0x5C:  # backslash escapes the next byte
+                    if pos + 1 >= size:
+                        break
+                    pos += 2
+                    continue
+                self._in_string = False
+                pos += 1
+                continue
+
+            match = _STRUCTURAL.search(buffer, pos)
+            if match is None:
+                pos = size
+                break
+            pos = match.start()
+            char = buffer[pos]
+            if char == 0x22:  # "
+                self._in_string = True
+            elif char in (0x7B, 0x5B):  # { [
+                self._depth += 1
+                if self._depth == 2:
+                    self._obj_start = pos
+            else:  # } ]
+                self._depth -= 1
+                if self._depth == 1 and self._obj_start >= 0:
+                    items.append(loads(buffer[self._obj_start:pos + 1]))
+                    # Drop consumed bytes so memory stays bounded by one item
+                    del buffer[:pos + 1]
+                    self._obj_start = -1
+                    size = len(buffer)
+                    pos = 0
+                    continue
+            pos += 1
+
+        if self._obj_start < 0 and not self._in_string and pos == size:
+            # Nothing pending between items: discard separators and whitespace
+            buffer.clear()
+            pos = 0
+        self._pos = pos
+        return items
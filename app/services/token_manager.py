@@ -0,0 +1,105 @@
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+import asyncio
+import logging
+import time
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+# Fetcher returns (access_token, expires_in_seconds)
+TokenFetcher = Callable[[], Awaitable[Tuple[str, float]]]
+
+class TokenManager:
+    """
+    Expiry-aware OAuth access token cache with single-flight refresh.
+
+    The token is refreshed in the background once it enters the refresh margin,
+    and only one refresh runs at a time; concurrent callers await the same task.
+    """
+
+    def __init__(self, fetcher: TokenFetcher, refresh_margin: float = 300.0):
+        self._fetcher = fetcher
+        self.refresh_margin = refresh_margin
+        self._token: Optional[str] = None
+        self._expires_at: float = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+
+        # Refresh statistics
+        self.refresh_count = 0
+        self.refresh_failures = 0
+        self.last_refresh_seconds = 0.0
+        self.total_refresh_seconds = 0.0
+
+    @property
+    def token(self) -> Optional[str]:
+        return self._token
+
+    def _seconds_left(self) -> float:
+        return self._expires_at - time.monotonic()
+
+    async def get_token(self) -> str:
+        """Return a valid access token, refreshing only when necessary."""
+        if self._token is not None:
+            seconds_left = self._seconds_left()
+            if seconds_left > self.refresh_margin:
+                return self._token
+            if seconds_left > 0:
+                # Still usable: refresh in the background and serve the current token
+                self._start_refresh()
+                return self._token
+        return await self._await_refresh()
+
+    async def refresh(self, stale_token: Optional[str] = None) -> str:
+        """
+        Force a refresh, e.g. after a 401.
+
+        Args:
+            stale_token: The token that was rejected. If another caller has already
+                replaced it, the current token is returned without a new refresh.
+        """
+        if stale_token is not None and self._token is not None and self._token != stale_token:
+            return self._token
+        self._expires_at = 0.0
+        return await self._await_refresh()
+
+    def stats(self) -> Dict:
+        return {
+            "refresh_count": self.refresh_count,
+            "refresh_failures": self.refresh_failures,
+            "last_refresh_seconds": self.last_refresh_seconds,
+            "total_refresh_seconds": self.total_refresh_seconds,
+            "expires_in": max(self._seconds_left(), 0.0) if self._token else 0.0,
+        }
+
+    def _start_refresh(self) -> asyncio.Task:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.ensure_future(self._do_refresh())
+            self._refresh_task.add_done_callback(self._on_refresh_done)
+        return self._refresh_task
+
+    async def _await_refresh(self) -> str:
+        # Shield so a cancelled caller does not cancel the refresh shared by others
+        return await asyncio.shield(self._start_refresh())
+
+    @staticmethod
+    def _on_refresh_done(task: asyncio.Task) -> None:
+        # Retrieve the exception so background refresh failures are not reported as unhandled
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Access token refresh failed: {task.exception()}")
+
+    async def _do_refresh(self) -> str:
+        started = time.monotonic()
+        try:
+            token, expires_in = await self._fetcher()
+        except Exception:
+            self.refresh_failures += 1
+            raise
+        finally:
+            elapsed = time.monotonic() - started
+            self.refresh_count += 1
+            self.last_refresh_seconds = elapsed
+            self.total_refresh_seconds += elapsed
+        self._token = token
+        self._expires_at = time.monotonic() + float(expires_in)
+        logger.info(f"Access token refreshed in {self.last_refresh_seconds:.3f}s, expires in {expires_in}s")
+        return token
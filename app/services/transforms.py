@@ -0,0 +1,132 @@
+from typing import Any, Dict
+
+# Mapeamento de códigos de estratégia de lances para strings descritivas
+_BID_STRATEGY_CODES = {
+    "0": "UNSPECIFIED",
+    "1": "UNKNOWN",
+    "2": "COMMISSION",
+    "3": "ENHANCED_CPC",
+    "4": "MANUAL_CPC",
+    "5": "MANUAL_CPM",
+    "6": "MANUAL_CPV",
+    "7": "MAXIMIZE_CONVERSIONS",
+    "8": "MAXIMIZE_CONVERSION_VALUE",
+    "9": "PAGE_ONE_PROMOTED",
+    "10": "PERCENT_CPC",
+    "11": "TARGET_CPA",
+    "12": "TARGET_CPM",
+    "13": "TARGET_IMPRESSION_SHARE",
+    "14": "TARGET_OUTRANK_SHARE",
+    "15": "TARGET_ROAS",
+    "16": "TARGET_SPEND",
+    7: "MAXIMIZE_CONVERSIONS",
+    8: "MAXIMIZE_CONVERSION_VALUE",
+    16: "MAXIMIZE_CLICKS",
+    4: "MANUAL_CPC",
+    5: "MANUAL_CPM",
+    6: "MANUAL_CPV",
+    11: "TARGET_CPA",
+    15: "TARGET_ROAS",
+    13: "TARGET_IMPRESSION_SHARE"
+}
+
+# Bidding strategies that can be set on a campaign, with their numeric enum values
+# See: https://developers.google.com/google-ads/api/reference/rpc/v17/BiddingStrategyTypeEnum.BiddingStrategyType
+BID_STRATEGY_ENUMS = {
+    "MAXIMIZE_CONVERSIONS": 7,  # Numeric enum value
+    "MAXIMIZE_CONVERSION_VALUE": 8,
+    "MAXIMIZE_CLICKS": 16,
+    "MANUAL_CPC": 4,
+    "MANUAL_CPM": 5,
+    "MANUAL_CPV": 6,
+    "TARGET_CPA": 11,
+    "TARGET_ROAS": 15,
+    "TARGET_SPEND": 16,
+    "TARGET_IMPRESSION_SHARE": 13
+}
+
+# Reverse table: numeric code (as sent by the API, string or int) or enum name -> enum name.
+# The REST API usually returns names, so they map to themselves and need a single lookup.
+BID_STRATEGY_NAMES = dict(_BID_STRATEGY_CODES)
+BID_STRATEGY_NAMES.update((name, name) for name in (*_BID_STRATEGY_CODES.values(), *BID_STRATEGY_ENUMS))
+
+# Stand-in for a missing message in a result row; never mutated
+_EMPTY: Dict = {}
+
+# Column converters used by the GAQL templates
+
+def text(value: Any) -> str:
+    return "" if value is None else str(value)
+
+def to_int(value: Any) -> int:
+    return int(value or 0)
+
+def to_float(value: Any) -> float:
+    return float(value or 0)
+
+def micros(value: Any) -> float:
+    return float(value) / 1_000_000 if value else 0.0
+
+def bid_strategy_name(value: Any) -> str:
+    if value is None:
+        return ""
+    name = BID_STRATEGY_NAMES.get(value)
+    return name if name is not None else str(value)
+
+# Row transforms: one API result row in, one response row out. Each reads every
+# message once and does no logging, so they cost the same with debug logging on or off.
+
+def account_row(item: Dict) -> Dict:
+    """Transform a customer_client result row into a client account"""
+    client_data = item.get("customerClient", _EMPTY)
+    return {
+        "accountId": client_data.get("clientCustomer", "").rpartition("/")[2],
+        "accountName": client_data.get("descriptiveName", ""),
+        "currencyCode": client_data.get("currencyCode", ""),
+        "status": client_data.get("status", ""),
+    }
+
+def hierarchy_row(item: Dict) -> Dict:
+    """Transform a customer_client result row into an account tree entry"""
+    client_data = item.get("customerClient", _EMPTY)
+    return {
+        "accountId": client_data.get("clientCustomer", "").rpartition("/")[2],
+        "accountName": client_data.get("descriptiveName", ""),
+        "currencyCode": client_data.get("currencyCode", ""),
+        "status": client_data.get("status", ""),
+        "timeZone": client_data.get("timeZone", ""),
+        "manager": bool(client_data.get("manager", False)),
+        "level": int(client_data.get("level", 0)),
+    }
+
+def campaign_row(item: Dict, _names: Dict = BID_STRATEGY_NAMES) -> Dict:
+    """Transform a campaign result row into a campaign (budget converted from micros)"""
+    campaign = item.get("campaign", _EMPTY)
+    budget_micros = item.get("campaignBudget", _EMPTY).get("amountMicros")
+    strategy = campaign.get("biddingStrategyType", "")
+    strategy_name = _names.get(strategy)
+    return {
+        "campaignId": campaign.get("id", ""),
+        "campaignName": campaign.get("name", ""),
+        "status": campaign.get("status", ""),
+        "type": campaign.get("advertisingChannelType", ""),
+        "biddingStrategy": strategy_name if strategy_name is not None else str(strategy),
+        "budget": float(budget_micros) / 1_000_000 if budget_micros else 0.0,
+    }
+
+def performance_row(item: Dict) -> Dict:
+    """Transform a campaign metrics result row into campaign performance (cost and CPC converted from micros)"""
+    campaign = item.get("campaign", _EMPTY)
+    metrics = item.get("metrics", _EMPTY)
+    cost_micros = metrics.get("costMicros")
+    average_cpc = metrics.get("averageCpc")
+    return {
+        "campaignId": campaign.get("id", ""),
+        "campaignName": campaign.get("name", ""),
+        "status": campaign.get("status", ""),
+        "impressions": int(metrics.get("impressions", 0)),
+        "clicks": int(metrics.get("clicks", 0)),
+        "cost": float(cost_micros) / 1_000_000 if cost_micros is not None else 0,
+        "conversions": float(metrics.get("conversions", 0)),
+        "averageCpc": float(average_cpc) / 1_000_000 if average_cpc is not None else 0,
+    }
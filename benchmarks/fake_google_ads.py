@@ -0,0 +1,490 @@
+"""
+Offline stand-in for the Google Ads REST endpoints used by GoogleAdsService
+
+Serves the OAuth token endpoint, googleAds:search, googleAds:searchStream,
+campaignBudgets:mutate, campaigns:mutate and the BatchJobService (create,
+addOperations, run, operation polling and listResults) over synthetic accounts of any size,
+with configurable latency, error rates and 401/429 injection.
+
+Point the service at it with:
+    GOOGLE_ADS_API_BASE_URL=http://127.0.0.1:8090/v17
+    GOOGLE_ADS_TOKEN_URL=http://127.0.0.1:8090/token
+
+Run standalone:
+    python -m benchmarks.fake_google_ads --port 8090 --accounts 50 --campaigns 1000
+"""
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+
+from aiohttp import web
+
+_FROM = re.compile(r"\bFROM\s+(\w+)", re.IGNORECASE)
+_CAMPAIGN_ID_EQ = re.compile(r"campaign\.id\s*=\s*(\d+)", re.IGNORECASE)
+_CAMPAIGN_ID_IN = re.compile(r"campaign\.id\s+IN\s*\(([^)]*)\)", re.IGNORECASE)
+_STATUS_EQ = re.compile(r"campaign\.status\s*=\s*'(\w+)'", re.IGNORECASE)
+_BUDGET_IN = re.compile(r"campaign\.campaign_budget\s+IN\s*\(([^)]*)\)", re.IGNORECASE)
+_LEVEL_MAX = re.compile(r"customer_client\.level\s*<=\s*(\d+)", re.IGNORECASE)
+_CHANGED_SINCE = re.compile(r"date_time\s*>=\s*'([^']+)'", re.IGNORECASE)
+_DATE_BETWEEN = re.compile(r"segments\.date\s+BETWEEN\s+'([\d-]+)'\s+AND\s+'([\d-]+)'", re.IGNORECASE)
+
+_STATUSES = ("ENABLED", "ENABLED", "ENABLED", "PAUSED")
+_CHANNELS = ("SEARCH", "DISPLAY", "SHOPPING", "VIDEO", "PERFORMANCE_MAX")
+_STRATEGIES = ("MANUAL_CPC", "MAXIMIZE_CONVERSIONS", "TARGET_CPA", "TARGET_ROAS", "MAXIMIZE_CONVERSION_VALUE")
+
+@dataclass
+class FakeConfig:
+    accounts: int = 10
+    managers: int = 0
+    campaigns: int = 100
+    latency_ms: float = 20.0
+    jitter_ms: float = 10.0
+    error_rate: float = 0.0
+    unauthorized_rate: float = 0.0
+    quota_rate: float = 0.0
+    retry_delay_s: int = 1
+    token_ttl_s: int = 3600
+    page_size: int = 10000
+    stream_batch_size: int = 10000
+    seed: int = 42
+
+class FakeGoogleAds:
+    """Synthetic Google Ads backend with deterministic account and campaign data"""
+
+    def __init__(self, config: FakeConfig):
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.counters: Dict[str, int] = {}
+        self.budgets: Dict[str, int] = {}
+        self.strategies: Dict[str, str] = {}
+        # (customer ID, change time, resource type, resource name) of every mutation
+        self.changes: List[tuple] = []
+        # batch job ID -> {"customer", "operations", "polls", "done"}
+        self.batch_jobs: Dict[str, Dict] = {}
+
+    # Synthetic data
+
+    def account_ids(self) -> List[str]:
+        return [str(1_000_000_000 + index) for index in range(self.config.accounts)]
+
+    def manager_ids(self) -> List[str]:
+        return [str(2_000_000_000 + index) for index in range(1, self.config.managers + 1)]
+
+    def hierarchy(self) -> Dict[str, List[str]]:
+        """Children of each manager ("" is the login manager); sub-managers form a binary tree"""
+        children: Dict[str, List[str]] = {"": []}
+        managers = self.manager_ids()
+        for index, manager_id in enumerate(managers, start=1):
+            children[manager_id] = []
+            children["" if index <= 2 else managers[index // 2 - 1]].append(manager_id)
+        for index, account_id in enumerate(self.account_ids()):
+            slot = index % (len(managers) + 1)
+            children["" if slot == 0 else managers[slot - 1]].append(account_id)
+        return children
+
+    def client_rows(self, customer_id: str, query: str) -> Iterator[Dict]:
+        """customer_client rows for a customer and its descendants, with their level"""
+        children = self.hierarchy()
+        root = customer_id if customer_id in children or customer_id in self.account_ids() else ""
+        max_level = _LEVEL_MAX.search(query)
+        clients_only = re.search(r"customer_client\.manager\s*=\s*FALSE", query, re.IGNORECASE)
+        level = 0
+        current = [root]
+        while current and (max_level is None or level <= int(max_level.group(1))):
+            for account_id in current:
+                manager = account_id in children
+                if not (clients_only and manager):
+                    client_id = account_id or customer_id
+                    yield {
+                        "customerClient": {
+                            "resourceName": f"customers/{customer_id}/customerClients/{client_id}",
+                            "clientCustomer": f"customers/{client_id}",
+                            "level": str(level),
+                            "manager": manager,
+                            "currencyCode": "BRL" if int(client_id) % 3 else "USD",
+                            "descriptiveName": f"{'Manager' if manager else 'Account'} {client_id}",
+                            "status": "ENABLED" if int(client_id) % 5 else "CANCELED",
+                            "timeZone": "America/Sao_Paulo",
+                        }
+                    }
+            current = [child for account_id in current for child in children.get(account_id, ())]
+            level += 1
+
+    def campaign_row(self, customer_id: str, campaign_id: int, with_metrics: bool) -> Dict:
+        resource = f"customers/{customer_id}/campaigns/{campaign_id}"
+        budget_resource = f"customers/{customer_id}/campaignBudgets/{campaign_id}"
+        row = {
+            "campaign": {
+                "resourceName": resource,
+                "id": str(campaign_id),
+                "name": f"Campaign {customer_id}-{campaign_id}",
+                "status": _STATUSES[campaign_id % len(_STATUSES)],
+                "advertisingChannelType": _CHANNELS[campaign_id % len(_CHANNELS)],
+                "biddingStrategyType": self.strategies.get(resource, _STRATEGIES[campaign_id % len(_STRATEGIES)]),
+                "campaignBudget": budget_resource,
+            },
+            "campaignBudget": {
+                "resourceName": budget_resource,
+                "amountMicros": str(self.budgets.get(budget_resource, (campaign_id % 50 + 1) * 10_000_000)),
+            },
+        }
+        if with_metrics:
+            impressions = (campaign_id * 7919) % 100_000 + 100
+            clicks = impressions // 20 + 1
+            cost_micros = clicks * 350_000
+            row["metrics"] = {
+                "impressions": str(impressions),
+                "clicks": str(clicks),
+                "costMicros": str(cost_micros),
+                "conversions": round(clicks * 0.05, 2),
+                "conversionsValue": round(clicks * 0.05 * 40, 2),
+                "averageCpc": str(cost_micros // clicks),
+            }
+        return row
+
+    def rows_for(self, customer_id: str, query: str) -> Iterator[Dict]:
+        match = _FROM.search(query)
+        resource = match.group(1).lower() if match else ""
+
+        if resource == "customer_client":
+            yield from self.client_rows(customer_id, query)
+            return
+
+        if resource in ("change_status", "change_event"):
+            since = _CHANGED_SINCE.search(query)
+            wanted = "CAMPAIGN" if resource == "change_status" else "CAMPAIGN_BUDGET"
+            for changed_customer, changed_at, resource_type, name in self.changes:
+                if changed_customer != customer_id or resource_type != wanted:
+                    continue
+                if since and changed_at < since.group(1):
+                    continue
+                if resource == "change_status":
+                    yield {"changeStatus": {
+                        "resourceName": f"customers/{customer_id}/changeStatus/{len(changed_at)}",
+                        "lastChangeDateTime": changed_at,
+                        "resourceType": resource_type,
+                        "resourceStatus": "CHANGED",
+                        "campaign": name,
+                    }}
+                else:
+                    yield {"changeEvent": {
+                        "changeDateTime": changed_at,
+                        "changeResourceType": resource_type,
+                        "changeResourceName": name,
+                    }}
+            return
+
+        if resource == "campaign":
+            with_metrics = "metrics." in query
+            ids = range(1, self.config.campaigns + 1)
+            single = _CAMPAIGN_ID_EQ.search(query)
+            listed = _CAMPAIGN_ID_IN.search(query)
+            budgets = _BUDGET_IN.search(query)
+            if single:
+                ids = [int(single.group(1))]
+            elif listed:
+                ids = [int(value) for value in listed.group(1).split(",") if value.strip()]
+            elif budgets:
+                ids = [int(value.strip().strip("'").rsplit("/", 1)[-1]) for value in budgets.group(1).split(",") if value.strip()]
+            status = _STATUS_EQ.search(query)
+            between = _DATE_BETWEEN.search(query) if "segments.date," in query else None
+            for campaign_id in ids:
+                if not 1 <= campaign_id <= self.config.campaigns:
+                    continue
+                row = self.campaign_row(customer_id, campaign_id, with_metrics)
+                if status and row["campaign"]["status"] != status.group(1).upper():
+                    continue
+                if between is None:
+                    yield row
+                    continue
+                # Date-segmented query: one row per campaign per day
+                day = date.fromisoformat(between.group(1))
+                last = date.fromisoformat(between.group(2))
+                while day <= last:
+                    yield dict(row, segments={"date": day.isoformat()})
+                    day += timedelta(days=1)
+
+    # Fault injection
+
+    def count(self, name: str) -> None:
+        self.counters[name] = self.counters.get(name, 0) + 1
+
+    async def delay(self) -> None:
+        config = self.config
+        latency = config.latency_ms + self.random.uniform(-config.jitter_ms, config.jitter_ms)
+        if latency > 0:
+            await asyncio.sleep(latency / 1000)
+
+    def injected_error(self) -> Optional[web.Response]:
+        config = self.config
+        roll = self.random.random()
+        if roll < config.unauthorized_rate:
+            self.count("injected_401")
+            return web.json_response({"error": {"code": 401, "status": "UNAUTHENTICATED"}}, status=401)
+        roll -= config.unauthorized_rate
+        if roll < config.quota_rate:
+            self.count("injected_429")
+            return web.json_response(
+                {
+                    "error": {
+                        "code": 429,
+                        "status": "RESOURCE_EXHAUSTED",
+                        "details": [{"quotaErrorDetails": {"retryDelay": f"{config.retry_delay_s}s"}}],
+                    }
+                },
+                status=429,
+            )
+        roll -= config.quota_rate
+        if roll < config.error_rate:
+            self.count("injected_5xx")
+            return web.json_response({"error": {"code": 503, "status": "UNAVAILABLE"}}, status=503)
+        return None
+
+    def authorized(self, request: web.Request) -> bool:
+        return request.headers.get("Authorization", "").startswith("Bearer fake-token-")
+
+    async def guard(self, request: web.Request, name: str) -> Optional[web.Response]:
+        """Count the call, apply latency and return an error response to inject, if any"""
+        self.count(name)
+        await self.delay()
+        if not self.authorized(request):
+            return web.json_response({"error": {"code": 401, "status": "UNAUTHENTICATED"}}, status=401)
+        return self.injected_error()
+
+    # Handlers
+
+    async def token(self, request: web.Request) -> web.Response:
+        self.count("token")
+        await self.delay()
+        return web.json_response({
+            "access_token": f"fake-token-{int(time.time() * 1000)}",
+            "expires_in": self.config.token_ttl_s,
+            "token_type": "Bearer",
+        })
+
+    async def search(self, request: web.Request) -> web.Response:
+        error = await self.guard(request, "search")
+        if error is not None:
+            return error
+        body = await request.json()
+        rows = list(self.rows_for(request.match_info["customer_id"], body.get("query", "")))
+        offset = int(body.get("pageToken") or 0)
+        page = rows[offset:offset + self.config.page_size]
+        response = {"results": page, "totalResultsCount": str(len(rows))}
+        if offset + self.config.page_size < len(rows):
+            response["nextPageToken"] = str(offset + self.config.page_size)
+        return web.json_response(response)
+
+    async def search_stream(self, request: web.Request) -> web.StreamResponse:
+        error = await self.guard(request, "search_stream")
+        if error is not None:
+            return error
+        body = await request.json()
+        response = web.StreamResponse(headers={"Content-Type": "application/json; charset=UTF-8"})
+        await response.prepare(request)
+        await response.write(b"[")
+        batch: List[Dict] = []
+        first = True
+        for row in self.rows_for(request.match_info["customer_id"], body.get("query", "")):
+            batch.append(row)
+            if len(batch) >= self.config.stream_batch_size:
+                await response.write((b"" if first else b",") + json.dumps({"results": batch}).encode())
+                first = False
+                batch = []
+        if batch or first:
+            await response.write((b"" if first else b",") + json.dumps({"results": batch}).encode())
+        await response.write(b"]")
+        await response.write_eof()
+        return response
+
+    async def mutate(self, request: web.Request) -> web.Response:
+        kind = "campaign_budgets" if request.path.endswith("campaignBudgets:mutate") else "campaigns"
+        error = await self.guard(request, f"mutate_{kind}")
+        if error is not None:
+            return error
+        body = await request.json()
+        results: List[Dict] = []
+        errors: List[Dict] = []
+        for index, operation in enumerate(body.get("operations", [])):
+            update = operation.get("update", {})
+            resource = update.get("resourceName", "")
+            if not resource.startswith("customers/"):
+                results.append({})
+                errors.append({
+                    "message": "Resource name is malformed.",
+                    "location": {"fieldPathElements": [{"fieldName": "operations", "index": index}]},
+                })
+                continue
+            self.apply_update(
+                request.match_info["customer_id"], "CAMPAIGN_BUDGET" if kind == "campaign_budgets" else "CAMPAIGN", update
+            )
+            results.append({"resourceName": resource})
+
+        if errors and not body.get("partialFailure"):
+            return web.json_response({"error": {"code": 400, "status": "INVALID_ARGUMENT", "details": [{"errors": errors}]}}, status=400)
+        response = {"results": results}
+        if errors:
+            response["partialFailureError"] = {"code": 3, "message": "Partial failure", "details": [{"errors": errors}]}
+        return web.json_response(response)
+
+    def apply_update(self, customer_id: str, kind: str, update: Dict) -> None:
+        resource = update["resourceName"]
+        if "amountMicros" in update:
+            self.budgets[resource] = int(update["amountMicros"])
+        if "biddingStrategyType" in update:
+            self.strategies[resource] = str(update["biddingStrategyType"])
+        self.changes.append((
+            customer_id,
+            time.strftime("%Y-%m-%d %H:%M:%S") + f".{int(time.time() * 1_000_000) % 1_000_000:06d}",
+            kind,
+            resource,
+        ))
+
+    async def batch_job_mutate(self, request: web.Request) -> web.Response:
+        error = await self.guard(request, "batch_job_mutate")
+        if error is not None:
+            return error
+        customer_id = request.match_info["customer_id"]
+        operation = (await request.json()).get("operation", {})
+        if "remove" in operation:
+            self.batch_jobs.pop(operation["remove"].rsplit("/", 1)[-1], None)
+            return web.json_response({"result": {"resourceName": operation["remove"]}})
+        self.count("batch_jobs_created")
+        job_id = str(self.counters["batch_jobs_created"])
+        self.batch_jobs[job_id] = {"customer": customer_id, "operations": [], "polls": 0, "done": False}
+        return web.json_response({"result": {"resourceName": f"customers/{customer_id}/batchJobs/{job_id}"}})
+
+    def batch_job(self, request: web.Request) -> Optional[Dict]:
+        return self.batch_jobs.get(request.match_info["job_id"])
+
+    async def batch_job_add_operations(self, request: web.Request) -> web.Response:
+        error = await self.guard(request, "batch_job_add_operations")
+        if error is not None:
+            return error
+        job = self.batch_job(request)
+        if job is None:
+            return web.json_response({"error": {"code": 404, "status": "NOT_FOUND"}}, status=404)
+        body = await request.json()
+        if body.get("sequenceToken", "") != str(len(job["operations"]) or ""):
+            return web.json_response({"error": {"code": 400, "status": "INVALID_ARGUMENT", "message": "Bad sequence token"}}, status=400)
+        job["operations"].extend(body.get("mutateOperations", []))
+        total = len(job["operations"])
+        return web.json_response({"totalOperations": str(total), "nextSequenceToken": str(total)})
+
+    async def batch_job_run(self, request: web.Request) -> web.Response:
+        error = await self.guard(request, "batch_job_run")
+        if error is not None:
+            return error
+        job_id = request.match_info["job_id"]
+        if job_id not in self.batch_jobs:
+            return web.json_response({"error": {"code": 404, "status": "NOT_FOUND"}}, status=404)
+        return web.json_response({"name": f"customers/{request.match_info['customer_id']}/operations/batch-{job_id}"})
+
+    async def batch_job_operation(self, request: web.Request) -> web.Response:
+        error = await self.guard(request, "batch_job_operation")
+        if error is not None:
+            return error
+        job = self.batch_jobs.get(request.match_info["operation"].replace("batch-", ""))
+        if job is None:
+            return web.json_response({"error": {"code": 404, "status": "NOT_FOUND"}}, status=404)
+        # Done on the third poll; operations are applied then
+        job["polls"] += 1
+        if job["polls"] >= 3 and not job["done"]:
+            job["done"] = True
+            job["results"] = []
+            for index, operation in enumerate(job["operations"]):
+                kind, body = next(iter(operation.items()))
+                update = body.get("update", {})
+                if not update.get("resourceName", "").startswith("customers/"):
+                    job["results"].append({"operationIndex": str(index), "status": {"code": 3, "message": "Resource name is malformed."}})
+                    continue
+                self.apply_update(job["customer"], "CAMPAIGN_BUDGET" if kind == "campaignBudgetOperation" else "CAMPAIGN", update)
+                result_key = "campaignBudgetResult" if kind == "campaignBudgetOperation" else "campaignResult"
+                job["results"].append({
+                    "operationIndex": str(index),
+                    "mutateOperationResponse": {result_key: {"resourceName": update["resourceName"]}},
+                    "status": {},
+                })
+        executed = len(job["operations"]) if job["done"] else len(job["operations"]) * job["polls"] // 3
+        return web.json_response({
+            "name": request.path.split("/v17/", 1)[-1],
+            "metadata": {"executedOperationCount": str(executed)},
+            "done": job["done"],
+        })
+
+    async def batch_job_results(self, request: web.Request) -> web.Response:
+        error = await self.guard(request, "batch_job_results")
+        if error is not None:
+            return error
+        job = self.batch_job(request)
+        if job is None or not job["done"]:
+            return web.json_response({"error": {"code": 400, "status": "FAILED_PRECONDITION"}}, status=400)
+        offset = int(request.query.get("pageToken") or 0)
+        size = int(request.query.get("pageSize") or 1000)
+        response: Dict = {"results": job["results"][offset:offset + size]}
+        if offset + size < len(job["results"]):
+            response["nextPageToken"] = str(offset + size)
+        return web.json_response(response)
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.counters)
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/token", self.token)
+        app.router.add_post("/v17/customers/{customer_id}/googleAds:search", self.search)
+        app.router.add_post("/v17/customers/{customer_id}/googleAds:searchStream", self.search_stream)
+        app.router.add_post("/v17/customers/{customer_id}/campaignBudgets:mutate", self.mutate)
+        app.router.add_post("/v17/customers/{customer_id}/campaigns:mutate", self.mutate)
+        app.router.add_post("/v17/customers/{customer_id}/batchJobs:mutate", self.batch_job_mutate)
+        app.router.add_post(r"/v17/customers/{customer_id}/batchJobs/{job_id:\d+}:addOperations", self.batch_job_add_operations)
+        app.router.add_post(r"/v17/customers/{customer_id}/batchJobs/{job_id:\d+}:run", self.batch_job_run)
+        app.router.add_get(r"/v17/customers/{customer_id}/batchJobs/{job_id:\d+}:listResults", self.batch_job_results)
+        app.router.add_get("/v17/customers/{customer_id}/operations/{operation}", self.batch_job_operation)
+        app.router.add_get("/_stats", self.stats)
+        return app
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Register the fake server options on a parser (shared with the benchmark runner)"""
+    defaults = FakeConfig()
+    parser.add_argument("--accounts", type=int, default=defaults.accounts, help="Client accounts under the manager")
+    parser.add_argument("--managers", type=int, default=defaults.managers, help="Sub-manager accounts (nested as a binary tree)")
+    parser.add_argument("--campaigns", type=int, default=defaults.campaigns, help="Campaigns per account")
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms, help="Mean upstream latency")
+    parser.add_argument("--jitter-ms", type=float, default=defaults.jitter_ms, help="Uniform latency jitter")
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate, help="Fraction of calls answered with 503")
+    parser.add_argument("--unauthorized-rate", type=float, default=defaults.unauthorized_rate, help="Fraction of calls answered with 401")
+    parser.add_argument("--quota-rate", type=float, default=defaults.quota_rate, help="Fraction of calls answered with 429")
+    parser.add_argument("--token-ttl", type=int, default=defaults.token_ttl_s, help="expires_in of issued tokens (seconds)")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+def config_from_args(args: argparse.Namespace) -> FakeConfig:
+    return FakeConfig(
+        accounts=args.accounts,
+        managers=args.managers,
+        campaigns=args.campaigns,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        unauthorized_rate=args.unauthorized_rate,
+        quota_rate=args.quota_rate,
+        token_ttl_s=args.token_ttl,
+        seed=args.seed,
+    )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline fake Google Ads API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    add_arguments(parser)
+    args = parser.parse_args()
+    web.run_app(FakeGoogleAds(config_from_args(args)).app(), host=args.host, port=args.port, access_log=None)
+
+if __name__ == "__main__":
+    main()
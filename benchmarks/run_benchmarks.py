@@ -0,0 +1,265 @@
+"""
+Endpoint benchmark harness for the FastAPI app in main.py
+
+Starts the offline fake Google Ads server and the API (uvicorn, one process) as
+subprocesses, drives the API endpoints at each concurrency level and reports
+throughput, p50/p95/p99 latency, error count and the API process memory.
+
+Example:
+    python -m benchmarks.run_benchmarks --scenarios campaigns,performance \\
+        --concurrency 1,10,50 --requests 500 --accounts 50 --campaigns 2000
+
+The response cache and client-side rate limiter are disabled by default so every
+request reaches the fake upstream; pass --app-env KEY=VALUE to change any setting.
+"""
+from typing import Callable, Dict, List, Optional, Tuple
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import aiohttp
+
+from .fake_google_ads import FakeGoogleAds, add_arguments, config_from_args
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+API_PREFIX = "/api/google-ads"
+
+# Request factory: (request index, account IDs, campaigns per account) -> (method, path, json body)
+Scenario = Callable[[int, List[str], int], Tuple[str, str, Optional[object]]]
+
+SCENARIOS: Dict[str, Scenario] = {
+    "health": lambda i, accounts, campaigns: ("GET", "/health", None),
+    "accounts": lambda i, accounts, campaigns: ("GET", f"{API_PREFIX}/accounts", None),
+    "campaigns": lambda i, accounts, campaigns: (
+        "GET", f"{API_PREFIX}/campaigns/{accounts[i % len(accounts)]}", None
+    ),
+    "campaigns-stream": lambda i, accounts, campaigns: (
+        "GET", f"{API_PREFIX}/campaigns/{accounts[i % len(accounts)]}?stream=true", None
+    ),
+    "performance": lambda i, accounts, campaigns: (
+        "GET", f"{API_PREFIX}/performance/{accounts[i % len(accounts)]}?date_range=LAST_30_DAYS", None
+    ),
+    "performance-aggregate": lambda i, accounts, campaigns: (
+        "GET", f"{API_PREFIX}/performance/{accounts[i % len(accounts)]}/aggregate?group_by=channel", None
+    ),
+    "update-budget": lambda i, accounts, campaigns: (
+        "POST", f"{API_PREFIX}/update-bid-budget", {
+            "customerId": accounts[i % len(accounts)],
+            "campaignId": str(i % campaigns + 1),
+            "newBudget": 10 + i % 90,
+        }
+    ),
+    "bulk-update": lambda i, accounts, campaigns: (
+        "POST", f"{API_PREFIX}/update-bid-budget/bulk", [
+            {"customerId": accounts[(i + j) % len(accounts)], "campaignId": str(j % campaigns + 1), "newBudget": 10 + j % 90}
+            for j in range(100)
+        ]
+    ),
+}
+
+# Settings applied to the API process unless overridden with --app-env
+DEFAULT_APP_ENV = {
+    "GOOGLE_ADS_CACHE_ENABLED": "false",
+    "GOOGLE_ADS_RATE_LIMIT_ENABLED": "false",
+}
+
+def read_memory_kb(pid: int) -> Dict[str, int]:
+    """Current and peak resident memory of a process, from /proc (Linux only)"""
+    memory = {}
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith(("VmRSS:", "VmHWM:")):
+                    key, value = line.split(":", 1)
+                    memory[key] = int(value.split()[0])
+    except OSError:
+        pass
+    return memory
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+async def wait_until_ready(session: aiohttp.ClientSession, url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            async with session.get(url) as response:
+                if response.status < 500:
+                    return
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not become ready within {timeout}s")
+
+async def run_level(
+    session: aiohttp.ClientSession,
+    base_url: str,
+    scenario: Scenario,
+    concurrency: int,
+    total: int,
+    accounts: List[str],
+    campaigns: int,
+    app_pid: int,
+) -> Dict:
+    """Send total requests with concurrency workers and summarize the results"""
+    latencies: List[float] = []
+    errors = 0
+    response_bytes = 0
+    next_index = 0
+    peak_rss = 0
+    done = asyncio.Event()
+
+    async def sample_memory() -> None:
+        nonlocal peak_rss
+        while not done.is_set():
+            peak_rss = max(peak_rss, read_memory_kb(app_pid).get("VmRSS", 0))
+            await asyncio.sleep(0.1)
+
+    async def worker() -> None:
+        nonlocal next_index, errors, response_bytes
+        while next_index < total:
+            index = next_index
+            next_index += 1
+            method, path, body = scenario(index, accounts, campaigns)
+            started = time.perf_counter()
+            try:
+                async with session.request(method, f"{base_url}{path}", json=body) as response:
+                    payload = await response.read()
+                    response_bytes += len(payload)
+                    if response.status >= 400:
+                        errors += 1
+            except aiohttp.ClientError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    sampler = asyncio.ensure_future(sample_memory())
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await sampler
+
+    latencies.sort()
+    memory = read_memory_kb(app_pid)
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "seconds": elapsed,
+        "throughput_rps": total / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        "avg_response_bytes": response_bytes // total if total else 0,
+        "rss_peak_kb": max(peak_rss, memory.get("VmRSS", 0)),
+        "rss_end_kb": memory.get("VmRSS", 0),
+        "rss_hwm_kb": memory.get("VmHWM", 0),
+    }
+
+def start_process(args: List[str], env: Dict[str, str], quiet: bool) -> subprocess.Popen:
+    output = subprocess.DEVNULL if quiet else None
+    return subprocess.Popen([sys.executable, *args], cwd=REPO_ROOT, env=env, stdout=output, stderr=output)
+
+async def run(args: argparse.Namespace) -> List[Dict]:
+    fake_config = config_from_args(args)
+    accounts = FakeGoogleAds(fake_config).account_ids()
+    fake_url = f"http://127.0.0.1:{args.fake_port}"
+    app_url = f"http://127.0.0.1:{args.app_port}"
+
+    fake_args = [
+        "-m", "benchmarks.fake_google_ads", "--port", str(args.fake_port),
+        "--accounts", str(args.accounts), "--campaigns", str(args.campaigns),
+        "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms),
+        "--error-rate", str(args.error_rate), "--unauthorized-rate", str(args.unauthorized_rate),
+        "--quota-rate", str(args.quota_rate), "--token-ttl", str(args.token_ttl), "--seed", str(args.seed),
+    ]
+
+    app_env = dict(os.environ)
+    app_env.update({
+        "GOOGLE_ADS_CLIENT_ID": "benchmark",
+        "GOOGLE_ADS_CLIENT_SECRET": "benchmark",
+        "GOOGLE_ADS_REFRESH_TOKEN": "benchmark",
+        "GOOGLE_ADS_DEVELOPER_TOKEN": "benchmark",
+        "GOOGLE_ADS_LOGIN_CUSTOMER_ID": "999",
+        "GOOGLE_ADS_API_BASE_URL": f"{fake_url}/v17",
+        "GOOGLE_ADS_TOKEN_URL": f"{fake_url}/token",
+    })
+    app_env.update(DEFAULT_APP_ENV)
+    for item in args.app_env:
+        key, _, value = item.partition("=")
+        app_env[key] = value
+
+    fake = start_process(fake_args, dict(os.environ), quiet=not args.show_logs)
+    app = start_process(
+        ["-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(args.app_port), "--log-level", "warning"],
+        app_env,
+        quiet=not args.show_logs,
+    )
+    results: List[Dict] = []
+    try:
+        connector = aiohttp.TCPConnector(limit=0)
+        timeout = aiohttp.ClientTimeout(total=args.timeout)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            await wait_until_ready(session, f"{fake_url}/_stats")
+            await wait_until_ready(session, f"{app_url}/health")
+
+            for name in args.scenarios.split(","):
+                scenario = SCENARIOS[name]
+                if args.warmup:
+                    await run_level(session, app_url, scenario, 1, args.warmup, accounts, args.campaigns, app.pid)
+                for concurrency in (int(level) for level in args.concurrency.split(",")):
+                    result = await run_level(
+                        session, app_url, scenario, concurrency, args.requests, accounts, args.campaigns, app.pid
+                    )
+                    result["scenario"] = name
+                    results.append(result)
+                    print_result(result)
+
+            async with session.get(f"{fake_url}/_stats") as response:
+                print(f"\nUpstream calls: {json.dumps(await response.json(), sort_keys=True)}")
+    finally:
+        for process in (app, fake):
+            process.terminate()
+        for process in (app, fake):
+            process.wait(timeout=10)
+    return results
+
+def print_result(result: Dict) -> None:
+    print(
+        f"{result['scenario']:<17} c={result['concurrency']:<4} n={result['requests']:<6} "
+        f"err={result['errors']:<4} {result['throughput_rps']:>9.1f} req/s  "
+        f"p50={result['p50_ms']:>8.1f}ms p95={result['p95_ms']:>8.1f}ms p99={result['p99_ms']:>8.1f}ms  "
+        f"rss_peak={result['rss_peak_kb'] / 1024:>7.1f}MiB"
+    )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the Google Ads MCP API against the offline fake server")
+    parser.add_argument("--scenarios", default="campaigns,performance", help=f"Comma-separated: {', '.join(SCENARIOS)}")
+    parser.add_argument("--concurrency", default="1,10,50", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per concurrency level")
+    parser.add_argument("--warmup", type=int, default=5, help="Sequential warm-up requests per scenario")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Per-request timeout (seconds)")
+    parser.add_argument("--app-port", type=int, default=8089)
+    parser.add_argument("--fake-port", type=int, default=8090)
+    parser.add_argument("--app-env", action="append", default=[], help="KEY=VALUE setting for the API process")
+    parser.add_argument("--show-logs", action="store_true", help="Show API and fake server logs")
+    parser.add_argument("--json-out", help="Write results as JSON to this file")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    if args.json_out:
+        with open(args.json_out, "w") as output:
+            json.dump(results, output, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+"""
+Gunicorn settings for running the API with several uvicorn worker processes
+
+    gunicorn -c gunicorn.conf.py main:app
+
+Runs one worker unless WEB_CONCURRENCY is set. Report jobs, batch jobs and
+queued budget write records live in the memory of the worker that created them,
+so with several workers a status poll that reaches another worker gets a 404.
+Only raise WEB_CONCURRENCY if clients do not use /reports/jobs, /batch-jobs or
+/update-bid-budget?wait=false, or route each client to one worker.
+
+With several workers, set GOOGLE_ADS_SHARED_STATE_URL (sqlite:///... on one host,
+redis://... across hosts) so the workers share one access token, one set of
+rate-limit buckets and one read cache instead of each acting as a separate client.
+"""
+import os
+
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '8080')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "300"))
+graceful_timeout = 30
+keepalive = 5
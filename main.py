@@ -1,6 +1,7 @@
 import os
 import logging
-from fastapi import FastAPI, Depends, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
@@ -16,12 +17,39 @@ load_dotenv()
 
 # Import routers
 from app.routers import google_ads_router
+from app.services.google_ads_service import GoogleAdsService
+from app.services.json_codec import FastJSONResponse
+from app.services.disconnect import CancelOnDisconnectMiddleware
+from app.services.metrics import CONTENT_TYPE, REGISTRY, MetricsMiddleware
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Create one GoogleAdsService per process and share its connection pool across requests
+    """
+    try:
+        service = GoogleAdsService()
+        await service.start()
+    except Exception as e:
+        logger.error(f"Failed to initialize Google Ads service: {str(e)}")
+        service = None
+    app.state.ads_service = service
+    if service is not None:
+        REGISTRY.register_collector(service.metrics_families)
+    try:
+        yield
+    finally:
+        if service is not None:
+            REGISTRY.unregister_collector(service.metrics_families)
+            await service.close()
 
 # Create FastAPI app
 app = FastAPI(
     title="Google Ads MCP API",
     description="API for Google Ads Management Control Panel",
     version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 # Add CORS middleware
@@ -33,6 +61,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Time every request by route for /metrics
+app.add_middleware(MetricsMiddleware)
+
+# Cancel a request's upstream calls when its client goes away
+if os.getenv("GOOGLE_ADS_CANCEL_ON_DISCONNECT", "true").lower() == "true":
+    app.add_middleware(CancelOnDisconnectMiddleware)
+
 # Include routers
 app.include_router(google_ads_router.router)
 
@@ -44,6 +79,14 @@ async def health_check():
     """
     return {"status": "healthy", "version": "1.0.0"}
 
+# Metrics endpoint
+@app.get("/metrics", tags=["Health"], include_in_schema=False)
+async def metrics():
+    """
+    Prometheus metrics: request and upstream latency histograms plus service counters
+    """
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
+
 # Root endpoint
 @app.get("/", tags=["Root"])
 async def root():
@@ -62,4 +105,6 @@ if __name__ == "__main__":
     host = os.getenv("HOST", "0.0.0.0")
     port = int(os.getenv("PORT", "8080"))
     
-    uvicorn.run("main:app", host=host, port=port, reload=True) 
\ No newline at end of file
+    reload = os.getenv("RELOAD", "false").lower() == "true"
+    
+    uvicorn.run("main:app", host=host, port=port, reload=reload) 
\ No newline at end of file